@@ -51,7 +51,22 @@ class OrderResponse(BaseModel):
 
 class OrderDeliver(BaseModel):
     response_text: str
-    files: List[str]
+    files: List[dict]
+
+
+class DeliveryFileRef(BaseModel):
+    sha256: str = Field(..., pattern=r'^[0-9a-f]{64}$')
+    size: int = Field(..., ge=0)
+    name: Optional[str] = Field(None, max_length=255)
+
+
+class DeliveryPreflight(BaseModel):
+    files: List[DeliveryFileRef] = Field(..., min_length=1, max_length=100)
+
+
+class DeliveryUploadCreate(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255)
+    size: int = Field(..., gt=0)
 
 
 class OrderReview(BaseModel):
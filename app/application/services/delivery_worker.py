@@ -0,0 +1,211 @@
+"""Records deliveries accepted with 202 (Prefer: respond-async) from a background thread"""
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from typing import List, Optional
+
+from app.infrastructure.database.database import SessionLocal
+from app.infrastructure.utils.time_utils import get_current_time
+from app.application.dto.order import OrderDeliver
+from app.domain.entities.DeliveryJob import DeliveryJob
+from app.application.services.service_container import ServiceContainer
+
+
+_ERROR_BACKOFF_SECONDS = 5.0
+
+
+class DeliveryWorker:
+    """
+    Runs OrderUseCase.deliver_order for delivery_jobs rows. Jobs submitted by
+    this process are picked up immediately; every poll_seconds the table is
+    also scanned for pending jobs, so jobs from other workers, from before a
+    restart, or claimed by a worker that died (running for stale_seconds) are
+    not lost. Claiming is a conditional UPDATE, and so is every later status
+    change, made only while this worker still holds the claim, so a job
+    reclaimed from a worker that was slow rather than dead is recorded once.
+
+    A job the order rejects (ValueError) fails at once; any other error is
+    retried after retry_seconds, doubling each time, up to max_attempts. Every
+    failed job releases its files.
+    """
+
+    def __init__(
+        self,
+        upload_dir: Path,
+        poll_seconds: float = 10.0,
+        stale_seconds: float = 300.0,
+        max_attempts: int = 5,
+        retry_seconds: float = 15.0
+    ):
+        self.upload_dir = upload_dir
+        self.poll_seconds = poll_seconds
+        self.stale_seconds = stale_seconds
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="delivery-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+
+        self._stopping = True
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def submit(self, job_id: str) -> None:
+
+        self._queue.put(job_id)
+
+    def process(self, job_id: str) -> bool:
+        """Claim and run one job; False if another worker has it or it is finished"""
+
+        db = SessionLocal()
+        try:
+            container = ServiceContainer(db, self.upload_dir)
+            jobs = container.delivery_job_repository
+
+            stale_before = get_current_time() - timedelta(seconds=self.stale_seconds)
+            if not jobs.claim(job_id, self.holder, stale_before):
+                db.rollback()
+                return False
+            db.commit()
+
+            job = jobs.get(job_id)
+            files = json.loads(job.files)
+
+            if job.attempts > self.max_attempts:
+
+                # Its worker died on the last allowed attempt
+                self._fail(container, job, files, job.error or "Delivery could not be recorded")
+                return True
+
+            # Committed by deliver_order together with the delivery, so a crash
+            # in between never records the delivery twice. The conditional
+            # UPDATE also locks the row until then, so a worker reclaiming the
+            # job as stale either finds it done or makes this one back off.
+            if not jobs.update_claimed(job_id, self.holder, status="done", finished_at=get_current_time(), error=None):
+                db.rollback()
+                print(f"[WARN] Delivery job {job_id} was reclaimed by another worker")
+                return False
+            try:
+                delivery = container.order_use_case.deliver_order(
+                    job.order_id, job.user_id, OrderDeliver(response_text=job.response_text, files=files)
+                )
+            except Exception as e:
+                db.rollback()
+                job = jobs.get(job_id)
+                if job.status == "done":
+                    print(f"[WARN] Delivery job {job_id} recorded, but post-processing failed: {e}")
+                    return True
+
+                if isinstance(e, ValueError) or job.attempts >= self.max_attempts:
+                    self._fail(container, job, files, str(e))
+                    return True
+
+                # Probably transient (database, disk); try again later
+                retry_at = get_current_time() + timedelta(seconds=self.retry_seconds * 2 ** (job.attempts - 1))
+                if jobs.update_claimed(
+                    job_id, self.holder, status="pending", error=str(e), claimed_by=None, next_attempt_at=retry_at
+                ):
+                    print(f"[WARN] Delivery job {job_id} attempt {job.attempts} failed, retrying: {e}")
+                db.commit()
+                return True
+
+            job = jobs.get(job_id)
+            job.delivery_id = delivery.id
+            db.commit()
+            return True
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+
+        while not self._stopping:
+            try:
+                job_id = self._queue.get(timeout=self.poll_seconds)
+            except queue.Empty:
+                job_id = None
+            if self._stopping:
+                break
+
+            try:
+                if job_id:
+                    self.process(job_id)
+                else:
+                    for claimable_id in self._claimable_ids():
+                        self.process(claimable_id)
+            except Exception as e:
+                print(f"[WARN] Delivery worker error: {e}")
+                time.sleep(_ERROR_BACKOFF_SECONDS)
+
+    def _claimable_ids(self) -> List[str]:
+
+        db = SessionLocal()
+        try:
+            stale_before = get_current_time() - timedelta(seconds=self.stale_seconds)
+            return ServiceContainer(db, self.upload_dir).delivery_job_repository.get_claimable_ids(stale_before)
+        finally:
+            db.close()
+
+    def _fail(self, container: ServiceContainer, job: DeliveryJob, files: List[dict], error: str) -> None:
+        """Mark the job failed; nothing will reference its files, so they are released in the same commit"""
+
+        if container.delivery_job_repository.update_claimed(
+            job.id, self.holder, status="failed", error=error, finished_at=get_current_time()
+        ):
+            for file_info in files:
+                container.file_storage.release(file_info["filename"])
+        container.db.commit()
+
+
+_worker: Optional[DeliveryWorker] = None
+
+
+def start_delivery_worker(upload_dir: Path) -> Optional[DeliveryWorker]:
+    """Start the process-wide worker unless DELIVERY_WORKER=false"""
+
+    global _worker
+    if os.getenv("DELIVERY_WORKER", "true").lower() != "true":
+        print("[INFO] Delivery worker disabled (DELIVERY_WORKER=false)")
+        return None
+
+    if _worker is None:
+        _worker = DeliveryWorker(
+            upload_dir,
+            poll_seconds=float(os.getenv("DELIVERY_WORKER_POLL", "10")),
+            stale_seconds=float(os.getenv("DELIVERY_JOB_STALE", "300")),
+            max_attempts=int(os.getenv("DELIVERY_JOB_ATTEMPTS", "5")),
+            retry_seconds=float(os.getenv("DELIVERY_JOB_RETRY", "15"))
+        )
+        _worker.start()
+    return _worker
+
+
+def get_delivery_worker() -> Optional[DeliveryWorker]:
+
+    return _worker
+
+
+def stop_delivery_worker() -> None:
+
+    global _worker
+    if _worker is not None:
+        _worker.stop()
+        _worker = None
@@ -1,12 +1,23 @@
 """Dependency injection container for application services"""
 from sqlalchemy.orm import Session
 from pathlib import Path
+import os
+from functools import partial
 
 from app.infrastructure.repositories.user_repository_impl import UserRepository
 from app.infrastructure.repositories.order_repository_impl import OrderRepository
 from app.infrastructure.repositories.package_repository_impl import PackageRepository
 from app.infrastructure.repositories.message_repository_impl import MessageRepository
 from app.infrastructure.repositories.notification_repository_impl import NotificationRepository
+from app.infrastructure.repositories.order_daily_stats_repository_impl import OrderDailyStatsRepository
+from app.infrastructure.repositories.turnaround_repository_impl import TurnaroundRepository
+from app.infrastructure.repositories.revenue_cube_repository_impl import RevenueCubeRepository
+from app.infrastructure.repositories.tag_trend_repository_impl import TagTrendRepository
+from app.infrastructure.repositories.tag_repository_impl import TagRepository
+from app.infrastructure.repositories.review_aggregate_repository_impl import ReviewAggregateRepository
+from app.infrastructure.repositories.stored_blob_repository_impl import StoredBlobRepository
+from app.infrastructure.repositories.upload_session_repository_impl import UploadSessionRepository
+from app.infrastructure.repositories.delivery_job_repository_impl import DeliveryJobRepository
 from app.infrastructure.storage.file_storage import FileStorageService
 from app.application.use_cases.auth_use_case import AuthUseCase
 from app.application.use_cases.order_use_case import OrderUseCase
@@ -14,6 +25,9 @@ from app.application.use_cases.package_use_case import PackageUseCase
 from app.application.use_cases.message_use_case import MessageUseCase
 from app.application.use_cases.notification_use_case import NotificationUseCase
 from app.application.use_cases.analytics_use_case import AnalyticsUseCase
+from app.application.use_cases.turnaround_use_case import TurnaroundUseCase
+from app.application.use_cases.tag_trend_use_case import TagTrendUseCase
+from app.application.use_cases.tag_suggestion_use_case import TagSuggestionUseCase
 
 
 class ServiceContainer:
@@ -29,18 +43,34 @@ class ServiceContainer:
         self.package_repository = PackageRepository(db)
         self.message_repository = MessageRepository(db)
         self.notification_repository = NotificationRepository(db)
+        self.order_stats_repository = OrderDailyStatsRepository(db)
+        self.turnaround_repository = TurnaroundRepository(db)
+        self.revenue_cube_repository = RevenueCubeRepository(db)
+        self.tag_trend_repository = TagTrendRepository(db)
+        self.tag_repository = TagRepository(db)
+        self.review_aggregate_repository = ReviewAggregateRepository(db)
+        self.upload_session_repository = UploadSessionRepository(db)
+        self.delivery_job_repository = DeliveryJobRepository(db)
 
 
-        self.file_storage = FileStorageService(upload_dir)
+        self.blob_repository = StoredBlobRepository(db)
+        self.file_storage = FileStorageService(upload_dir, self.blob_repository)
 
 
         self.auth_use_case = AuthUseCase(self.user_repository)
+        self.turnaround_use_case = TurnaroundUseCase(self.turnaround_repository)
+        self.tag_trend_use_case = TagTrendUseCase(self.tag_trend_repository)
+        self.tag_suggestion_use_case = TagSuggestionUseCase(self.tag_repository)
         self.order_use_case = OrderUseCase(
             self.order_repository,
             self.package_repository,
             self.user_repository,
             self.notification_repository,
-            db=db
+            db=db,
+            order_stats_repository=self.order_stats_repository,
+            turnaround_use_case=self.turnaround_use_case,
+            revenue_cube_repository=self.revenue_cube_repository,
+            review_aggregate_repository=self.review_aggregate_repository
         )
         self.package_use_case = PackageUseCase(self.package_repository)
         self.message_use_case = MessageUseCase(
@@ -48,4 +78,38 @@ class ServiceContainer:
             self.order_repository
         )
         self.notification_use_case = NotificationUseCase(self.notification_repository)
-        self.analytics_use_case = AnalyticsUseCase(self.order_repository)
+        columnar_engine = None
+        if os.getenv("ANALYTICS_ENGINE", "sql").lower() == "columnar":
+            from app.infrastructure.analytics.columnar_engine import get_columnar_engine
+            columnar_engine = get_columnar_engine()
+
+        parallel_runner = None
+        if os.getenv("ANALYTICS_PARALLEL", "false").lower() == "true":
+            from app.infrastructure.database.parallel import run_concurrently
+            parallel_runner = partial(
+                run_concurrently,
+                build=partial(_read_analytics_use_case, columnar_engine=columnar_engine)
+            )
+
+        self.analytics_use_case = AnalyticsUseCase(
+            self.order_repository,
+            self.order_stats_repository,
+            revenue_cube_repository=self.revenue_cube_repository,
+            review_aggregate_repository=self.review_aggregate_repository,
+            columnar_engine=columnar_engine,
+            db=db,
+            parallel_runner=parallel_runner
+        )
+
+
+def _read_analytics_use_case(session: Session, columnar_engine=None) -> AnalyticsUseCase:
+    """AnalyticsUseCase bound to one read session, used for each concurrent dashboard query"""
+
+    return AnalyticsUseCase(
+        OrderRepository(session),
+        OrderDailyStatsRepository(session),
+        revenue_cube_repository=RevenueCubeRepository(session),
+        review_aggregate_repository=ReviewAggregateRepository(session),
+        columnar_engine=columnar_engine,
+        db=session
+    )
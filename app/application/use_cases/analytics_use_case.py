@@ -1,37 +1,102 @@
-from typing import Tuple, List
+from typing import Tuple, List, Optional, Dict, Callable
 from datetime import datetime, date, timedelta
 from app.infrastructure.utils.time_utils import get_current_time
-from sqlalchemy.orm import joinedload
+from app.infrastructure.utils.downsampling import lttb_indices
+from app.infrastructure.utils.time_buckets import (
+    GRANULARITIES, bucket_key, bucket_starts, bucket_count, next_bucket
+)
+from app.infrastructure.cache.result_cache import ResultCache
+from app.infrastructure.events import subscribe, ORDERS_CHANGED
+from sqlalchemy.orm import Session
 from app.domain.entities.Order import Order
 from app.domain.repositories.order_repository import IOrderRepository
+from app.domain.repositories.order_daily_stats_repository import IOrderDailyStatsRepository
+from app.domain.repositories.revenue_cube_repository import IRevenueCubeRepository
+from app.domain.repositories.review_aggregate_repository import IReviewAggregateRepository
+import os
+
+
+# Shared by every AnalyticsUseCase in this process; any order write empties it
+analytics_cache = ResultCache(
+    ttl_seconds=float(os.getenv("ANALYTICS_CACHE_TTL", "300")),
+    max_entries=int(os.getenv("ANALYTICS_CACHE_SIZE", "64"))
+)
+subscribe(ORDERS_CHANGED, analytics_cache.clear)
+
+SERIES_METRICS = ("revenue", "completed", "cancelled", "cancelled_revenue")
+MAX_SERIES_BUCKETS = 50000
+
+CUBE_LEVELS = ("month", "quarter", "year")
+CUBE_DIMENSIONS = ("package", "customer", "status")
 
 
 class AnalyticsUseCase:
    
 
-    def __init__(self, order_repository: IOrderRepository):
+    def __init__(
+        self,
+        order_repository: IOrderRepository,
+        order_stats_repository: Optional[IOrderDailyStatsRepository] = None,
+        revenue_cube_repository: Optional[IRevenueCubeRepository] = None,
+        review_aggregate_repository: Optional[IReviewAggregateRepository] = None,
+        columnar_engine=None,
+        db: Optional[Session] = None,
+        parallel_runner: Optional[Callable[[Dict[str, Callable]], dict]] = None
+    ):
         self.order_repository = order_repository
+        self.order_stats_repository = order_stats_repository
+        self.revenue_cube_repository = revenue_cube_repository
+        self.review_aggregate_repository = review_aggregate_repository
+        self.columnar_engine = columnar_engine
+        self.db = db
+        self.parallel_runner = parallel_runner
+
+    def get_dashboard(self, range_q: str = "monthly") -> dict:
+        """
+        Statistics, revenue and chart data for the /analytics page. With a
+        parallel_runner each part runs on its own session at the same time, so
+        the page waits for the slowest part rather than the sum of them.
+        """
+
+        tasks = {
+            "stats": lambda use_case: use_case.get_order_statistics(),
+            "revenue": lambda use_case: use_case.get_revenue_statistics(),
+            "chart": lambda use_case: use_case.calculate_chart_data(range_q),
+        }
+
+        if self.parallel_runner:
+            return self.parallel_runner(tasks)
+        return {name: task(self) for name, task in tasks.items()}
 
     def get_order_statistics(self) -> dict:
         
+        return analytics_cache.get_or_set(("order_statistics",), self._compute_order_statistics)
 
+    def _compute_order_statistics(self) -> dict:
+        
+        if self._columnar():
+            return self.columnar_engine.order_statistics()
 
-        all_orders = self.order_repository.get_all()
+
+        counts = self.order_repository.get_status_counts()
 
         stats = {
-            "total": len(all_orders),
-            "completed": len([o for o in all_orders if o.status == "Completed"]),
-            "delivered": len([o for o in all_orders if o.status == "Delivered"]),
-            "active": len([o for o in all_orders if o.status == "Active"]),
-            "late": len([o for o in all_orders if o.status == "Late"]),
-            "revision": len([o for o in all_orders if o.status == "Revision"]),
-            "dispute": len([o for o in all_orders if o.status == "In dispute"]),
-            "cancelled": len([o for o in all_orders if o.status == "Cancelled"]),
+            "total": sum(counts.values()),
+            "completed": counts.get("Completed", 0),
+            "delivered": counts.get("Delivered", 0),
+            "active": counts.get("Active", 0),
+            "late": counts.get("Late", 0),
+            "revision": counts.get("Revision", 0),
+            "dispute": counts.get("In dispute", 0),
+            "cancelled": counts.get("Cancelled", 0),
         }
 
 
-        reviews = [o.review for o in all_orders if o.review is not None]
-        stats["avg_rating"] = sum(reviews) / len(reviews) if reviews else 0.0
+        site_reviews = self.review_aggregate_repository.get() if self.review_aggregate_repository else None
+        if site_reviews:
+            stats["avg_rating"] = site_reviews.average_rating
+        else:
+            _, stats["avg_rating"] = self.order_repository.get_review_summary()
 
 
         if stats["total"] > 0:
@@ -48,22 +113,33 @@ class AnalyticsUseCase:
         now = get_current_time()
         month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
-        revenue = self.order_repository.get_revenue(user_id, "Completed", month_start)
-        cancelled_revenue = self.order_repository.get_revenue(user_id, "Cancelled", month_start)
+        return analytics_cache.get_or_set(
+            ("revenue_statistics", user_id, month_start),
+            lambda: self._compute_revenue_statistics(user_id, month_start)
+        )
 
+    def _compute_revenue_statistics(self, user_id: int | None, month_start: datetime) -> dict:
+        
 
+        if user_id is None and self._columnar():
+            return self.columnar_engine.revenue_statistics(month_start)
+
+        if self.order_stats_repository and user_id is None:
+            month_revenue = self.order_stats_repository.get_revenue_since(month_start.date())
+            revenue = month_revenue["revenue"]
+            cancelled_revenue = month_revenue["cancelled_revenue"]
+        elif self.revenue_cube_repository:
+            period = month_start.strftime('%Y-%m')
+            _, revenue = self.revenue_cube_repository.get_total(period, period, "Completed", user_id=user_id)
+            _, cancelled_revenue = self.revenue_cube_repository.get_total(period, period, "Cancelled", user_id=user_id)
+        else:
+            revenue = self.order_repository.get_revenue(user_id, "Completed", month_start)
+            cancelled_revenue = self.order_repository.get_revenue(user_id, "Cancelled", month_start)
 
-        active_orders = self.order_repository.get_by_status("Active")
-        revision_orders = self.order_repository.get_by_status("Revision")
-        delivered_orders = self.order_repository.get_by_status("Delivered")
-        dispute_orders = self.order_repository.get_by_status("In dispute")
-        late_orders = self.order_repository.get_by_status("Late")
 
-        expected_earnings = 0.0
-        all_active_orders = active_orders + revision_orders + delivered_orders + dispute_orders + late_orders
-        for order in all_active_orders:
-            if order.package and order.package.price:
-                expected_earnings += float(order.package.price)
+        expected_earnings = self.order_repository.get_revenue_for_statuses(
+            ["Active", "Revision", "Delivered", "In dispute", "Late"]
+        )
 
         return {
             "revenue": revenue,
@@ -73,68 +149,222 @@ class AnalyticsUseCase:
 
     def calculate_chart_data(self, range_q: str = "monthly") -> Tuple[List[str], List[float], List[int], List[int], List[float]]:
        
-        labels = []
-        revenue_series = []
-        completed_series = []
-        cancelled_series = []
-        cancelled_revenue_series = []
+        today = get_current_time().date()
+        return analytics_cache.get_or_set(
+            ("chart_data", range_q, today),
+            lambda: self._compute_chart_data(range_q, today)
+        )
 
+    def _compute_chart_data(self, range_q: str, today: date) -> Tuple[List[str], List[float], List[int], List[int], List[float]]:
+        
         if range_q == "yearly":
-            base = date.today().replace(day=1)
-            months = []
-            for i in range(11, -1, -1):
-                y = base.year if base.month - i > 0 else base.year - 1
-                m = ((base.month - i - 1) % 12) + 1
-                months.append((y, m))
-
-            for y, m in months:
-                start = datetime(year=y, month=m, day=1)
-                end = datetime(year=y+1, month=1, day=1) if m == 12 else datetime(year=y, month=m+1, day=1)
-
-                completed = self.order_repository.get_completed_orders(start_date=start)
-                completed_filtered = [o for o in completed if o.completed_date and o.completed_date < end]
-
-
-                all_orders = self.order_repository.get_all()
-                cancelled_filtered = [
-                    o for o in all_orders
-                    if o.status == "Cancelled" and o.cancelled_date and start <= o.cancelled_date < end
-                ]
-
-                revenue_m = sum(float(o.package.price) if o.package and o.package.price else 0.0 for o in completed_filtered)
-                cancelled_revenue_m = sum(float(o.package.price) if o.package and o.package.price else 0.0 for o in cancelled_filtered)
-
-                labels.append(start.strftime('%b %Y'))
-                revenue_series.append(round(revenue_m, 2))
-                completed_series.append(len(completed_filtered))
-                cancelled_series.append(len(cancelled_filtered))
-                cancelled_revenue_series.append(round(cancelled_revenue_m, 2))
+            base = today.replace(day=1)
+            y = base.year if base.month - 11 > 0 else base.year - 1
+            m = ((base.month - 11 - 1) % 12) + 1
+
+            granularity = "month"
+            label_format = '%b %Y'
+            range_start = datetime(year=y, month=m, day=1)
+            range_end = next_bucket(datetime(base.year, base.month, 1), granularity)
         else:
-            start = date.today() - timedelta(days=29)
-            for i in range(30):
-                d = start + timedelta(days=i)
-                d0 = datetime(d.year, d.month, d.day)
-                d1 = d0 + timedelta(days=1)
+            start = today - timedelta(days=29)
+
+            granularity = "day"
+            label_format = '%d %b'
+            range_start = datetime(start.year, start.month, start.day)
+            range_end = range_start + timedelta(days=30)
+
+
+        starts, series = self._series_totals(range_start, range_end, granularity)
+        labels = [bucket.strftime(label_format) for bucket in starts]
+
+        return labels, series["revenue"], series["completed"], series["cancelled"], series["cancelled_revenue"]
+
+    def get_series(
+        self,
+        range_start: datetime,
+        range_end: datetime,
+        granularity: str = "day",
+        metrics: Optional[List[str]] = None,
+        max_points: Optional[int] = None
+    ) -> dict:
+        """
+        Arbitrary range/granularity time series as parallel arrays, one entry per bucket.
+        With max_points, buckets are reduced with LTTB on the first metric and the
+        same buckets are kept for every other metric so the arrays stay aligned.
+        """
+
+        metrics = metrics or ["revenue"]
+        unknown = [m for m in metrics if m not in SERIES_METRICS]
+        if unknown:
+            raise ValueError(f"Unknown metric: {', '.join(unknown)}")
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Granularity must be one of: {', '.join(GRANULARITIES)}")
+        if range_end <= range_start:
+            raise ValueError("'to' must be after 'from'")
+        if bucket_count(range_start, range_end, granularity) > MAX_SERIES_BUCKETS:
+            raise ValueError(f"Range too large: at most {MAX_SERIES_BUCKETS} {granularity} buckets")
+
+        starts, series = analytics_cache.get_or_set(
+            ("series", range_start, range_end, granularity),
+            lambda: self._series_totals(range_start, range_end, granularity)
+        )
+
+        if max_points is not None and max_points < 3:
+            raise ValueError("max_points must be at least 3")
+
+        keep = lttb_indices(series[metrics[0]], max_points) if max_points else range(len(starts))
+
+        return {
+            "from": range_start.isoformat(),
+            "to": range_end.isoformat(),
+            "granularity": granularity,
+            "original_points": len(starts),
+            "points": len(keep),
+            "buckets": [bucket_key(starts[i], granularity) for i in keep],
+            "series": {metric: [series[metric][i] for i in keep] for metric in metrics},
+        }
+
+    def _series_totals(self, range_start: datetime, range_end: datetime, granularity: str) -> Tuple[List[datetime], dict]:
+        """Bucket starts plus one list per metric, from a single grouped read"""
+
+        starts = bucket_starts(range_start, range_end, granularity)
+        if not starts:
+            return [], {metric: [] for metric in SERIES_METRICS}
+
+        totals = self._bucket_totals(starts[0], next_bucket(starts[-1], granularity), granularity)
+
+        series = {metric: [] for metric in SERIES_METRICS}
+        for bucket in starts:
+            key = bucket_key(bucket, granularity)
+            completed_count, completed_revenue = totals.get((key, "Completed"), (0, 0.0))
+            cancelled_count, cancelled_revenue = totals.get((key, "Cancelled"), (0, 0.0))
+
+            series["revenue"].append(round(completed_revenue, 2))
+            series["completed"].append(completed_count)
+            series["cancelled"].append(cancelled_count)
+            series["cancelled_revenue"].append(round(cancelled_revenue, 2))
+
+        return starts, series
+
+    def _bucket_totals(self, range_start: datetime, range_end: datetime, granularity: str) -> dict:
+        """Map (bucket, status) -> (count, revenue), read from the daily rollup when available"""
+
+        if self._columnar():
+            return self.columnar_engine.bucket_totals(range_start, range_end, granularity)
+
+        totals = {}
+
+        if self.order_stats_repository and granularity != "hour":
+            for row in self.order_stats_repository.get_range(range_start.date(), range_end.date()):
+                bucket = bucket_key(row.day, granularity)
+                count, revenue = totals.get((bucket, "Completed"), (0, 0.0))
+                totals[(bucket, "Completed")] = (count + row.completed_count, revenue + row.revenue)
+                count, revenue = totals.get((bucket, "Cancelled"), (0, 0.0))
+                totals[(bucket, "Cancelled")] = (count + row.cancelled_count, revenue + row.cancelled_revenue)
+            return totals
+
+        for bucket, status, count, revenue in self.order_repository.get_bucketed_totals(range_start, range_end, granularity):
+            totals[(bucket, status)] = (count, revenue)
+        return totals
+
+    def get_revenue_breakdown(
+        self,
+        start_period: str,
+        end_period: str,
+        level: str = "month",
+        group_by: Optional[List[str]] = None,
+        statuses: Optional[List[str]] = None,
+        package_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        top: Optional[int] = None
+    ) -> dict:
+        """
+        Revenue cube query. Periods are "YYYY-MM" (inclusive) and are rolled up to
+        quarter ("YYYY-Qn") or year; group_by adds package/customer/status columns,
+        package_id/user_id drill down into one member, and statuses defaults to
+        Completed. Rows are ordered by period, then revenue (highest first);
+        top keeps the first N per period.
+        """
+
+        if not self.revenue_cube_repository:
+            raise ValueError("Revenue cube is not available")
+        if level not in CUBE_LEVELS:
+            raise ValueError(f"Level must be one of: {', '.join(CUBE_LEVELS)}")
+
+        group_by = group_by or []
+        statuses = statuses or ["Completed"]
+        unknown = [d for d in group_by if d not in CUBE_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown dimension: {', '.join(unknown)}")
+        if end_period < start_period:
+            raise ValueError("'to' must not be before 'from'")
+
+        cells = analytics_cache.get_or_set(
+            ("revenue_cube", start_period, end_period, tuple(sorted(group_by)), tuple(statuses or ()), package_id, user_id),
+            lambda: self.revenue_cube_repository.get_cells(
+                start_period, end_period, group_by, statuses, package_id, user_id
+            )
+        )
+
+        rolled = {}
+        for cell in cells:
+            row = {**cell, "period": _cube_period(cell["period"], level)}
+            key = tuple(value for name, value in row.items() if name not in ("orders", "revenue"))
+            if key in rolled:
+                rolled[key]["orders"] += row["orders"]
+                rolled[key]["revenue"] += row["revenue"]
+            else:
+                rolled[key] = row
+
+        by_period = {}
+        for row in rolled.values():
+            row["revenue"] = round(row["revenue"], 2)
+            by_period.setdefault(row["period"], []).append(row)
+
+        rows = []
+        for period in sorted(by_period):
+            period_rows = sorted(by_period[period], key=lambda r: r["revenue"], reverse=True)
+            rows.extend(period_rows[:top] if top else period_rows)
+
+        return {
+            "from": start_period,
+            "to": end_period,
+            "level": level,
+            "group_by": group_by,
+            "rows": rows,
+            "total_orders": sum(r["orders"] for r in rolled.values()),
+            "total_revenue": round(sum(r["revenue"] for r in rolled.values()), 2),
+        }
 
-                completed = self.order_repository.get_completed_orders(start_date=d0)
-                completed_filtered = [o for o in completed if o.completed_date and o.completed_date < d1]
+    def get_cache_stats(self) -> dict:
+        
+        return analytics_cache.stats()
+
+    def get_slice(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        statuses: Optional[List[str]] = None,
+        package_ids: Optional[List[int]] = None,
+        date_field: str = "completed"
+    ) -> dict:
+        
+        if not self._columnar():
+            raise ValueError("Columnar analytics engine is not enabled")
 
-                all_orders = self.order_repository.get_all()
-                cancelled_filtered = [
-                    o for o in all_orders
-                    if o.status == "Cancelled" and o.cancelled_date and d0 <= o.cancelled_date < d1
-                ]
+        if date_field not in ("completed", "cancelled", "due"):
+            raise ValueError("date_field must be completed, cancelled or due")
 
-                revenue_d = sum(float(o.package.price) if o.package and o.package.price else 0.0 for o in completed_filtered)
-                cancelled_revenue_d = sum(float(o.package.price) if o.package and o.package.price else 0.0 for o in cancelled_filtered)
+        return self.columnar_engine.slice(start, end, statuses, package_ids, date_field)
 
-                labels.append(d.strftime('%d %b'))
-                revenue_series.append(round(revenue_d, 2))
-                completed_series.append(len(completed_filtered))
-                cancelled_series.append(len(cancelled_filtered))
-                cancelled_revenue_series.append(round(cancelled_revenue_d, 2))
+    def _columnar(self) -> bool:
+        """Refresh and use the columnar snapshot when ANALYTICS_ENGINE=columnar"""
 
-        return labels, revenue_series, completed_series, cancelled_series, cancelled_revenue_series
+        if not self.columnar_engine or not self.db:
+            return False
+        self.columnar_engine.ensure_fresh(self.db)
+        return True
 
     def get_recent_reviews(self, limit: int = 12) -> List[Order]:
       
@@ -143,3 +373,12 @@ class AnalyticsUseCase:
         reviews.sort(key=lambda x: x.id, reverse=True)
         return reviews[:limit]
 
+
+def _cube_period(period: str, level: str) -> str:
+    """Roll a "YYYY-MM" cube period up to its quarter ("YYYY-Qn") or year"""
+
+    if level == "quarter":
+        return f"{period[:4]}-Q{(int(period[5:7]) - 1) // 3 + 1}"
+    if level == "year":
+        return period[:4]
+    return period
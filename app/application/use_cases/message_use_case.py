@@ -1,6 +1,7 @@
 from typing import List
 from datetime import datetime
 from app.infrastructure.utils.time_utils import get_current_time
+from app.infrastructure.metrics import live_counters
 from app.domain.entities.Message import Message
 from app.domain.repositories.message_repository import IMessageRepository
 from app.domain.repositories.order_repository import IOrderRepository
@@ -55,7 +56,9 @@ class MessageUseCase:
             is_read=False
         )
 
-        return self.message_repository.create(message)
+        message = self.message_repository.create(message)
+        live_counters.record(live_counters.MESSAGES_SENT)
+        return message
 
     def get_unread_count(self, user_id: int, is_admin: bool) -> int:
         
@@ -2,6 +2,10 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from app.infrastructure.utils.time_utils import get_current_time
+from app.infrastructure.metrics import live_counters
+from app.infrastructure.events import publish, subscribe, ORDERS_CHANGED, ORDER_COMPLETED, REVIEW_SUBMITTED
+from app.infrastructure.cache.result_cache import ResultCache
+from app.infrastructure.scheduling.work_queue import WorkQueue
 from app.domain.entities.Order import Order
 from app.domain.entities.Tag import Tag
 from app.domain.entities.Delivery import Delivery
@@ -11,7 +15,23 @@ from app.domain.repositories.order_repository import IOrderRepository
 from app.domain.repositories.package_repository import IPackageRepository
 from app.domain.repositories.user_repository import IUserRepository
 from app.domain.repositories.notification_repository import INotificationRepository
+from app.domain.repositories.order_daily_stats_repository import IOrderDailyStatsRepository
+from app.domain.repositories.revenue_cube_repository import IRevenueCubeRepository
+from app.domain.repositories.review_aggregate_repository import IReviewAggregateRepository
 from app.application.dto.order import OrderCreate, OrderDeliver, OrderReview, ResolutionRequest
+import os
+
+
+# /myorders view models keyed by (user_id, orders_version, month); stale versions age out
+order_list_cache = ResultCache(
+    ttl_seconds=float(os.getenv("ORDER_LIST_CACHE_TTL", "600")),
+    max_entries=int(os.getenv("ORDER_LIST_CACHE_SIZE", "1024"))
+)
+
+# Admin "next up" queue; transitions in this worker update it directly, anything
+# else written through the order repository marks the order for re-reading
+work_queue = WorkQueue(max_age_seconds=float(os.getenv("WORK_QUEUE_MAX_AGE", "300")))
+subscribe(ORDERS_CHANGED, work_queue.invalidate)
 
 
 class OrderUseCase:
@@ -23,13 +43,21 @@ class OrderUseCase:
         package_repository: IPackageRepository,
         user_repository: IUserRepository,
         notification_repository: INotificationRepository,
-        db: Optional[Session] = None
+        db: Optional[Session] = None,
+        order_stats_repository: Optional[IOrderDailyStatsRepository] = None,
+        turnaround_use_case=None,
+        revenue_cube_repository: Optional[IRevenueCubeRepository] = None,
+        review_aggregate_repository: Optional[IReviewAggregateRepository] = None
     ):
         self.order_repository = order_repository
         self.package_repository = package_repository
         self.user_repository = user_repository
         self.notification_repository = notification_repository
         self.db = db
+        self.order_stats_repository = order_stats_repository
+        self.turnaround_use_case = turnaround_use_case
+        self.revenue_cube_repository = revenue_cube_repository
+        self.review_aggregate_repository = review_aggregate_repository
 
     def create_order(self, user_id: int, order_data: OrderCreate) -> Order:
       
@@ -39,7 +67,8 @@ class OrderUseCase:
 
 
 
-        due_date = get_current_time() + timedelta(days=package.delivery_days)
+        placed_at = get_current_time()
+        due_date = placed_at + timedelta(days=package.delivery_days)
 
 
         order = Order(
@@ -49,7 +78,12 @@ class OrderUseCase:
             due_date=due_date,
             status="Active"
         )
+
+        # Turnaround is measured from here, on the same clock as deliveries and due dates
+        order.events.append(OrderEvent(event_type="order_placed", user_id=user_id, created_at=placed_at))
         order = self.order_repository.create(order)
+        self._requeue(order)
+        live_counters.record(live_counters.ORDERS_PLACED)
 
 
         for tag_value, mood_value in zip(order_data.tags, order_data.moods):
@@ -62,8 +96,11 @@ class OrderUseCase:
 
         return order
 
-    def deliver_order(self, order_id: int, admin_id: int, delivery_data: OrderDeliver) -> Order:
-        
+    def deliver_order(self, order_id: int, admin_id: int, delivery_data: OrderDeliver) -> Delivery:
+        """
+        Record a delivery of files already in file storage (the dicts returned by
+        FileStorageService) and move the order to Delivered in one commit.
+        """
         order = self.order_repository.get_by_id(order_id)
         if not order:
             raise ValueError("Order not found")
@@ -72,39 +109,57 @@ class OrderUseCase:
             raise ValueError("Cannot deliver order in this state")
 
 
-
-        delivery_number = 1
+        delivery_count = self.db.query(Delivery).filter(Delivery.order_id == order_id).count()
+        delivery_number = delivery_count + 1
+        primary_filename = delivery_data.files[0]['filename'] if delivery_data.files else None
 
 
         delivery = Delivery(
             order_id=order_id,
             delivery_number=delivery_number,
             response_text=delivery_data.response_text,
+            delivery_file=primary_filename,
             delivered_at=get_current_time(),
             user_id=admin_id
         )
-
-
-
-        order.status = "Delivered"
-        order.response = delivery_data.response_text
-        order = self.order_repository.update(order)
-
-
-        event = OrderEvent(
+        self.db.add(delivery)
+        self.db.flush()
+
+        for file_info in delivery_data.files:
+            self.db.add(DeliveryFile(
+                delivery_id=delivery.id,
+                filename=file_info['filename'],
+                original_filename=file_info['original_filename'],
+                file_size=file_info['size'],
+                blob_sha256=file_info['sha256'],
+                uploaded_at=get_current_time()
+            ))
+
+        self.db.add(OrderEvent(
             order_id=order.id,
             event_type="delivered",
             user_id=admin_id,
             event_message=delivery_data.response_text,
             created_at=get_current_time()
-        )
+        ))
 
 
+        order.status = "Delivered"
+        order.response = delivery_data.response_text
+        order.delivery_file = primary_filename
+        if self.order_stats_repository:
+            self.order_stats_repository.record_delivered(delivery.delivered_at.date(), order.package_id)
+        if self.turnaround_use_case:
+            self.turnaround_use_case.record_delivery(order, delivery.delivered_at, is_first=delivery_number == 1)
+        order = self.order_repository.update(order)
+        self._requeue(order)
+        live_counters.record(live_counters.DELIVERIES)
+
 
         self._notify_user(order.user_id, order.id, "delivered",
                          "Order Delivered", f"Your order #{order.id} has been delivered!")
 
-        return order
+        return delivery
 
     def complete_order(self, order_id: int, user_id: int) -> Order:
         
@@ -120,7 +175,22 @@ class OrderUseCase:
 
         order.status = "Completed"
         order.completed_date = get_current_time()
+        if self.order_stats_repository:
+            self.order_stats_repository.record_completed(
+                order.completed_date.date(), order.package_id, self._order_price(order)
+            )
+        if self.turnaround_use_case:
+            self.turnaround_use_case.record_completion(order)
+        if self.revenue_cube_repository:
+            self.revenue_cube_repository.record(
+                order.completed_date.strftime('%Y-%m'), order.package_id, order.user_id,
+                "Completed", self._order_price(order)
+            )
+        if self.review_aggregate_repository:
+            self.review_aggregate_repository.record_completed(order.package_id)
         order = self.order_repository.update(order)
+        self._requeue(order)
+        publish(ORDER_COMPLETED, order_id=order.id)
 
 
         event = OrderEvent(
@@ -149,9 +219,12 @@ class OrderUseCase:
         if order.status != "Completed":
             raise ValueError("Can only review completed orders")
 
+        if self.review_aggregate_repository:
+            self.review_aggregate_repository.record_review(order.package_id, review_data.review, order.review)
         order.review = review_data.review
         order.review_text = review_data.review_text
         order = self.order_repository.update(order)
+        publish(REVIEW_SUBMITTED, order_id=order.id)
 
 
         self._notify_admins(order, "review_left", f"{review_data.review}-Star Review",
@@ -163,10 +236,71 @@ class OrderUseCase:
      
         return self.order_repository.get_with_relationships(user_id=user_id)
 
+    def get_order_list_view(self, user_id: int) -> dict:
+        """
+        The /myorders view model as plain dicts, cached per user under the user's
+        orders_version, so it is only rebuilt after one of their orders changed
+        """
+
+        now = get_current_time()
+        period = now.strftime('%Y-%m')
+        version = self.user_repository.get_orders_version(user_id)
+
+        return order_list_cache.get_or_set(
+            (user_id, version, period),
+            lambda: self._build_order_list_view(user_id, period)
+        )
+
+    def _build_order_list_view(self, user_id: int, period: str) -> dict:
+
+        orders = [
+            {
+                "id": order.id,
+                "status": order.status,
+                "due_date": order.due_date,
+                "package": {"name": order.package.name, "price": order.package.price} if order.package else None,
+            }
+            for order in self.get_orders_for_user(user_id)
+        ]
+
+        if self.revenue_cube_repository:
+            _, spent = self.revenue_cube_repository.get_total(period, period, "Completed", user_id=user_id)
+        else:
+            month_start = datetime.strptime(period, '%Y-%m')
+            spent = self.order_repository.get_revenue(user_id, "Completed", month_start)
+
+        return {"orders": orders, "spent_month": round(spent, 2)}
+
     def get_all_orders(self) -> List[Order]:
         
         return self.order_repository.get_with_relationships(admin_view=True)
 
+    def get_work_queue(self, limit: int = 20) -> dict:
+        """The limit most urgent actionable orders, earliest deadline first"""
+
+        if work_queue.needs_load():
+            work_queue.load(self.order_repository.get_work_queue_rows())
+        else:
+            dirty = work_queue.take_dirty()
+            if dirty:
+                work_queue.refresh(dirty, self.order_repository.get_work_queue_rows(dirty))
+
+        return {"total": len(work_queue), "orders": work_queue.top(limit)}
+
+    def _requeue(self, order: Order):
+
+        work_queue.put(
+            order.id,
+            order.status,
+            order.due_date,
+            order.user.username if order.user else None,
+            order.package.name if order.package else None
+        )
+
+    def _order_price(self, order: Order) -> float:
+        
+        return float(order.package.price) if order.package and order.package.price else 0.0
+
     def _notify_admins(self, order: Order, notification_type: str, title: str, message: str):
        
         from app.domain.entities.Notification import Notification
@@ -215,6 +349,7 @@ class OrderUseCase:
         order.cancellation_message = resolution_data.cancellation_message
         order.requested_by_admin = "true" if self.user_repository.get_by_id(user_id).is_admin else "false"
         order = self.order_repository.update(order)
+        self._requeue(order)
 
 
         if self.db:
@@ -264,6 +399,7 @@ class OrderUseCase:
             order.due_date = order.due_date + timedelta(days=resolution_data.extension_days)
 
         order = self.order_repository.update(order)
+        self._requeue(order)
 
 
         if self.db:
@@ -305,6 +441,7 @@ class OrderUseCase:
         order.request_message = resolution_data.dispute_message or resolution_data.message
         order.requested_by_admin = "false"
         order = self.order_repository.update(order)
+        self._requeue(order)
 
 
         if self.db:
@@ -337,6 +474,15 @@ class OrderUseCase:
         if order.request_type == "cancellation":
             order.status = "Cancelled"
             order.cancelled_date = get_current_time()
+            if self.order_stats_repository:
+                self.order_stats_repository.record_cancelled(
+                    order.cancelled_date.date(), order.package_id, self._order_price(order)
+                )
+            if self.revenue_cube_repository:
+                self.revenue_cube_repository.record(
+                    order.cancelled_date.strftime('%Y-%m'), order.package_id, order.user_id,
+                    "Cancelled", self._order_price(order)
+                )
         elif order.request_type == "extend_delivery":
             # If admin requested extension and user is approving, extend the due_date now
             if order.requested_by_admin == "true" and order.extension_days and order.due_date:
@@ -360,6 +506,7 @@ class OrderUseCase:
         order.requested_by_admin = None
 
         order = self.order_repository.update(order)
+        self._requeue(order)
 
 
         if self.db:
@@ -417,6 +564,7 @@ class OrderUseCase:
         order.requested_by_admin = None
 
         order = self.order_repository.update(order)
+        self._requeue(order)
 
 
         if self.db:
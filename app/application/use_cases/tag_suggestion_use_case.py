@@ -0,0 +1,41 @@
+import os
+from typing import List, Iterable
+from app.domain.entities.Tag import Tag
+from app.domain.repositories.tag_repository import ITagRepository
+from app.infrastructure.search.tag_prefix_index import TagPrefixIndex, TAG, MOOD
+
+
+# Shared by every request in this process. A name must have been ordered
+# TAG_SUGGEST_MIN_COUNT times before it is suggested to other customers.
+tag_index = TagPrefixIndex(
+    max_age_seconds=float(os.getenv("TAG_INDEX_MAX_AGE", "600")),
+    min_count=int(os.getenv("TAG_SUGGEST_MIN_COUNT", "2"))
+)
+
+MAX_SUGGESTIONS = 20
+
+
+class TagSuggestionUseCase:
+    
+
+    def __init__(self, tag_repository: ITagRepository, index: TagPrefixIndex = tag_index):
+        self.tag_repository = tag_repository
+        self.index = index
+
+    def suggest(self, query: str, kind: str = TAG, limit: int = 10) -> List[dict]:
+        
+        if kind not in (TAG, MOOD):
+            raise ValueError("kind must be tag or mood")
+        if limit < 1 or limit > MAX_SUGGESTIONS:
+            raise ValueError(f"limit must be between 1 and {MAX_SUGGESTIONS}")
+
+        if self.index.needs_load():
+            self.index.load(self.tag_repository.get_name_counts(), self.tag_repository.get_mood_counts())
+
+        return self.index.suggest(query, kind, limit)
+
+    def record_tags(self, tags: Iterable[Tag]) -> None:
+        """Call after the tags are committed"""
+
+        tags = list(tags)
+        self.index.add([t.name for t in tags], [t.mood for t in tags])
@@ -0,0 +1,95 @@
+from typing import Optional, List, Dict, Iterable
+from datetime import datetime, date, timedelta
+from app.domain.entities.Order import Order
+from app.domain.entities.Tag import Tag
+from app.domain.repositories.tag_trend_repository import ITagTrendRepository
+from app.infrastructure.utils.time_utils import get_current_time
+from app.infrastructure.utils.time_buckets import bucket_start
+from app.infrastructure.utils.tag_keywords import tag_keywords, normalize_mood
+
+
+MOOD = "mood"
+KEYWORD = "keyword"
+
+MAX_TREND_WEEKS = 104
+
+
+class TagTrendUseCase:
+    """
+    Weekly mood and keyword counters, incremented as tags are stored so trends
+    never scan the tags table. A tag counts in the week its order was placed.
+    """
+
+    def __init__(self, tag_trend_repository: ITagTrendRepository):
+        self.tag_trend_repository = tag_trend_repository
+
+    def record_tags(self, order: Order, tags: Iterable[Tag], placed_at: Optional[datetime] = None) -> None:
+        """Call before the commit that stores the tags"""
+
+        week = _week_of(placed_at or get_current_time())
+        for kind, value in self._values(tags):
+            self.tag_trend_repository.add(week, order.package_id, kind, value)
+
+    def get_trends(self, weeks: int = 8, package_id: Optional[int] = None, limit: int = 10) -> dict:
+        """
+        Top moods and keywords over the last `weeks` weeks (current week included),
+        each with its weekly counts, oldest week first
+        """
+
+        if weeks < 1 or weeks > MAX_TREND_WEEKS:
+            raise ValueError(f"weeks must be between 1 and {MAX_TREND_WEEKS}")
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+
+        end_week = _week_of(get_current_time())
+        week_starts = [end_week - timedelta(weeks=i) for i in range(weeks - 1, -1, -1)]
+
+        trends = {"weeks": [w.isoformat() for w in week_starts], "package_id": package_id}
+        for kind, key in ((MOOD, "moods"), (KEYWORD, "keywords")):
+            per_value: Dict[str, Dict[date, int]] = {}
+            for week, value, count in self.tag_trend_repository.get_weekly(week_starts[0], end_week, kind, package_id):
+                per_value.setdefault(value, {})[week] = count
+
+            ranked = sorted(per_value.items(), key=lambda item: (-sum(item[1].values()), item[0]))[:limit]
+            trends[key] = [
+                {
+                    "value": value,
+                    "total": sum(by_week.values()),
+                    "series": [by_week.get(w, 0) for w in week_starts],
+                }
+                for value, by_week in ranked
+            ]
+
+        return trends
+
+    def rebuild(self) -> int:
+        """Recount every stored tag; orders without an order_placed event fall back to due_date - delivery_days"""
+
+        counters: Dict[tuple, int] = {}
+        for package_id, delivery_days, due_date, placed_at, name, mood in self.tag_trend_repository.get_tag_history():
+            if not placed_at and due_date:
+                placed_at = due_date - timedelta(days=delivery_days or 0)
+            if not placed_at:
+                continue
+
+            week = _week_of(placed_at)
+            for kind, value in self._values([Tag(name=name, mood=mood)]):
+                key = (week, package_id, kind, value)
+                counters[key] = counters.get(key, 0) + 1
+
+        return self.tag_trend_repository.replace_all(counters)
+
+    def _values(self, tags: Iterable[Tag]) -> List[tuple]:
+
+        values = []
+        for tag in tags:
+            mood = normalize_mood(tag.mood)
+            if mood:
+                values.append((MOOD, mood))
+            values.extend((KEYWORD, keyword) for keyword in tag_keywords(tag.name))
+        return values
+
+
+def _week_of(value: datetime) -> date:
+
+    return bucket_start(value, "week").date()
@@ -0,0 +1,140 @@
+from typing import Optional, Dict
+from datetime import datetime, timedelta
+from app.domain.entities.Order import Order
+from app.domain.repositories.turnaround_repository import ITurnaroundRepository
+from app.infrastructure.utils.latency_histogram import bucket_for, merge, percentiles
+
+
+PLACED_TO_FIRST_DELIVERY = "placed_to_first_delivery"
+DELIVERY_TO_COMPLETION = "delivery_to_completion"
+ON_TIME = "on_time"
+
+LATENCY_METRICS = (PLACED_TO_FIRST_DELIVERY, DELIVERY_TO_COMPLETION)
+REPORT_PERCENTILES = [50, 90, 99]
+
+
+class TurnaroundUseCase:
+    """
+    Keeps per-month, per-package latency histograms up to date as deliveries
+    and completions are written, so percentiles never replay order history.
+    Orders carry no creation timestamp: placement is the first "order_placed"
+    event, falling back to due_date minus the package delivery days.
+    """
+
+    def __init__(self, turnaround_repository: ITurnaroundRepository):
+        self.turnaround_repository = turnaround_repository
+
+    def record_delivery(self, order: Order, delivered_at: datetime, is_first: bool) -> None:
+        """Call before the delivery commit; only the first delivery of an order is measured"""
+
+        if not is_first:
+            return
+
+        period = delivered_at.strftime('%Y-%m')
+        placed_at = self.turnaround_repository.get_placed_at(order.id) or self._estimated_placed_at(order)
+
+        if placed_at:
+            self.turnaround_repository.add(
+                period, order.package_id, PLACED_TO_FIRST_DELIVERY, bucket_for(_minutes(placed_at, delivered_at))
+            )
+
+        if order.due_date:
+            self.turnaround_repository.add(
+                period, order.package_id, ON_TIME, 1 if delivered_at <= order.due_date else 0
+            )
+
+    def record_completion(self, order: Order) -> None:
+        """Call before the completion commit, with completed_date already set"""
+
+        last_delivered_at = self.turnaround_repository.get_last_delivered_at(order.id)
+        if not last_delivered_at or not order.completed_date:
+            return
+
+        self.turnaround_repository.add(
+            order.completed_date.strftime('%Y-%m'),
+            order.package_id,
+            DELIVERY_TO_COMPLETION,
+            bucket_for(_minutes(last_delivered_at, order.completed_date))
+        )
+
+    def get_report(self, start_period: str, end_period: str, package_id: Optional[int] = None) -> dict:
+        """p50/p90/p99 (hours) and on-time share per month, plus the whole range merged"""
+
+        by_period: Dict[str, Dict[str, Dict[int, int]]] = {}
+        for period, metric, bucket, count in self.turnaround_repository.get_histograms(start_period, end_period, package_id):
+            by_period.setdefault(period, {}).setdefault(metric, {})[bucket] = count
+
+        periods = [
+            {"period": period, **self._summarize(histograms)}
+            for period, histograms in sorted(by_period.items())
+        ]
+
+        overall = {
+            metric: merge(h.get(metric, {}) for h in by_period.values())
+            for metric in LATENCY_METRICS + (ON_TIME,)
+        }
+
+        return {
+            "from": start_period,
+            "to": end_period,
+            "package_id": package_id,
+            "periods": periods,
+            "overall": self._summarize(overall),
+        }
+
+    def rebuild(self) -> int:
+        """Recompute every histogram from deliveries, completions and placement events"""
+
+        cells: Dict[tuple, int] = {}
+
+        def add(period, package_id, metric, bucket):
+            key = (period, package_id, metric, bucket)
+            cells[key] = cells.get(key, 0) + 1
+
+        for package_id, delivery_days, due_date, completed_date, placed_at, first_delivered_at, last_delivered_at in (
+            self.turnaround_repository.get_delivery_timelines()
+        ):
+            if not placed_at and due_date and delivery_days:
+                placed_at = due_date - timedelta(days=delivery_days)
+
+            period = first_delivered_at.strftime('%Y-%m')
+            if placed_at:
+                add(period, package_id, PLACED_TO_FIRST_DELIVERY, bucket_for(_minutes(placed_at, first_delivered_at)))
+            if due_date:
+                add(period, package_id, ON_TIME, 1 if first_delivered_at <= due_date else 0)
+
+            if completed_date and last_delivered_at:
+                add(completed_date.strftime('%Y-%m'), package_id, DELIVERY_TO_COMPLETION,
+                    bucket_for(_minutes(last_delivered_at, completed_date)))
+
+        return self.turnaround_repository.replace_all(cells)
+
+    def _summarize(self, histograms: Dict[str, Dict[int, int]]) -> dict:
+
+        summary = {}
+        for metric in LATENCY_METRICS:
+            histogram = histograms.get(metric, {})
+            values = percentiles(histogram, REPORT_PERCENTILES)
+            summary[metric] = {
+                "count": sum(histogram.values()),
+                **{
+                    f"p{p}_hours": round(values[p] / 60.0, 2) if values[p] is not None else None
+                    for p in REPORT_PERCENTILES
+                },
+            }
+
+        on_time = histograms.get(ON_TIME, {})
+        measured = on_time.get(0, 0) + on_time.get(1, 0)
+        summary["on_time_share"] = round(on_time.get(1, 0) / measured, 4) if measured else None
+        return summary
+
+    def _estimated_placed_at(self, order: Order) -> Optional[datetime]:
+
+        if order.due_date and order.package and order.package.delivery_days:
+            return order.due_date - timedelta(days=order.package.delivery_days)
+        return None
+
+
+def _minutes(start: datetime, end: datetime) -> float:
+
+    return max((end - start).total_seconds() / 60.0, 0.0)
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, DateTime
+from app.domain.base import Base
+
+
+class DataMigration(Base):
+    """A one-off data migration run at startup, recorded so it is not run again"""
+    __tablename__ = "data_migrations"
+
+    name = Column(String(100), primary_key=True)
+    applied_at = Column(DateTime, nullable=False)
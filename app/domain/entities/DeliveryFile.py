@@ -15,6 +15,7 @@ class DeliveryFile(Base):
     filename = Column(String(255), nullable=False)
     original_filename = Column(String(255), nullable=True)
     file_size = Column(Integer, nullable=True)
+    blob_sha256 = Column(String(64), nullable=True, index=True)
     uploaded_at = Column(DateTime, nullable=False)
 
 
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from app.domain.base import Base
+
+
+class DeliveryJob(Base):
+    """
+    A delivery whose files are stored but which is still to be recorded by the
+    delivery worker; status is pending, running, done or failed. A pending job
+    that failed transiently waits for next_attempt_at.
+    """
+    __tablename__ = "delivery_jobs"
+
+    id = Column(String(32), primary_key=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    response_text = Column(Text, nullable=False)
+    files = Column(Text, nullable=False)
+    status = Column(String(20), nullable=False, default="pending", index=True)
+    error = Column(Text, nullable=True)
+    delivery_id = Column(Integer, ForeignKey("deliveries.id"), nullable=True)
+    claimed_by = Column(String(100), nullable=True)
+    claimed_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, func
 from sqlalchemy.orm import relationship
 from app.domain.base import Base
 from typing import TYPE_CHECKING
@@ -35,6 +35,10 @@ class Order(Base):
     extension_reason = Column(Text, nullable=True)
     requested_by_admin = Column(String(10), nullable=True)
 
+    updated_at = Column(DateTime, nullable=True, index=True, server_default=func.now(), onupdate=func.now())
+    # Incremented on every delivery, delivery file, event or message insert; keys the rendered fragments
+    content_version = Column(Integer, nullable=False, default=0, server_default="0")
+
     user = relationship("User", back_populates="orders")
     package = relationship("Package")
     tags = relationship("Tag", back_populates="order")
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, Float, Date, UniqueConstraint
+from app.domain.base import Base
+
+
+# NULL never collides in a unique key, so orders without a package use 0
+NO_PACKAGE = 0
+
+
+class OrderDailyStat(Base):
+    """Per-day, per-package rollup of order outcomes, maintained alongside status changes; package_id 0 is no package"""
+    __tablename__ = "order_daily_stats"
+    __table_args__ = (
+        UniqueConstraint("day", "package_id", name="uq_order_daily_stats_day_package"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False, index=True)
+    package_id = Column(Integer, nullable=False, default=NO_PACKAGE)
+    completed_count = Column(Integer, nullable=False, default=0)
+    cancelled_count = Column(Integer, nullable=False, default=0)
+    delivered_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    cancelled_revenue = Column(Float, nullable=False, default=0.0)
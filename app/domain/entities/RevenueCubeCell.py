@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, Float, String, UniqueConstraint
+from app.domain.base import Base
+
+
+# NULL never collides in a unique key, so orders without a package or customer use 0
+NO_PACKAGE = 0
+NO_CUSTOMER = 0
+
+
+class RevenueCubeCell(Base):
+    """Orders and revenue per month, package, customer and terminal status; package_id and user_id 0 are none"""
+    __tablename__ = "revenue_cube"
+    __table_args__ = (
+        UniqueConstraint("period", "package_id", "user_id", "status", name="uq_revenue_cube_cell"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    period = Column(String(7), nullable=False, index=True)
+    package_id = Column(Integer, nullable=False, default=NO_PACKAGE)
+    user_id = Column(Integer, nullable=False, default=NO_CUSTOMER, index=True)
+    status = Column(String(20), nullable=False)
+    order_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, UniqueConstraint
+from app.domain.base import Base
+
+
+SITE_WIDE = 0
+
+
+class ReviewAggregate(Base):
+    """Review count, rating sum and star histogram per package; package_id 0 is the site-wide row"""
+    __tablename__ = "review_aggregates"
+    __table_args__ = (
+        UniqueConstraint("package_id", name="uq_review_aggregates_package"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    package_id = Column(Integer, nullable=False)
+    review_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    stars_1 = Column(Integer, nullable=False, default=0)
+    stars_2 = Column(Integer, nullable=False, default=0)
+    stars_3 = Column(Integer, nullable=False, default=0)
+    stars_4 = Column(Integer, nullable=False, default=0)
+    stars_5 = Column(Integer, nullable=False, default=0)
+    completed_count = Column(Integer, nullable=False, default=0)
+
+    @property
+    def average_rating(self) -> float:
+        return self.rating_sum / self.review_count if self.review_count else 0.0
+
+    @property
+    def histogram(self) -> dict:
+        return {stars: getattr(self, f"stars_{stars}") for stars in range(1, 6)}
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, DateTime
+from app.domain.base import Base
+
+
+class SchedulerLease(Base):
+    """Which worker currently runs a background job, until expires_at unless renewed"""
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(50), primary_key=True)
+    holder = Column(String(100), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime
+from app.domain.base import Base
+
+
+class StoredBlob(Base):
+    """One uploaded file body, stored once under its SHA-256; ref_count counts the delivery files and avatars using it"""
+    __tablename__ = "stored_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    path = Column(String(255), nullable=False, unique=True)
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Date, UniqueConstraint
+from app.domain.base import Base
+
+
+# NULL never collides in a unique key, so orders without a package use 0
+NO_PACKAGE = 0
+
+
+class TagTrendCounter(Base):
+    """How many ordered tags used a mood or keyword, per week (starting Monday) and package; package_id 0 is no package"""
+    __tablename__ = "tag_trend_counters"
+    __table_args__ = (
+        UniqueConstraint("week", "package_id", "kind", "value", name="uq_tag_trend_counter"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    week = Column(Date, nullable=False, index=True)
+    package_id = Column(Integer, nullable=False, default=NO_PACKAGE)
+    kind = Column(String(10), nullable=False)
+    value = Column(String(100), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
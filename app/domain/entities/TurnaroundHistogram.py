@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+from app.domain.base import Base
+
+
+# NULL never collides in a unique key, so orders without a package use 0
+NO_PACKAGE = 0
+
+
+class TurnaroundHistogram(Base):
+    """One log-scale latency bucket of a turnaround metric, per month and package; package_id 0 is no package"""
+    __tablename__ = "turnaround_histograms"
+    __table_args__ = (
+        UniqueConstraint("period", "package_id", "metric", "bucket", name="uq_turnaround_histogram_cell"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    period = Column(String(7), nullable=False, index=True)
+    package_id = Column(Integer, nullable=False, default=NO_PACKAGE)
+    metric = Column(String(40), nullable=False)
+    bucket = Column(Integer, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, DateTime
+from app.domain.base import Base
+
+
+class UploadSession(Base):
+    """
+    A resumable delivery upload in progress; bytes_received is the offset the
+    next chunk must start at. writer holds the PATCH that is currently writing
+    the part file, so a second PATCH at the same offset can't write over it.
+    """
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(32), primary_key=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    filename = Column(String(255), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    bytes_received = Column(BigInteger, nullable=False, default=0)
+    writer = Column(String(32), nullable=True)
+    writing_since = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False, index=True)
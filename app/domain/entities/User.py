@@ -19,6 +19,8 @@ class User(Base):
     hashed_password = Column(String(255), nullable=False)
     is_admin = Column(Boolean, default=False)
     avatar = Column(String(255), nullable=True)
+    # Bumped on every change to the user's orders, tags or deliveries; keys cached order lists
+    orders_version = Column(Integer, nullable=False, default=0, server_default="0")
     orders = relationship("Order", back_populates="user")
     messages = relationship("Message", back_populates="sender", cascade="all, delete-orphan")
     notifications = relationship("Notification", back_populates="user", cascade="all, delete-orphan")
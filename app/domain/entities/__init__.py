@@ -8,6 +8,16 @@ from app.domain.entities.DeliveryFile import DeliveryFile
 from app.domain.entities.OrderEvent import OrderEvent
 from app.domain.entities.Message import Message
 from app.domain.entities.Notification import Notification
+from app.domain.entities.OrderDailyStat import OrderDailyStat
+from app.domain.entities.TurnaroundHistogram import TurnaroundHistogram
+from app.domain.entities.RevenueCubeCell import RevenueCubeCell
+from app.domain.entities.TagTrendCounter import TagTrendCounter
+from app.domain.entities.ReviewAggregate import ReviewAggregate
+from app.domain.entities.SchedulerLease import SchedulerLease
+from app.domain.entities.StoredBlob import StoredBlob
+from app.domain.entities.UploadSession import UploadSession
+from app.domain.entities.DeliveryJob import DeliveryJob
+from app.domain.entities.DataMigration import DataMigration
 
 __all__ = [
     "User",
@@ -19,4 +29,14 @@ __all__ = [
     "OrderEvent",
     "Message",
     "Notification",
+    "OrderDailyStat",
+    "TurnaroundHistogram",
+    "RevenueCubeCell",
+    "TagTrendCounter",
+    "ReviewAggregate",
+    "SchedulerLease",
+    "StoredBlob",
+    "UploadSession",
+    "DeliveryJob",
+    "DataMigration",
 ]
@@ -0,0 +1,40 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+from app.domain.entities.DeliveryJob import DeliveryJob
+
+
+class IDeliveryJobRepository(ABC):
+
+
+    @abstractmethod
+    def create(self, job: DeliveryJob) -> DeliveryJob:
+
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[DeliveryJob]:
+
+        pass
+
+    @abstractmethod
+    def claim(self, job_id: str, holder: str, stale_before: datetime) -> bool:
+        """
+        Mark the job running for holder and count the attempt if it is pending
+        and due, or running but claimed before stale_before (its worker died).
+        The caller commits.
+        """
+        pass
+
+    @abstractmethod
+    def update_claimed(self, job_id: str, holder: str, **values) -> bool:
+        """
+        Set values only if the job is still running for holder, not reclaimed
+        as stale by another worker. The caller commits.
+        """
+        pass
+
+    @abstractmethod
+    def get_claimable_ids(self, stale_before: datetime, limit: int = 20) -> List[str]:
+
+        pass
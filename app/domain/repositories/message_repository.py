@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List
 from app.domain.entities.Message import Message
 
 
@@ -31,3 +31,7 @@ class IMessageRepository(ABC):
         
         pass
 
+    @abstractmethod
+    def mark_order_read(self, order_id: int, reader_id: int) -> int:
+        """Mark the order's messages from other senders as read, and commit if any changed"""
+        pass
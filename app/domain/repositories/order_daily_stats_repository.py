@@ -0,0 +1,38 @@
+from abc import ABC, abstractmethod
+from typing import Optional, List
+from datetime import date
+from app.domain.entities.OrderDailyStat import OrderDailyStat
+
+
+class IOrderDailyStatsRepository(ABC):
+    
+
+    @abstractmethod
+    def record_completed(self, day: date, package_id: Optional[int], price: float) -> None:
+        """Count a completion; the caller's commit persists it together with the order"""
+        pass
+
+    @abstractmethod
+    def record_cancelled(self, day: date, package_id: Optional[int], price: float) -> None:
+        
+        pass
+
+    @abstractmethod
+    def record_delivered(self, day: date, package_id: Optional[int]) -> None:
+        
+        pass
+
+    @abstractmethod
+    def get_range(self, start_day: date, end_day: date) -> List[OrderDailyStat]:
+        """Rows with start_day <= day < end_day"""
+        pass
+
+    @abstractmethod
+    def get_revenue_since(self, start_day: date) -> dict:
+        """Return {"revenue": ..., "cancelled_revenue": ...} summed from start_day onwards"""
+        pass
+
+    @abstractmethod
+    def rebuild(self) -> int:
+        """Recompute every row from orders and deliveries, returns the number of rows written"""
+        pass
@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 from app.domain.entities.Order import Order
+from app.domain.entities.Delivery import Delivery
+from app.domain.entities.OrderEvent import OrderEvent
 
 
 class IOrderRepository(ABC):
@@ -42,6 +44,11 @@ class IOrderRepository(ABC):
         
         pass
 
+    @abstractmethod
+    def get_timeline(self, order_id: int) -> Tuple[List[Delivery], List[OrderEvent]]:
+        """Deliveries (with user and files) and events (with user) of one order"""
+        pass
+
     @abstractmethod
     def create(self, order: Order) -> Order:
         
@@ -57,6 +64,31 @@ class IOrderRepository(ABC):
         
         pass
 
+    @abstractmethod
+    def get_upcoming_deadlines(self, until: datetime) -> List[Tuple[datetime, int]]:
+        """(due_date, order_id) of Active/Revision orders due before until"""
+        pass
+
+    @abstractmethod
+    def get_deadline_states(self, order_ids: List[int]) -> List[Tuple[int, str, Optional[datetime]]]:
+        """(order_id, status, due_date) of the given orders"""
+        pass
+
+    @abstractmethod
+    def get_work_queue_rows(self, order_ids: Optional[List[int]] = None) -> List[Tuple[int, str, Optional[datetime], Optional[str], Optional[str]]]:
+        """(order_id, status, due_date, username, package name) of the given orders, or of every actionable order"""
+        pass
+
+    @abstractmethod
+    def mark_late(self, order_ids: List[int]) -> int:
+        """Flip the given Active/Revision orders whose due_date has passed to Late, and commit"""
+        pass
+
+    @abstractmethod
+    def revert_late(self, order_ids: List[int]) -> int:
+        """Flip the given Late orders whose due_date is in the future back to Active, and commit"""
+        pass
+
     @abstractmethod
     def get_completed_orders(self, user_id: Optional[int] = None, start_date: Optional[datetime] = None) -> List[Order]:
         
@@ -67,3 +99,23 @@ class IOrderRepository(ABC):
        
         pass
 
+
+    @abstractmethod
+    def get_status_counts(self) -> Dict[str, int]:
+        """Count orders per status in a single GROUP BY"""
+        pass
+
+    @abstractmethod
+    def get_review_summary(self) -> Tuple[int, float]:
+        """Return (review count, average rating) over all reviewed orders"""
+        pass
+
+    @abstractmethod
+    def get_revenue_for_statuses(self, statuses: List[str]) -> float:
+        """Sum package prices of orders currently in any of the given statuses"""
+        pass
+
+    @abstractmethod
+    def get_bucketed_totals(self, start_date: datetime, end_date: datetime, granularity: str = "day") -> List[Tuple[str, str, int, float]]:
+        """Return (bucket, status, order count, revenue) rows for Completed and Cancelled orders; granularity is hour, day, week or month"""
+        pass
@@ -0,0 +1,44 @@
+from abc import ABC, abstractmethod
+from typing import Optional, List, Tuple
+
+
+class IRevenueCubeRepository(ABC):
+    
+
+    @abstractmethod
+    def record(self, period: str, package_id: Optional[int], user_id: Optional[int], status: str, price: float) -> None:
+        """Count one order reaching a terminal status; the caller's commit persists it"""
+        pass
+
+    @abstractmethod
+    def get_cells(
+        self,
+        start_period: str,
+        end_period: str,
+        dimensions: List[str],
+        statuses: Optional[List[str]] = None,
+        package_id: Optional[int] = None,
+        user_id: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Month-level rows for start_period <= period <= end_period ("YYYY-MM"), grouped
+        by period plus any of the "package", "customer", "status" dimensions
+        """
+        pass
+
+    @abstractmethod
+    def get_total(
+        self,
+        start_period: str,
+        end_period: str,
+        status: str,
+        package_id: Optional[int] = None,
+        user_id: Optional[int] = None
+    ) -> Tuple[int, float]:
+        """(order_count, revenue) over the period range"""
+        pass
+
+    @abstractmethod
+    def rebuild(self) -> int:
+        """Recompute every cell from orders and packages, returns the number of cells written"""
+        pass
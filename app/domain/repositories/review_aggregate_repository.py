@@ -0,0 +1,35 @@
+from abc import ABC, abstractmethod
+from typing import Optional, List
+from app.domain.entities.ReviewAggregate import ReviewAggregate, SITE_WIDE
+
+
+class IReviewAggregateRepository(ABC):
+    
+
+    @abstractmethod
+    def record_review(self, package_id: Optional[int], rating: int, previous_rating: Optional[int] = None) -> None:
+        """
+        Count a review on the package and site-wide rows. previous_rating is the
+        rating being overwritten, if any. The caller's commit persists it.
+        """
+        pass
+
+    @abstractmethod
+    def record_completed(self, package_id: Optional[int]) -> None:
+        
+        pass
+
+    @abstractmethod
+    def get(self, package_id: int = SITE_WIDE) -> Optional[ReviewAggregate]:
+        
+        pass
+
+    @abstractmethod
+    def get_all(self) -> List[ReviewAggregate]:
+        
+        pass
+
+    @abstractmethod
+    def rebuild(self) -> int:
+        """Recompute every row from orders, returns the number of rows written"""
+        pass
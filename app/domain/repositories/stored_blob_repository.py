@@ -0,0 +1,62 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, List, Optional
+from app.domain.entities.StoredBlob import StoredBlob
+
+
+class IStoredBlobRepository(ABC):
+
+
+    @abstractmethod
+    def get(self, sha256: str) -> Optional[StoredBlob]:
+
+        pass
+
+    @abstractmethod
+    def get_many(self, hashes: List[str]) -> List[StoredBlob]:
+
+        pass
+
+    @abstractmethod
+    def acquire(self, sha256: str, path: str, size: int) -> str:
+        """
+        Add a reference to the blob, creating its row with path on first use.
+        Returns the blob's stored path. The caller's commit persists it.
+        """
+        pass
+
+    @abstractmethod
+    def register(self, sha256: str, path: str, size: int) -> str:
+        """
+        Record the blob without adding a reference, e.g. a finished resumable
+        upload that a delivery has yet to claim. Returns the blob's stored path.
+        """
+        pass
+
+    @abstractmethod
+    def release_unreferenced(self, before: datetime) -> List[str]:
+        """Delete blobs registered before that never got a reference; returns their paths"""
+        pass
+
+    @abstractmethod
+    def release_path(self, path: str) -> Optional[str]:
+        """
+        Drop a reference to the blob stored at path. Returns the path once the
+        last reference is gone (the row is deleted), otherwise None.
+        """
+        pass
+
+    @abstractmethod
+    def path_in_use(self, path: str) -> bool:
+        """Whether a committed row still points at path, read outside the current transaction"""
+        pass
+
+    @abstractmethod
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Run callback once the current transaction commits; a rollback drops it"""
+        pass
+
+    @abstractmethod
+    def after_rollback(self, callback: Callable[[], None]) -> None:
+        """Run callback once the current transaction ends without a commit; a commit drops it"""
+        pass
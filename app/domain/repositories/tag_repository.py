@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+from typing import List, Tuple
+
+
+class ITagRepository(ABC):
+    
+
+    @abstractmethod
+    def get_name_counts(self) -> List[Tuple[str, int]]:
+        """(name, number of tags with that name) for every distinct tag name"""
+        pass
+
+    @abstractmethod
+    def get_mood_counts(self) -> List[Tuple[str, int]]:
+        
+        pass
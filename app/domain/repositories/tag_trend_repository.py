@@ -0,0 +1,33 @@
+from abc import ABC, abstractmethod
+from typing import Optional, List, Tuple
+from datetime import date
+
+
+class ITagTrendRepository(ABC):
+    
+
+    @abstractmethod
+    def add(self, week: date, package_id: Optional[int], kind: str, value: str, count: int = 1) -> None:
+        """Increment one counter; the caller's commit persists it together with the tags"""
+        pass
+
+    @abstractmethod
+    def get_weekly(
+        self,
+        start_week: date,
+        end_week: date,
+        kind: str,
+        package_id: Optional[int] = None
+    ) -> List[Tuple[date, str, int]]:
+        """(week, value, count) for start_week <= week <= end_week, summed over packages unless one is given"""
+        pass
+
+    @abstractmethod
+    def get_tag_history(self) -> List[tuple]:
+        """(package_id, delivery_days, due_date, placed_at, tag name, mood) for every stored tag"""
+        pass
+
+    @abstractmethod
+    def replace_all(self, counters: dict) -> int:
+        """Replace every counter with {(week, package_id, kind, value): count}"""
+        pass
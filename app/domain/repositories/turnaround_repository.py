@@ -0,0 +1,42 @@
+from abc import ABC, abstractmethod
+from typing import Optional, List, Tuple
+from datetime import datetime
+
+
+class ITurnaroundRepository(ABC):
+    
+
+    @abstractmethod
+    def add(self, period: str, package_id: Optional[int], metric: str, bucket: int) -> None:
+        """Increment one histogram cell; persisted by the caller's commit"""
+        pass
+
+    @abstractmethod
+    def get_histograms(self, start_period: str, end_period: str, package_id: Optional[int] = None) -> List[Tuple[str, str, int, int]]:
+        """(period, metric, bucket, count) rows, merged across packages unless package_id is given"""
+        pass
+
+    @abstractmethod
+    def get_placed_at(self, order_id: int) -> Optional[datetime]:
+        """When the first "order_placed" event was recorded"""
+        pass
+
+    @abstractmethod
+    def get_last_delivered_at(self, order_id: int) -> Optional[datetime]:
+        
+        pass
+
+    @abstractmethod
+    def get_delivery_timelines(self) -> List[tuple]:
+        """(package_id, delivery_days, due_date, completed_date, placed_at, first_delivered_at, last_delivered_at) per delivered order"""
+        pass
+
+    @abstractmethod
+    def backfill_placed_events(self) -> int:
+        """Add "order_placed" events for orders placed before they were recorded, from the placement notifications"""
+        pass
+
+    @abstractmethod
+    def replace_all(self, cells: dict) -> int:
+        """Replace every histogram with {(period, package_id, metric, bucket): count}"""
+        pass
@@ -0,0 +1,43 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+from app.domain.entities.UploadSession import UploadSession
+
+
+class IUploadSessionRepository(ABC):
+
+
+    @abstractmethod
+    def create(self, session: UploadSession) -> UploadSession:
+
+        pass
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[UploadSession]:
+
+        pass
+
+    @abstractmethod
+    def claim(self, session_id: str, expected_offset: int, writer: str, stale_before: datetime) -> bool:
+        """Take the right to write the part file if bytes_received is still expected_offset and no live writer holds it; the caller commits"""
+        pass
+
+    @abstractmethod
+    def advance(self, session_id: str, writer: str, new_offset: int) -> bool:
+        """Move bytes_received to new_offset and drop the claim, only if writer still holds it; the caller commits"""
+        pass
+
+    @abstractmethod
+    def release(self, session_id: str, writer: str) -> None:
+        """Drop writer's claim without moving the offset; the caller commits"""
+        pass
+
+    @abstractmethod
+    def delete(self, session: UploadSession) -> None:
+
+        pass
+
+    @abstractmethod
+    def get_stale(self, before: datetime) -> List[UploadSession]:
+        """Sessions with no chunk received since before"""
+        pass
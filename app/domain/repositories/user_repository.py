@@ -31,6 +31,11 @@ class IUserRepository(ABC):
         
         pass
 
+    @abstractmethod
+    def get_orders_version(self, user_id: int) -> int:
+        """Current users.orders_version, read from the database rather than the identity map"""
+        pass
+
     @abstractmethod
     def create(self, user: User) -> User:
         
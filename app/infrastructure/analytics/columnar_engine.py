@@ -0,0 +1,194 @@
+"""Vectorized analytics over the memory-mapped order snapshot"""
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.infrastructure.events import subscribe, ORDERS_CHANGED
+from app.infrastructure.analytics.columnar_snapshot import (
+    OrderColumnSnapshot, STATUS_CODES, NO_TIME, to_epoch
+)
+
+
+_BUCKET_UNITS = {
+    "hour": "h",
+    "day": "D",
+    "week": "D",
+    "month": "M",
+}
+
+# datetime64 day 0 (1970-01-01) is a Thursday; shift so weeks start on Monday
+_EPOCH_WEEKDAY = 3
+
+_OPEN_STATUSES = ["Active", "Revision", "Delivered", "In dispute", "Late"]
+
+
+class ColumnarAnalyticsEngine:
+    """
+    Answers the AnalyticsUseCase queries from an OrderColumnSnapshot. The
+    snapshot is refreshed at most every max_age_seconds, and only with the
+    orders that changed since the previous refresh.
+    """
+
+    def __init__(self, snapshot: OrderColumnSnapshot, max_age_seconds: float = 30.0):
+        self.snapshot = snapshot
+        self.max_age_seconds = max_age_seconds
+        self._last_refresh = 0.0
+
+    def ensure_fresh(self, db: Session) -> None:
+
+        if time.monotonic() - self._last_refresh < self.max_age_seconds:
+            return
+        self.snapshot.refresh(db)
+        self._last_refresh = time.monotonic()
+
+    def mark_stale(self, **_) -> None:
+        """Force the next ensure_fresh to refresh, so a write is never hidden by the throttle"""
+
+        self._last_refresh = 0.0
+
+    def order_statistics(self) -> dict:
+
+        cols = self.snapshot.columns()
+        counts = np.bincount(cols["status"], minlength=len(STATUS_CODES) + 1)
+        total = int(len(cols["status"]))
+
+        stats = {
+            "total": total,
+            "completed": int(counts[STATUS_CODES["Completed"]]),
+            "delivered": int(counts[STATUS_CODES["Delivered"]]),
+            "active": int(counts[STATUS_CODES["Active"]]),
+            "late": int(counts[STATUS_CODES["Late"]]),
+            "revision": int(counts[STATUS_CODES["Revision"]]),
+            "dispute": int(counts[STATUS_CODES["In dispute"]]),
+            "cancelled": int(counts[STATUS_CODES["Cancelled"]]),
+        }
+
+        reviews = cols["review"][cols["review"] > 0]
+        stats["avg_rating"] = float(reviews.mean()) if reviews.size else 0.0
+
+        if total > 0:
+            stats["completion_rate"] = (stats["completed"] / total) * 100.0
+            stats["cancellation_rate"] = (stats["cancelled"] / total) * 100.0
+        else:
+            stats["completion_rate"] = 0.0
+            stats["cancellation_rate"] = 0.0
+
+        return stats
+
+    def revenue_statistics(self, month_start: datetime) -> dict:
+
+        cols = self.snapshot.columns()
+        since = to_epoch(month_start)
+        status, price = cols["status"], cols["price"]
+
+        completed = (status == STATUS_CODES["Completed"]) & (cols["completed_at"] >= since)
+        cancelled = (status == STATUS_CODES["Cancelled"]) & (cols["cancelled_at"] >= since)
+        open_orders = np.isin(status, [STATUS_CODES[s] for s in _OPEN_STATUSES])
+
+        return {
+            "revenue": float(price[completed].sum()),
+            "cancelled_revenue": float(price[cancelled].sum()),
+            "expected_earnings": float(price[open_orders].sum()),
+        }
+
+    def bucket_totals(self, start: datetime, end: datetime, granularity: str = "day") -> Dict[Tuple[str, str], Tuple[int, float]]:
+        """Same shape as AnalyticsUseCase._bucket_totals: (bucket, status) -> (count, revenue)"""
+
+        if granularity not in _BUCKET_UNITS:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+
+        cols = self.snapshot.columns()
+        totals = {}
+        for status_name, ts_column in (("Completed", "completed_at"), ("Cancelled", "cancelled_at")):
+            ts = cols[ts_column]
+            mask = (
+                (cols["status"] == STATUS_CODES[status_name])
+                & (ts >= to_epoch(start))
+                & (ts < to_epoch(end))
+            )
+            for bucket, count, revenue in self._group(ts[mask], cols["price"][mask], granularity):
+                totals[(bucket, status_name)] = (count, revenue)
+        return totals
+
+    def slice(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        statuses: Optional[List[str]] = None,
+        package_ids: Optional[List[int]] = None,
+        date_field: str = "completed",
+    ) -> dict:
+        """Count, revenue and rating of an arbitrary combination of filters"""
+
+        cols = self.snapshot.columns()
+        mask = np.ones(len(cols["id"]), dtype=bool)
+
+        if statuses:
+            mask &= np.isin(cols["status"], [STATUS_CODES.get(s, -1) for s in statuses])
+        if package_ids:
+            mask &= np.isin(cols["package_id"], package_ids)
+
+        if start or end:
+            ts = cols[f"{date_field}_at"]
+            mask &= ts != NO_TIME
+            if start:
+                mask &= ts >= to_epoch(start)
+            if end:
+                mask &= ts < to_epoch(end)
+
+        reviews = cols["review"][mask]
+        reviews = reviews[reviews > 0]
+
+        return {
+            "orders": int(mask.sum()),
+            "revenue": round(float(cols["price"][mask].sum()), 2),
+            "reviews": int(reviews.size),
+            "avg_rating": float(reviews.mean()) if reviews.size else 0.0,
+        }
+
+    def _group(self, ts: np.ndarray, price: np.ndarray, granularity: str) -> List[Tuple[str, int, float]]:
+
+        if ts.size == 0:
+            return []
+
+        buckets = ts.astype("datetime64[s]").astype(f"datetime64[{_BUCKET_UNITS[granularity]}]")
+        if granularity == "week":
+            days = buckets.astype(np.int64)
+            buckets = (days - (days + _EPOCH_WEEKDAY) % 7).astype("datetime64[D]")
+
+        keys, inverse = np.unique(buckets, return_inverse=True)
+        counts = np.bincount(inverse, minlength=keys.size)
+        revenue = np.bincount(inverse, weights=price, minlength=keys.size)
+
+        labels = np.datetime_as_string(keys)
+        if granularity == "hour":
+            labels = [f"{label[:10]} {label[11:13]}:00" for label in labels]
+
+        return [
+            (str(key), int(count), float(total))
+            for key, count, total in zip(labels, counts, revenue)
+        ]
+
+
+_engine: Optional[ColumnarAnalyticsEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_columnar_engine() -> ColumnarAnalyticsEngine:
+    """Process-wide engine; the snapshot directory is shared by every worker"""
+
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            default_dir = Path(__file__).resolve().parent.parent.parent / "analytics_snapshot"
+            directory = Path(os.getenv("ANALYTICS_SNAPSHOT_DIR", str(default_dir)))
+            max_age = float(os.getenv("ANALYTICS_SNAPSHOT_MAX_AGE", "30"))
+            _engine = ColumnarAnalyticsEngine(OrderColumnSnapshot(directory), max_age)
+            subscribe(ORDERS_CHANGED, _engine.mark_stale)
+        return _engine
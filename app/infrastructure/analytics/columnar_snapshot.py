@@ -0,0 +1,326 @@
+"""Memory-mapped, column-per-file snapshot of the orders table for vectorized analytics"""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.domain.entities.Order import Order
+from app.domain.entities.Package import Package
+
+
+STATUS_CODES = {
+    "Active": 0,
+    "Revision": 1,
+    "Delivered": 2,
+    "Late": 3,
+    "In dispute": 4,
+    "Completed": 5,
+    "Cancelled": 6,
+}
+OTHER_STATUS = 7
+
+# Sentinel for missing timestamps (int64 seconds since epoch)
+NO_TIME = np.iinfo(np.int64).min
+
+COLUMNS = {
+    "id": np.int64,
+    "status": np.int8,
+    "package_id": np.int32,
+    "price": np.float64,
+    "completed_at": np.int64,
+    "cancelled_at": np.int64,
+    "due_at": np.int64,
+    "review": np.int8,
+}
+
+_EPOCH = datetime(1970, 1, 1)
+_LOCK_STALE_SECONDS = 300
+
+# updated_at is stamped when the statement runs, not when it commits, so a
+# transaction committing after a refresh can carry a time below the watermark
+# (or an id below max_id). Every refresh re-reads this much before the watermark.
+OVERLAP = timedelta(seconds=float(os.getenv("ANALYTICS_SNAPSHOT_OVERLAP", "300")))
+
+
+def to_epoch(value: Optional[datetime]) -> int:
+
+    if value is None:
+        return NO_TIME
+    return int((value - _EPOCH).total_seconds())
+
+
+class OrderColumnSnapshot:
+    """
+    One .npy file per column, opened with np.memmap. Rows are kept in order id
+    order so a changed order is located with searchsorted. Files are allocated
+    with spare capacity and new orders are appended past the live row count,
+    where readers don't look. Rows readers can see are never written in place:
+    changing or inserting them writes a new generation of files, which
+    meta.json (the live row count, generation and refresh watermarks) then
+    switches to. The previous generation is kept for readers still opening it.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._meta: dict = {}
+        self._generation = None
+
+    @property
+    def count(self) -> int:
+        return self._meta.get("count", 0)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Read-only views of the live rows, reopened if another process grew the files or added rows"""
+
+        meta = self._read_meta()
+        if (
+            not self._arrays
+            or meta.get("generation") != self._generation
+            or meta.get("count", 0) != self._meta.get("count", 0)
+        ):
+            with self._lock:
+                self._open(meta)
+        count = self._meta.get("count", 0)
+        return {name: array[:count] for name, array in self._arrays.items()}
+
+    def refresh(self, db: Session) -> int:
+        """
+        Pull orders created (id above max_id) or modified (updated_at at or after
+        the watermark, less OVERLAP) since the last refresh. Returns the number
+        of rows written.
+        """
+
+        lock_path = self.directory / "refresh.lock"
+        if not self._acquire_file_lock(lock_path):
+            return 0
+
+        try:
+            with self._lock:
+                meta = self._read_meta()
+                self._open(meta)
+
+                watermark = db.query(func.max(Order.updated_at)).scalar()
+                max_id = self._meta.get("max_id", 0)
+                since = self._meta.get("watermark")
+
+                new_rows = self._fetch(db, Order.id > max_id)
+                changed_rows = []
+                if since and max_id:
+                    changed_rows = self._fetch(
+                        db,
+                        Order.id <= max_id,
+                        Order.updated_at >= datetime.fromisoformat(since) - OVERLAP
+                    )
+
+                changed_rows = self._changed(changed_rows)
+                needed = self._meta["count"] + len(new_rows)
+                if changed_rows or needed > self._meta["capacity"]:
+                    self._rewrite(changed_rows, new_rows)
+                elif new_rows:
+                    self._append(new_rows)
+
+                self._meta["max_id"] = max(max_id, new_rows[-1]["id"] if new_rows else 0)
+                self._meta["watermark"] = watermark.isoformat() if watermark else since
+                self._meta["refreshed_at"] = time.time()
+                self._flush()
+                self._write_meta()
+                self._remove_old_generations()
+
+                return len(new_rows) + len(changed_rows)
+        finally:
+            try:
+                lock_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _fetch(self, db: Session, *criteria) -> List[dict]:
+
+        query = (
+            db.query(
+                Order.id,
+                Order.status,
+                Order.package_id,
+                Package.price,
+                Order.completed_date,
+                Order.cancelled_date,
+                Order.due_date,
+                Order.review
+            )
+            .outerjoin(Package, Order.package_id == Package.id)
+            .filter(*criteria)
+            .order_by(Order.id)
+        )
+
+        rows = []
+        for order_id, status, package_id, price, completed, cancelled, due, review in query.yield_per(5000):
+            rows.append({
+                "id": order_id,
+                "status": STATUS_CODES.get(status, OTHER_STATUS),
+                "package_id": package_id or 0,
+                "price": float(price or 0.0),
+                "completed_at": to_epoch(completed),
+                "cancelled_at": to_epoch(cancelled),
+                "due_at": to_epoch(due),
+                "review": review or 0,
+            })
+        return rows
+
+    def _changed(self, rows: List[dict]) -> List[dict]:
+        """The rows that are new to the snapshot or differ from it; the overlap mostly re-reads unchanged orders"""
+
+        if not rows:
+            return rows
+        count = self._meta["count"]
+        ids = self._arrays["id"][:count]
+        wanted = np.fromiter((r["id"] for r in rows), dtype=np.int64, count=len(rows))
+        positions = np.searchsorted(ids, wanted)
+
+        found = positions < count
+        found[found] = ids[positions[found]] == wanted[found]
+        differs = ~found
+        for name, dtype in COLUMNS.items():
+            values = np.fromiter((r[name] for r in rows), dtype=dtype, count=len(rows))
+            differs[found] |= self._arrays[name][positions[found]] != values[found]
+        return [row for row, changed in zip(rows, differs) if changed]
+
+    def _rewrite(self, changed_rows: List[dict], new_rows: List[dict]):
+        """
+        Write a new generation with changed_rows overwritten or, for
+        ids never seen (committed late), inserted in id order, and new_rows
+        (all above max_id) appended
+        """
+
+        count = self._meta["count"]
+        ids = self._arrays["id"][:count]
+        wanted = np.fromiter((r["id"] for r in changed_rows), dtype=np.int64, count=len(changed_rows))
+        positions = np.searchsorted(ids, wanted)
+        found = positions < count
+        found[found] = ids[positions[found]] == wanted[found]
+
+        needed = count + len(new_rows) + int((~found).sum())
+        capacity = self._meta["capacity"]
+        if needed > capacity:
+            capacity = max(needed, capacity * 2, 1024)
+        generation = self._meta.get("generation", 0) + 1
+
+        arrays = {}
+        for name, dtype in COLUMNS.items():
+            column = np.array(self._arrays[name][:count], dtype=dtype)
+            values = np.fromiter((r[name] for r in changed_rows), dtype=dtype, count=len(changed_rows))
+            column[positions[found]] = values[found]
+            column = np.insert(column, positions[~found], values[~found])
+            appended = np.fromiter((r[name] for r in new_rows), dtype=dtype, count=len(new_rows))
+
+            path = self._path(name, generation)
+            array = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(capacity,))
+            array[:len(column)] = column
+            array[len(column):needed] = appended
+            array.flush()
+            del array
+            arrays[name] = np.load(path, mmap_mode="r+")
+
+        self._arrays = arrays
+        self._meta["count"] = needed
+        self._meta["capacity"] = capacity
+        self._meta["generation"] = generation
+        self._generation = generation
+
+    def _append(self, rows: List[dict]):
+        """Write new rows into the spare capacity after the live rows"""
+
+        count = self._meta["count"]
+        needed = count + len(rows)
+        for name, dtype in COLUMNS.items():
+            values = np.fromiter((r[name] for r in rows), dtype=dtype, count=len(rows))
+            self._arrays[name][count:needed] = values
+        self._meta["count"] = needed
+
+    def _path(self, name: str, generation: int) -> Path:
+
+        return self.directory / f"{name}.{generation}.npy"
+
+    def _remove_old_generations(self):
+        """Keep the current generation and the one before it, which a reader may have just read meta.json for"""
+
+        generation = self._meta["generation"]
+        for path in self.directory.glob("*.npy"):
+            try:
+                file_generation = int(path.suffixes[-2].lstrip("."))
+            except (IndexError, ValueError):
+                file_generation = None
+            if file_generation is None or file_generation < generation - 1:
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def _open(self, meta: dict):
+
+        if meta.get("capacity"):
+            try:
+                self._arrays = {
+                    name: np.load(self._path(name, meta["generation"]), mmap_mode="r+")
+                    for name in COLUMNS
+                }
+                self._meta = meta
+                self._generation = meta["generation"]
+                return
+            except FileNotFoundError:
+
+                # Replaced two generations ahead since meta.json was read, or
+                # written before files were named by generation
+                latest = self._read_meta()
+                if latest.get("generation") != meta.get("generation"):
+                    return self._open(latest)
+                meta = {}
+
+        self._meta = {"count": 0, "capacity": 0, "max_id": 0, "watermark": None, "generation": 0, **meta}
+        self._arrays = {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self._generation = self._meta["generation"]
+
+    def _flush(self):
+
+        for array in self._arrays.values():
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def _read_meta(self) -> dict:
+
+        try:
+            with open(self.directory / "meta.json", "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_meta(self):
+
+        tmp_path = self.directory / "meta.json.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._meta, f)
+        os.replace(tmp_path, self.directory / "meta.json")
+
+    def _acquire_file_lock(self, lock_path: Path) -> bool:
+        """Cross-process refresh guard; other workers keep reading the current files"""
+
+        try:
+            if time.time() - lock_path.stat().st_mtime > _LOCK_STALE_SECONDS:
+                lock_path.unlink()
+        except FileNotFoundError:
+            pass
+
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        os.close(fd)
+        return True
@@ -1,5 +1,7 @@
 """Database infrastructure module"""
-from app.infrastructure.database.database import Base, engine, SessionLocal, get_db
+from app.infrastructure.database.database import Base, engine, SessionLocal, read_engine, ReadSessionLocal, get_db
+from app.infrastructure.database import order_versions
 
-__all__ = ["Base", "engine", "SessionLocal", "get_db"]
+order_versions.register(SessionLocal)
 
+__all__ = ["Base", "engine", "SessionLocal", "read_engine", "ReadSessionLocal", "get_db"]
@@ -0,0 +1,106 @@
+"""
+Bump users.orders_version whenever one of the user's orders, tags or deliveries
+is flushed, and orders.content_version whenever a delivery, delivery file,
+event or message of the order is inserted or deleted
+"""
+from typing import Iterable, Set
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from app.domain.entities.User import User
+from app.domain.entities.Order import Order
+from app.domain.entities.Tag import Tag
+from app.domain.entities.Delivery import Delivery
+from app.domain.entities.DeliveryFile import DeliveryFile
+from app.domain.entities.OrderEvent import OrderEvent
+from app.domain.entities.Message import Message
+
+
+_CHILD_TYPES = (Tag, Delivery)
+_CONTENT_TYPES = (Delivery, OrderEvent, Message)
+
+
+def bump_orders_version(session: Session, user_ids: Iterable[int]) -> None:
+    """Increment the version of every given user in the session's current transaction"""
+
+    user_ids = sorted({uid for uid in user_ids if uid})
+    if not user_ids:
+        return
+    session.connection().execute(
+        update(User.__table__)
+        .where(User.__table__.c.id.in_(user_ids))
+        .values(orders_version=User.__table__.c.orders_version + 1)
+    )
+
+
+def bump_content_version(session: Session, order_ids: Iterable[int]) -> None:
+    """Increment the content version of every given order in the session's current transaction"""
+
+    order_ids = sorted({oid for oid in order_ids if oid})
+    if not order_ids:
+        return
+    session.connection().execute(
+        update(Order.__table__)
+        .where(Order.__table__.c.id.in_(order_ids))
+        .values(content_version=Order.__table__.c.content_version + 1)
+    )
+
+
+def _after_flush(session: Session, flush_context) -> None:
+
+    user_ids: Set[int] = set()
+    order_ids: Set[int] = set()
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Order):
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            user_ids.add(obj.user_id)
+        elif isinstance(obj, _CHILD_TYPES):
+            order = obj.__dict__.get("order")
+            if order is not None:
+                user_ids.add(order.user_id)
+            else:
+                order_ids.add(obj.order_id)
+
+    if order_ids:
+        user_ids.update(
+            session.connection().execute(
+                select(Order.__table__.c.user_id).where(Order.__table__.c.id.in_(order_ids))
+            ).scalars()
+        )
+
+    bump_orders_version(session, user_ids)
+    _bump_content_versions(session)
+
+
+def _bump_content_versions(session: Session) -> None:
+
+    content_order_ids: Set[int] = set()
+    delivery_ids: Set[int] = set()
+
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, _CONTENT_TYPES):
+            content_order_ids.add(obj.order_id)
+        elif isinstance(obj, DeliveryFile):
+            delivery = obj.__dict__.get("delivery")
+            if delivery is not None and delivery.order_id:
+                content_order_ids.add(delivery.order_id)
+            else:
+                delivery_ids.add(obj.delivery_id)
+
+    if delivery_ids:
+        content_order_ids.update(
+            session.connection().execute(
+                select(Delivery.__table__.c.order_id).where(Delivery.__table__.c.id.in_(delivery_ids))
+            ).scalars()
+        )
+
+    bump_content_version(session, content_order_ids)
+
+
+def register(session_factory) -> None:
+
+    if not event.contains(session_factory, "after_flush", _after_flush):
+        event.listen(session_factory, "after_flush", _after_flush)
@@ -0,0 +1,54 @@
+"""Run independent read-only queries concurrently, each on its own pooled session"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.infrastructure.database.database import ReadSessionLocal, ANALYTICS_PARALLEL_WORKERS
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # No more threads than read connections, so a task never waits on the pool
+            _executor = ThreadPoolExecutor(
+                max_workers=ANALYTICS_PARALLEL_WORKERS,
+                thread_name_prefix="analytics-read"
+            )
+        return _executor
+
+
+def run_concurrently(
+    tasks: Dict[str, Callable[[Any], Any]],
+    build: Callable[[Session], Any] = lambda session: session
+) -> Dict[str, Any]:
+    """
+    Submit every task and wait for all of them. Each task is called with
+    build(session) for a fresh ReadSessionLocal session that is closed when it
+    returns, so a task never shares a connection with another one. The first
+    task error is re-raised after every task has finished. This blocks, so
+    async routes call it through run_in_threadpool.
+    """
+
+    futures = {
+        name: _get_executor().submit(_run_in_session, task, build)
+        for name, task in tasks.items()
+    }
+    wait(futures.values())
+    return {name: future.result() for name, future in futures.items()}
+
+
+def _run_in_session(task: Callable[[Any], Any], build: Callable[[Session], Any]) -> Any:
+
+    db = ReadSessionLocal()
+    try:
+        return task(build(db))
+    finally:
+        db.close()
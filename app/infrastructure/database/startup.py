@@ -22,6 +22,16 @@ def initialize_database():
     from app.domain.entities.OrderEvent import OrderEvent
     from app.domain.entities.Message import Message
     from app.domain.entities.Notification import Notification
+    from app.domain.entities.OrderDailyStat import OrderDailyStat
+    from app.domain.entities.TurnaroundHistogram import TurnaroundHistogram
+    from app.domain.entities.RevenueCubeCell import RevenueCubeCell
+    from app.domain.entities.TagTrendCounter import TagTrendCounter
+    from app.domain.entities.ReviewAggregate import ReviewAggregate
+    from app.domain.entities.SchedulerLease import SchedulerLease
+    from app.domain.entities.StoredBlob import StoredBlob
+    from app.domain.entities.UploadSession import UploadSession
+    from app.domain.entities.DeliveryJob import DeliveryJob
+    from app.domain.entities.DataMigration import DataMigration
 
 
     try:
@@ -77,6 +87,141 @@ def initialize_database():
             db.rollback()
 
 
+        try:
+            result = db.execute(text("SHOW COLUMNS FROM orders LIKE 'updated_at'"))
+            if not result.fetchone():
+                print("[*] Adding orders.updated_at column...")
+                db.execute(text("ALTER TABLE orders ADD COLUMN updated_at DATETIME NULL"))
+                db.execute(text("CREATE INDEX ix_orders_updated_at ON orders (updated_at)"))
+                db.commit()
+                print("[OK] orders.updated_at column added")
+            else:
+                print("[OK] orders.updated_at column already exists")
+        except Exception as e:
+            print(f"[WARN] Migration warning: {e}")
+            db.rollback()
+
+
+        try:
+            result = db.execute(text("SHOW COLUMNS FROM users LIKE 'orders_version'"))
+            if not result.fetchone():
+                print("[*] Adding users.orders_version column...")
+                db.execute(text("ALTER TABLE users ADD COLUMN orders_version INT NOT NULL DEFAULT 0"))
+                db.commit()
+                print("[OK] users.orders_version column added")
+            else:
+                print("[OK] users.orders_version column already exists")
+        except Exception as e:
+            print(f"[WARN] Migration warning: {e}")
+            db.rollback()
+
+
+        try:
+            result = db.execute(text("SHOW COLUMNS FROM orders LIKE 'content_version'"))
+            if not result.fetchone():
+                print("[*] Adding orders.content_version column...")
+                db.execute(text("ALTER TABLE orders ADD COLUMN content_version INT NOT NULL DEFAULT 0"))
+                db.commit()
+                print("[OK] orders.content_version column added")
+            else:
+                print("[OK] orders.content_version column already exists")
+        except Exception as e:
+            print(f"[WARN] Migration warning: {e}")
+            db.rollback()
+
+
+        try:
+            result = db.execute(text("SHOW COLUMNS FROM delivery_files LIKE 'blob_sha256'"))
+            if not result.fetchone():
+                print("[*] Adding delivery_files.blob_sha256 column...")
+                db.execute(text("ALTER TABLE delivery_files ADD COLUMN blob_sha256 VARCHAR(64) NULL"))
+                db.execute(text("CREATE INDEX ix_delivery_files_blob_sha256 ON delivery_files (blob_sha256)"))
+                db.commit()
+                print("[OK] delivery_files.blob_sha256 column added")
+            else:
+                print("[OK] delivery_files.blob_sha256 column already exists")
+        except Exception as e:
+            print(f"[WARN] Migration warning: {e}")
+            db.rollback()
+
+
+        try:
+            result = db.execute(text("SHOW COLUMNS FROM delivery_jobs LIKE 'attempts'"))
+            if not result.fetchone():
+                print("[*] Adding delivery_jobs retry columns...")
+                db.execute(text("""
+                    ALTER TABLE delivery_jobs
+                    ADD COLUMN attempts INT NOT NULL DEFAULT 0,
+                    ADD COLUMN next_attempt_at DATETIME NULL
+                """))
+                db.commit()
+                print("[OK] delivery_jobs retry columns added")
+            else:
+                print("[OK] delivery_jobs retry columns already exist")
+        except Exception as e:
+            print(f"[WARN] Migration warning: {e}")
+            db.rollback()
+
+
+        try:
+            result = db.execute(text("SHOW COLUMNS FROM upload_sessions LIKE 'writer'"))
+            if not result.fetchone():
+                print("[*] Adding upload_sessions writer columns...")
+                db.execute(text("""
+                    ALTER TABLE upload_sessions
+                    ADD COLUMN writer VARCHAR(32) NULL,
+                    ADD COLUMN writing_since DATETIME NULL
+                """))
+                db.commit()
+                print("[OK] upload_sessions writer columns added")
+            else:
+                print("[OK] upload_sessions writer columns already exist")
+        except Exception as e:
+            print(f"[WARN] Migration warning: {e}")
+            db.rollback()
+
+
+        try:
+            result = db.execute(text("SHOW INDEX FROM tags WHERE Column_name = 'order_id'"))
+            if not result.fetchone():
+                print("[*] Adding tags.order_id index...")
+                db.execute(text("CREATE INDEX ix_tags_order_id ON tags (order_id)"))
+                db.commit()
+                print("[OK] tags.order_id index added")
+            else:
+                print("[OK] tags.order_id index already exists")
+        except Exception as e:
+            print(f"[WARN] Migration warning: {e}")
+            db.rollback()
+
+
+        # Rollups keyed on a nullable package_id (or user_id) could hold duplicate
+        # NULL rows; they now use 0 instead. The tables are derived, so they are
+        # recreated and their backfill is run again below.
+        rollup_backfills = {
+            "order_daily_stats": (OrderDailyStat, "order_daily_stats_backfill"),
+            "turnaround_histograms": (TurnaroundHistogram, "turnaround_placed_events"),
+            "revenue_cube": (RevenueCubeCell, "revenue_cube_backfill"),
+            "tag_trend_counters": (TagTrendCounter, "tag_trend_backfill"),
+        }
+        for table, (model, backfill) in rollup_backfills.items():
+            try:
+                column = db.execute(text(f"SHOW COLUMNS FROM {table} LIKE 'package_id'")).fetchone()
+                if column and column[2] == "YES":
+                    print(f"[*] Recreating {table} with a non-null package_id...")
+                    db.commit()
+                    model.__table__.drop(bind=engine)
+                    model.__table__.create(bind=engine)
+                    db.query(DataMigration).filter(DataMigration.name == backfill).delete(synchronize_session=False)
+                    db.commit()
+                    print(f"[OK] {table} recreated, {backfill} will run again")
+                else:
+                    print(f"[OK] {table}.package_id already non-null")
+            except Exception as e:
+                print(f"[WARN] Migration warning: {e}")
+                db.rollback()
+
+
         print("[*] Checking admin user...")
         admin = db.query(User).filter(User.username == "Kohina").first()
         if not admin:
@@ -107,6 +252,38 @@ def initialize_database():
         else:
             print("[OK] Default packages already exist")
 
+        # Once, not whenever the table is empty: orders that produce no rows
+        # (none completed, cancelled or delivered yet) would rebuild every startup
+        from app.infrastructure.repositories.order_daily_stats_repository_impl import OrderDailyStatsRepository
+        stats_repository = OrderDailyStatsRepository(db)
+        _run_once(db, "order_daily_stats_backfill", lambda: f"{stats_repository.rebuild()} rows")
+
+        # The placed-events migration rebuilds the histograms after backfilling
+        # the events they are measured from, so it doubles as their backfill
+        from app.infrastructure.repositories.turnaround_repository_impl import TurnaroundRepository
+        from app.application.use_cases.turnaround_use_case import TurnaroundUseCase
+        turnaround_repository = TurnaroundRepository(db)
+
+        def placed_events():
+            events = turnaround_repository.backfill_placed_events()
+            cells = TurnaroundUseCase(turnaround_repository).rebuild()
+            return f"{events} order_placed events, {cells} histogram cells"
+
+        _run_once(db, "turnaround_placed_events", placed_events)
+
+        from app.infrastructure.repositories.revenue_cube_repository_impl import RevenueCubeRepository
+        cube_repository = RevenueCubeRepository(db)
+        _run_once(db, "revenue_cube_backfill", lambda: f"{cube_repository.rebuild()} cells")
+
+        from app.infrastructure.repositories.tag_trend_repository_impl import TagTrendRepository
+        from app.application.use_cases.tag_trend_use_case import TagTrendUseCase
+        tag_trend_repository = TagTrendRepository(db)
+        _run_once(db, "tag_trend_backfill", lambda: f"{TagTrendUseCase(tag_trend_repository).rebuild()} counters")
+
+        from app.infrastructure.repositories.review_aggregate_repository_impl import ReviewAggregateRepository
+        review_aggregate_repository = ReviewAggregateRepository(db)
+        _run_once(db, "review_aggregate_backfill", lambda: f"{review_aggregate_repository.rebuild()} rows")
+
         print("[OK] Database initialization completed successfully!")
     except Exception as e:
         print(f"[ERROR] Error during database initialization: {e}")
@@ -116,3 +293,19 @@ def initialize_database():
     finally:
         db.close()
 
+
+def _run_once(db: Session, name: str, migrate) -> None:
+    """Run a data migration unless data_migrations records it; migrate returns a summary to print"""
+
+    from app.domain.entities.DataMigration import DataMigration
+    from app.infrastructure.utils.time_utils import get_current_time
+
+    if db.get(DataMigration, name):
+        print(f"[OK] Data migration {name} already applied")
+        return
+
+    print(f"[*] Applying data migration {name}...")
+    summary = migrate()
+    db.add(DataMigration(name=name, applied_at=get_current_time()))
+    db.commit()
+    print(f"[OK] Data migration {name} applied ({summary})")
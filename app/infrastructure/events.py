@@ -0,0 +1,27 @@
+"""Minimal in-process publish/subscribe hooks for write-side notifications"""
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+
+ORDERS_CHANGED = "orders_changed"
+ORDER_COMPLETED = "order_completed"
+REVIEW_SUBMITTED = "review_submitted"
+
+_subscribers: Dict[str, List[Callable]] = defaultdict(list)
+
+
+def subscribe(event: str, handler: Callable) -> None:
+    """Register handler(**payload) for an event name"""
+
+    if handler not in _subscribers[event]:
+        _subscribers[event].append(handler)
+
+
+def publish(event: str, **payload) -> None:
+    """Call every handler; a failing handler is logged and never breaks the write path"""
+
+    for handler in list(_subscribers.get(event, [])):
+        try:
+            handler(**payload)
+        except Exception as e:
+            print(f"[WARN] Event handler for {event} failed: {e}")
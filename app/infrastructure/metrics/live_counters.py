@@ -0,0 +1,83 @@
+"""Rolling per-process operation counters backed by fixed-size ring buffers"""
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+
+ORDERS_PLACED = "orders_placed"
+DELIVERIES = "deliveries"
+MESSAGES_SENT = "messages_sent"
+LATE_TRANSITIONS = "late_transitions"
+
+
+class RollingCounter:
+    """
+    Event counts for the last `slots` windows of `slot_seconds` each. A slot
+    remembers which window it holds and is zeroed when the ring wraps onto
+    it, so recording is O(1) and memory never grows.
+    """
+
+    def __init__(self, slot_seconds: int, slots: int):
+        self.slot_seconds = slot_seconds
+        self.slots = slots
+        self._counts = [0] * slots
+        self._windows = [-1] * slots
+        self._lock = threading.Lock()
+
+    def record(self, count: int = 1, now: Optional[float] = None) -> None:
+
+        window = int((time.time() if now is None else now) // self.slot_seconds)
+        i = window % self.slots
+        with self._lock:
+            if self._windows[i] != window:
+                self._windows[i] = window
+                self._counts[i] = 0
+            self._counts[i] += count
+
+    def series(self, now: Optional[float] = None) -> List[int]:
+        """One count per slot, oldest first, ending with the current window"""
+
+        current = int((time.time() if now is None else now) // self.slot_seconds)
+        with self._lock:
+            return [
+                self._counts[window % self.slots] if self._windows[window % self.slots] == window else 0
+                for window in range(current - self.slots + 1, current + 1)
+            ]
+
+    def snapshot(self, now: Optional[float] = None) -> dict:
+
+        now = time.time() if now is None else now
+        series = self.series(now)
+        window_start = (int(now // self.slot_seconds) - self.slots + 1) * self.slot_seconds
+        return {
+            "slot_seconds": self.slot_seconds,
+            "since": datetime.fromtimestamp(window_start, tz=timezone.utc).isoformat(),
+            "current": series[-1],
+            "total": sum(series),
+            "series": series,
+        }
+
+
+# Per minute over the last hour, or per hour over the last day
+_counters: Dict[str, RollingCounter] = {
+    ORDERS_PLACED: RollingCounter(slot_seconds=60, slots=60),
+    DELIVERIES: RollingCounter(slot_seconds=3600, slots=24),
+    MESSAGES_SENT: RollingCounter(slot_seconds=60, slots=60),
+    LATE_TRANSITIONS: RollingCounter(slot_seconds=3600, slots=24),
+}
+
+
+def record(name: str, count: int = 1) -> None:
+    """Count events; never raises, so it is safe to call on any write path"""
+
+    counter = _counters.get(name)
+    if counter is not None and count > 0:
+        counter.record(count)
+
+
+def snapshot() -> dict:
+    """Every counter as of now; each worker process keeps its own counts"""
+
+    now = time.time()
+    return {name: counter.snapshot(now) for name, counter in _counters.items()}
@@ -0,0 +1,66 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import update, or_, and_
+from app.domain.entities.DeliveryJob import DeliveryJob
+from app.domain.repositories.delivery_job_repository import IDeliveryJobRepository
+from app.infrastructure.utils.time_utils import get_current_time
+
+
+class DeliveryJobRepository(IDeliveryJobRepository):
+
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, job: DeliveryJob) -> DeliveryJob:
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[DeliveryJob]:
+        return self.db.query(DeliveryJob).filter(DeliveryJob.id == job_id).first()
+
+    def claim(self, job_id: str, holder: str, stale_before: datetime) -> bool:
+        result = self.db.execute(
+            update(DeliveryJob)
+            .where(DeliveryJob.id == job_id, self._claimable(stale_before))
+            .values(
+                status="running",
+                claimed_by=holder,
+                claimed_at=get_current_time(),
+                attempts=DeliveryJob.attempts + 1
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return bool(result.rowcount)
+
+    def update_claimed(self, job_id: str, holder: str, **values) -> bool:
+        result = self.db.execute(
+            update(DeliveryJob)
+            .where(DeliveryJob.id == job_id, DeliveryJob.claimed_by == holder, DeliveryJob.status == "running")
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        return bool(result.rowcount)
+
+    def get_claimable_ids(self, stale_before: datetime, limit: int = 20) -> List[str]:
+        rows = (
+            self.db.query(DeliveryJob.id)
+            .filter(self._claimable(stale_before))
+            .order_by(DeliveryJob.created_at)
+            .limit(limit)
+            .all()
+        )
+        return [job_id for (job_id,) in rows]
+
+    def _claimable(self, stale_before: datetime):
+
+        return or_(
+            and_(
+                DeliveryJob.status == "pending",
+                or_(DeliveryJob.next_attempt_at.is_(None), DeliveryJob.next_attempt_at <= get_current_time())
+            ),
+            and_(DeliveryJob.status == "running", DeliveryJob.claimed_at < stale_before)
+        )
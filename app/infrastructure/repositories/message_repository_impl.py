@@ -58,3 +58,16 @@ class MessageRepository(IMessageRepository):
         self.db.commit()
         return result
 
+    def mark_order_read(self, order_id: int, reader_id: int) -> int:
+        count = (
+            self.db.query(Message)
+            .filter(
+                Message.order_id == order_id,
+                Message.sender_id != reader_id,
+                Message.is_read == False
+            )
+            .update({"is_read": True}, synchronize_session=False)
+        )
+        if count:
+            self.db.commit()
+        return count
@@ -0,0 +1,148 @@
+from typing import Optional, List
+from datetime import date, datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import update, func
+from sqlalchemy.exc import IntegrityError
+from app.domain.entities.Order import Order
+from app.domain.entities.Package import Package
+from app.domain.entities.Delivery import Delivery
+from app.domain.entities.OrderDailyStat import OrderDailyStat, NO_PACKAGE
+from app.domain.repositories.order_daily_stats_repository import IOrderDailyStatsRepository
+
+
+class OrderDailyStatsRepository(IOrderDailyStatsRepository):
+
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_completed(self, day: date, package_id: Optional[int], price: float) -> None:
+        self._increment(day, package_id, completed_count=1, revenue=float(price or 0.0))
+
+    def record_cancelled(self, day: date, package_id: Optional[int], price: float) -> None:
+        self._increment(day, package_id, cancelled_count=1, cancelled_revenue=float(price or 0.0))
+
+    def record_delivered(self, day: date, package_id: Optional[int]) -> None:
+        self._increment(day, package_id, delivered_count=1)
+
+    def get_range(self, start_day: date, end_day: date) -> List[OrderDailyStat]:
+        return (
+            self.db.query(OrderDailyStat)
+            .filter(OrderDailyStat.day >= start_day, OrderDailyStat.day < end_day)
+            .order_by(OrderDailyStat.day)
+            .all()
+        )
+
+    def get_revenue_since(self, start_day: date) -> dict:
+        revenue, cancelled_revenue = (
+            self.db.query(
+                func.coalesce(func.sum(OrderDailyStat.revenue), 0.0),
+                func.coalesce(func.sum(OrderDailyStat.cancelled_revenue), 0.0)
+            )
+            .filter(OrderDailyStat.day >= start_day)
+            .one()
+        )
+        return {"revenue": float(revenue), "cancelled_revenue": float(cancelled_revenue)}
+
+    def rebuild(self) -> int:
+        rows = {}
+
+        def row_for(day_value, package_id):
+            day = _as_date(day_value)
+            package_id = package_id or NO_PACKAGE
+            key = (day, package_id)
+            if key not in rows:
+                rows[key] = OrderDailyStat(
+                    day=day,
+                    package_id=package_id,
+                    completed_count=0,
+                    cancelled_count=0,
+                    delivered_count=0,
+                    revenue=0.0,
+                    cancelled_revenue=0.0
+                )
+            return rows[key]
+
+        completed_day = func.date(Order.completed_date)
+        for day_value, package_id, count, revenue in (
+            self.db.query(completed_day, Order.package_id, func.count(Order.id), func.coalesce(func.sum(Package.price), 0.0))
+            .outerjoin(Package, Order.package_id == Package.id)
+            .filter(Order.status == "Completed", Order.completed_date.isnot(None))
+            .group_by(completed_day, Order.package_id)
+        ):
+            row = row_for(day_value, package_id)
+            row.completed_count = count
+            row.revenue = float(revenue)
+
+        cancelled_day = func.date(Order.cancelled_date)
+        for day_value, package_id, count, revenue in (
+            self.db.query(cancelled_day, Order.package_id, func.count(Order.id), func.coalesce(func.sum(Package.price), 0.0))
+            .outerjoin(Package, Order.package_id == Package.id)
+            .filter(Order.status == "Cancelled", Order.cancelled_date.isnot(None))
+            .group_by(cancelled_day, Order.package_id)
+        ):
+            row = row_for(day_value, package_id)
+            row.cancelled_count = count
+            row.cancelled_revenue = float(revenue)
+
+        delivered_day = func.date(Delivery.delivered_at)
+        for day_value, package_id, count in (
+            self.db.query(delivered_day, Order.package_id, func.count(Delivery.id))
+            .join(Order, Delivery.order_id == Order.id)
+            .group_by(delivered_day, Order.package_id)
+        ):
+            row_for(day_value, package_id).delivered_count = count
+
+        self.db.query(OrderDailyStat).delete(synchronize_session=False)
+        self.db.add_all(rows.values())
+        self.db.commit()
+        return len(rows)
+
+    def _increment(self, day: date, package_id: Optional[int], **deltas) -> None:
+        """Add deltas to the (day, package) row, creating it on first use. Does not commit."""
+
+        values = {
+            name: getattr(OrderDailyStat, name) + delta
+            for name, delta in deltas.items()
+        }
+        package_id = package_id or NO_PACKAGE
+
+        result = self.db.execute(
+            update(OrderDailyStat)
+            .where(OrderDailyStat.day == day)
+            .where(OrderDailyStat.package_id == package_id)
+            .values(**values)
+        )
+        if result.rowcount:
+            return
+
+        row = OrderDailyStat(
+            day=day,
+            package_id=package_id,
+            completed_count=deltas.get("completed_count", 0),
+            cancelled_count=deltas.get("cancelled_count", 0),
+            delivered_count=deltas.get("delivered_count", 0),
+            revenue=deltas.get("revenue", 0.0),
+            cancelled_revenue=deltas.get("cancelled_revenue", 0.0)
+        )
+        try:
+            with self.db.begin_nested():
+                self.db.add(row)
+        except IntegrityError:
+
+            # Another request created the row between our UPDATE and INSERT
+            self.db.execute(
+                update(OrderDailyStat)
+                .where(OrderDailyStat.day == day)
+                .where(package_filter)
+                .values(**values)
+            )
+
+
+def _as_date(value) -> date:
+
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
@@ -1,10 +1,17 @@
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import update, func
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import update, func, case
 from app.domain.entities.Order import Order
+from app.domain.entities.Package import Package
+from app.domain.entities.User import User
+from app.domain.entities.Delivery import Delivery
+from app.domain.entities.OrderEvent import OrderEvent
 from app.domain.repositories.order_repository import IOrderRepository
 from app.infrastructure.utils.time_utils import get_current_time
+from app.infrastructure.events import publish, ORDERS_CHANGED
+from app.infrastructure.metrics import live_counters
+from app.infrastructure.database.order_versions import bump_orders_version
 
 
 class OrderRepository(IOrderRepository):
@@ -61,15 +68,34 @@ class OrderRepository(IOrderRepository):
 
         return query.all()
 
+    def get_timeline(self, order_id: int) -> Tuple[List[Delivery], List[OrderEvent]]:
+        deliveries = (
+            self.db.query(Delivery)
+            .options(joinedload(Delivery.user), selectinload(Delivery.files))
+            .filter(Delivery.order_id == order_id)
+            .order_by(Delivery.id)
+            .all()
+        )
+        events = (
+            self.db.query(OrderEvent)
+            .options(joinedload(OrderEvent.user))
+            .filter(OrderEvent.order_id == order_id)
+            .order_by(OrderEvent.created_at.desc())
+            .all()
+        )
+        return deliveries, events
+
     def create(self, order: Order) -> Order:
         self.db.add(order)
         self.db.commit()
         self.db.refresh(order)
+        publish(ORDERS_CHANGED, order_ids=[order.id])
         return order
 
     def update(self, order: Order) -> Order:
         self.db.commit()
         self.db.refresh(order)
+        publish(ORDERS_CHANGED, order_ids=[order.id])
         return order
 
     def update_late_orders(self) -> int:
@@ -77,6 +103,12 @@ class OrderRepository(IOrderRepository):
 
         current_time = get_current_time()
 
+        reverting = (Order.status == "Late") & (Order.due_date >= current_time)
+        becoming_late = Order.status.in_(["Active", "Revision"]) & (Order.due_date < current_time)
+        affected_users = [
+            user_id for (user_id,) in
+            self.db.query(Order.user_id).filter(reverting | becoming_late).distinct()
+        ]
 
 
         revert_result = self.db.execute(
@@ -96,11 +128,86 @@ class OrderRepository(IOrderRepository):
         )
         late_count = result.rowcount
 
+        if revert_count or late_count:
+            bump_orders_version(self.db, affected_users)
         self.db.commit()
+        live_counters.record(live_counters.LATE_TRANSITIONS, late_count)
 
+        if revert_count or late_count:
+            publish(ORDERS_CHANGED, order_ids=None)
 
         return revert_count + late_count
 
+    def get_upcoming_deadlines(self, until: datetime) -> List[Tuple[datetime, int]]:
+        return (
+            self.db.query(Order.due_date, Order.id)
+            .filter(Order.status.in_(["Active", "Revision"]), Order.due_date < until)
+            .all()
+        )
+
+    def get_deadline_states(self, order_ids: List[int]) -> List[Tuple[int, str, Optional[datetime]]]:
+        if not order_ids:
+            return []
+        return (
+            self.db.query(Order.id, Order.status, Order.due_date)
+            .filter(Order.id.in_(order_ids))
+            .all()
+        )
+
+    def get_work_queue_rows(self, order_ids: Optional[List[int]] = None) -> List[Tuple[int, str, Optional[datetime], Optional[str], Optional[str]]]:
+        query = (
+            self.db.query(Order.id, Order.status, Order.due_date, User.username, Package.name)
+            .outerjoin(User, Order.user_id == User.id)
+            .outerjoin(Package, Order.package_id == Package.id)
+        )
+        if order_ids is None:
+            query = query.filter(Order.status.in_(["Active", "Revision", "Late", "In dispute"]))
+        elif not order_ids:
+            return []
+        else:
+            query = query.filter(Order.id.in_(order_ids))
+        return query.all()
+
+    def mark_late(self, order_ids: List[int]) -> int:
+        count = self._transition(
+            order_ids,
+            Order.status.in_(["Active", "Revision"]) & (Order.due_date < get_current_time()),
+            "Late"
+        )
+        live_counters.record(live_counters.LATE_TRANSITIONS, count)
+        return count
+
+    def revert_late(self, order_ids: List[int]) -> int:
+        return self._transition(
+            order_ids,
+            (Order.status == "Late") & (Order.due_date >= get_current_time()),
+            "Active"
+        )
+
+    def _transition(self, order_ids: List[int], condition, status: str) -> int:
+        """Targeted status flip guarded by condition, so a stale schedule entry is a no-op"""
+
+        if not order_ids:
+            return 0
+
+        matching = Order.id.in_(order_ids) & condition
+        affected = self.db.query(Order.id, Order.user_id).filter(matching).all()
+        if not affected:
+            return 0
+
+        count = self.db.execute(
+            update(Order)
+            .where(Order.id.in_([order_id for order_id, _ in affected]))
+            .where(condition)
+            .values(status=status)
+        ).rowcount
+        bump_orders_version(self.db, [user_id for _, user_id in affected])
+        self.db.commit()
+
+        if count:
+            publish(ORDERS_CHANGED, order_ids=[order_id for order_id, _ in affected])
+        return count
+
     def get_completed_orders(self, user_id: Optional[int] = None, start_date: Optional[datetime] = None) -> List[Order]:
         query = self.db.query(Order).options(
             joinedload(Order.package),
@@ -116,10 +223,11 @@ class OrderRepository(IOrderRepository):
         return query.all()
 
     def get_revenue(self, user_id: Optional[int] = None, status: str = "Completed", start_date: Optional[datetime] = None) -> float:
-        from app.domain.entities.Package import Package
-
-        query = self.db.query(Order).options(joinedload(Order.package)).filter(
-            Order.status == status
+        query = (
+            self.db.query(func.coalesce(func.sum(Package.price), 0.0))
+            .select_from(Order)
+            .join(Package, Order.package_id == Package.id)
+            .filter(Order.status == status)
         )
 
         if user_id:
@@ -128,6 +236,83 @@ class OrderRepository(IOrderRepository):
         if start_date:
             query = query.filter(Order.completed_date >= start_date)
 
-        orders = query.all()
-        return sum(float(o.package.price) if o.package and o.package.price is not None else 0.0 for o in orders)
+        return float(query.scalar() or 0.0)
 
+    def get_status_counts(self) -> Dict[str, int]:
+        rows = (
+            self.db.query(Order.status, func.count(Order.id))
+            .group_by(Order.status)
+            .all()
+        )
+        return {status: count for status, count in rows}
+
+    def get_review_summary(self) -> Tuple[int, float]:
+        count, average = (
+            self.db.query(func.count(Order.review), func.avg(Order.review))
+            .filter(Order.review.isnot(None))
+            .one()
+        )
+        return int(count or 0), float(average or 0.0)
+
+    def get_revenue_for_statuses(self, statuses: List[str]) -> float:
+        total = (
+            self.db.query(func.coalesce(func.sum(Package.price), 0.0))
+            .select_from(Order)
+            .join(Package, Order.package_id == Package.id)
+            .filter(Order.status.in_(statuses))
+            .scalar()
+        )
+        return float(total or 0.0)
+
+    def get_bucketed_totals(self, start_date: datetime, end_date: datetime, granularity: str = "day") -> List[Tuple[str, str, int, float]]:
+        """Completed orders are bucketed by completed_date, cancelled ones by cancelled_date"""
+
+        event_date = case(
+            (Order.status == "Completed", Order.completed_date),
+            else_=Order.cancelled_date
+        )
+        bucket = self._bucket_expression(event_date, granularity).label("bucket")
+
+        rows = (
+            self.db.query(
+                bucket,
+                Order.status,
+                func.count(Order.id),
+                func.coalesce(func.sum(Package.price), 0.0)
+            )
+            .select_from(Order)
+            .outerjoin(Package, Order.package_id == Package.id)
+            .filter(Order.status.in_(["Completed", "Cancelled"]))
+            .filter(event_date >= start_date)
+            .filter(event_date < end_date)
+            .group_by(bucket, Order.status)
+            .all()
+        )
+        return [(str(b), status, int(count), float(revenue)) for b, status, count, revenue in rows]
+
+    def _bucket_expression(self, column, granularity: str):
+        """Format a datetime column as the bucket key used by time_buckets.bucket_key"""
+
+        dialect = self.db.get_bind().dialect.name
+
+        if granularity == "week":
+            if dialect == "sqlite":
+                return func.date(column, "-6 days", "weekday 1")
+            if dialect == "postgresql":
+                return func.to_char(func.date_trunc("week", column), "YYYY-MM-DD")
+            return func.date_format(func.subdate(column, func.weekday(column)), "%Y-%m-%d")
+
+        formats = {
+            "hour": ("%Y-%m-%d %H:00", "YYYY-MM-DD HH24:00"),
+            "day": ("%Y-%m-%d", "YYYY-MM-DD"),
+            "month": ("%Y-%m", "YYYY-MM"),
+        }
+        if granularity not in formats:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        strftime_format, pg_format = formats[granularity]
+
+        if dialect == "sqlite":
+            return func.strftime(strftime_format, column)
+        if dialect == "postgresql":
+            return func.to_char(column, pg_format)
+        return func.date_format(column, strftime_format)
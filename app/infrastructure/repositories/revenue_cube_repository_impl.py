@@ -0,0 +1,150 @@
+from typing import Optional, List, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import update, func
+from sqlalchemy.exc import IntegrityError
+from app.domain.entities.Order import Order
+from app.domain.entities.Package import Package
+from app.domain.entities.User import User
+from app.domain.entities.RevenueCubeCell import RevenueCubeCell, NO_PACKAGE, NO_CUSTOMER
+from app.domain.repositories.revenue_cube_repository import IRevenueCubeRepository
+
+
+CUBE_STATUSES = ("Completed", "Cancelled")
+
+
+class RevenueCubeRepository(IRevenueCubeRepository):
+
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, period: str, package_id: Optional[int], user_id: Optional[int], status: str, price: float) -> None:
+        package_id = package_id or NO_PACKAGE
+        user_id = user_id or NO_CUSTOMER
+        cell = (
+            (RevenueCubeCell.period == period),
+            (RevenueCubeCell.package_id == package_id),
+            (RevenueCubeCell.user_id == user_id),
+            (RevenueCubeCell.status == status),
+        )
+        price = float(price or 0.0)
+        increment = (
+            update(RevenueCubeCell)
+            .where(*cell)
+            .values(order_count=RevenueCubeCell.order_count + 1, revenue=RevenueCubeCell.revenue + price)
+        )
+
+        if self.db.execute(increment).rowcount:
+            return
+
+        try:
+            with self.db.begin_nested():
+                self.db.add(RevenueCubeCell(
+                    period=period, package_id=package_id, user_id=user_id,
+                    status=status, order_count=1, revenue=price
+                ))
+        except IntegrityError:
+
+            self.db.execute(increment)
+
+    def get_cells(
+        self,
+        start_period: str,
+        end_period: str,
+        dimensions: List[str],
+        statuses: Optional[List[str]] = None,
+        package_id: Optional[int] = None,
+        user_id: Optional[int] = None
+    ) -> List[dict]:
+        columns = [RevenueCubeCell.period.label("period")]
+        if "package" in dimensions:
+            columns += [RevenueCubeCell.package_id.label("package_id"), Package.name.label("package_name")]
+        if "customer" in dimensions:
+            columns += [RevenueCubeCell.user_id.label("user_id"), User.username.label("username")]
+        if "status" in dimensions:
+            columns += [RevenueCubeCell.status.label("status")]
+
+        query = self.db.query(
+            *columns,
+            func.sum(RevenueCubeCell.order_count).label("orders"),
+            func.sum(RevenueCubeCell.revenue).label("revenue")
+        )
+        if "package" in dimensions:
+            query = query.outerjoin(Package, RevenueCubeCell.package_id == Package.id)
+        if "customer" in dimensions:
+            query = query.outerjoin(User, RevenueCubeCell.user_id == User.id)
+
+        query = self._filtered(query, start_period, end_period, statuses, package_id, user_id)
+        rows = query.group_by(*columns).all()
+
+        cells = []
+        for row in rows:
+            cell = {**row._asdict(), "orders": int(row.orders), "revenue": float(row.revenue)}
+            if "package_id" in cell:
+                cell["package_id"] = cell["package_id"] or None
+            if "user_id" in cell:
+                cell["user_id"] = cell["user_id"] or None
+            cells.append(cell)
+        return cells
+
+    def get_total(
+        self,
+        start_period: str,
+        end_period: str,
+        status: str,
+        package_id: Optional[int] = None,
+        user_id: Optional[int] = None
+    ) -> Tuple[int, float]:
+        query = self.db.query(
+            func.coalesce(func.sum(RevenueCubeCell.order_count), 0),
+            func.coalesce(func.sum(RevenueCubeCell.revenue), 0.0)
+        )
+        count, revenue = self._filtered(query, start_period, end_period, [status], package_id, user_id).one()
+        return int(count), float(revenue)
+
+    def rebuild(self) -> int:
+        cells = {}
+
+        # Bucketed in Python so the month key is identical on every database dialect
+        rows = (
+            self.db.query(
+                Order.status,
+                Order.completed_date,
+                Order.cancelled_date,
+                Order.package_id,
+                Order.user_id,
+                Package.price
+            )
+            .outerjoin(Package, Order.package_id == Package.id)
+            .filter(Order.status.in_(CUBE_STATUSES))
+            .yield_per(5000)
+        )
+        for status, completed_date, cancelled_date, package_id, user_id, price in rows:
+            event_date = completed_date if status == "Completed" else cancelled_date
+            if event_date is None:
+                continue
+            key = (event_date.strftime('%Y-%m'), package_id or NO_PACKAGE, user_id or NO_CUSTOMER, status)
+            count, revenue = cells.get(key, (0, 0.0))
+            cells[key] = (count + 1, revenue + float(price or 0.0))
+
+        self.db.query(RevenueCubeCell).delete(synchronize_session=False)
+        self.db.add_all([
+            RevenueCubeCell(
+                period=period, package_id=package_id, user_id=user_id,
+                status=status, order_count=count, revenue=revenue
+            )
+            for (period, package_id, user_id, status), (count, revenue) in cells.items()
+        ])
+        self.db.commit()
+        return len(cells)
+
+    def _filtered(self, query, start_period, end_period, statuses, package_id, user_id):
+
+        query = query.filter(RevenueCubeCell.period >= start_period, RevenueCubeCell.period <= end_period)
+        if statuses:
+            query = query.filter(RevenueCubeCell.status.in_(statuses))
+        if package_id is not None:
+            query = query.filter(RevenueCubeCell.package_id == package_id)
+        if user_id is not None:
+            query = query.filter(RevenueCubeCell.user_id == user_id)
+        return query
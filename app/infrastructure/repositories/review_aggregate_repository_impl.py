@@ -0,0 +1,97 @@
+from typing import Optional, List
+from sqlalchemy.orm import Session
+from sqlalchemy import update, func
+from sqlalchemy.exc import IntegrityError
+from app.domain.entities.Order import Order
+from app.domain.entities.ReviewAggregate import ReviewAggregate, SITE_WIDE
+from app.domain.repositories.review_aggregate_repository import IReviewAggregateRepository
+
+
+_COUNTERS = ("review_count", "rating_sum", "stars_1", "stars_2", "stars_3", "stars_4", "stars_5", "completed_count")
+
+
+class ReviewAggregateRepository(IReviewAggregateRepository):
+
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_review(self, package_id: Optional[int], rating: int, previous_rating: Optional[int] = None) -> None:
+        deltas = {"rating_sum": rating - (previous_rating or 0)}
+        if previous_rating is None:
+            deltas["review_count"] = 1
+        elif previous_rating != rating:
+            deltas[f"stars_{previous_rating}"] = -1
+        if previous_rating != rating:
+            deltas[f"stars_{rating}"] = 1
+
+        self._apply(package_id, deltas)
+
+    def record_completed(self, package_id: Optional[int]) -> None:
+        self._apply(package_id, {"completed_count": 1})
+
+    def get(self, package_id: int = SITE_WIDE) -> Optional[ReviewAggregate]:
+        return self.db.query(ReviewAggregate).filter(ReviewAggregate.package_id == package_id).first()
+
+    def get_all(self) -> List[ReviewAggregate]:
+        return self.db.query(ReviewAggregate).order_by(ReviewAggregate.package_id).all()
+
+    def rebuild(self) -> int:
+        rows = {}
+
+        def rows_for(package_id):
+            targets = _targets(package_id)
+            for target in targets:
+                if target not in rows:
+                    rows[target] = ReviewAggregate(package_id=target, **{name: 0 for name in _COUNTERS})
+            return [rows[target] for target in targets]
+
+        rows_for(SITE_WIDE)
+
+        for package_id, rating, count in (
+            self.db.query(Order.package_id, Order.review, func.count(Order.id))
+            .filter(Order.review.isnot(None))
+            .group_by(Order.package_id, Order.review)
+        ):
+            for row in rows_for(package_id):
+                row.review_count += count
+                row.rating_sum += rating * count
+                if 1 <= rating <= 5:
+                    setattr(row, f"stars_{rating}", getattr(row, f"stars_{rating}") + count)
+
+        for package_id, count in (
+            self.db.query(Order.package_id, func.count(Order.id))
+            .filter(Order.status == "Completed")
+            .group_by(Order.package_id)
+        ):
+            for row in rows_for(package_id):
+                row.completed_count += count
+
+        self.db.query(ReviewAggregate).delete()
+        self.db.add_all(rows.values())
+        self.db.commit()
+        return len(rows)
+
+    def _apply(self, package_id: Optional[int], deltas: dict) -> None:
+        """Add deltas to the package row and the site-wide row, creating them on first use. Does not commit."""
+
+        values = {name: getattr(ReviewAggregate, name) + delta for name, delta in deltas.items()}
+
+        for target in _targets(package_id):
+            increment = update(ReviewAggregate).where(ReviewAggregate.package_id == target).values(**values)
+            if self.db.execute(increment).rowcount:
+                continue
+
+            row = ReviewAggregate(package_id=target, **{name: deltas.get(name, 0) for name in _COUNTERS})
+            try:
+                with self.db.begin_nested():
+                    self.db.add(row)
+            except IntegrityError:
+
+                # Another request created the row between our UPDATE and INSERT
+                self.db.execute(increment)
+
+
+def _targets(package_id: Optional[int]) -> List[int]:
+
+    return [package_id, SITE_WIDE] if package_id else [SITE_WIDE]
@@ -0,0 +1,160 @@
+from datetime import datetime
+from typing import Callable, List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import update, select, event
+from sqlalchemy.exc import IntegrityError
+from app.domain.entities.StoredBlob import StoredBlob
+from app.domain.repositories.stored_blob_repository import IStoredBlobRepository
+from app.infrastructure.utils.time_utils import get_current_time
+
+
+_AFTER_COMMIT_KEY = "stored_blob_after_commit"
+_AFTER_ROLLBACK_KEY = "stored_blob_after_rollback"
+
+
+class StoredBlobRepository(IStoredBlobRepository):
+
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, sha256: str) -> Optional[StoredBlob]:
+        return self.db.query(StoredBlob).filter(StoredBlob.sha256 == sha256).first()
+
+    def get_many(self, hashes: List[str]) -> List[StoredBlob]:
+        if not hashes:
+            return []
+        return self.db.query(StoredBlob).filter(StoredBlob.sha256.in_(set(hashes))).all()
+
+    def acquire(self, sha256: str, path: str, size: int) -> str:
+        if self._increment(sha256):
+            return self._path_of(sha256)
+
+        try:
+            with self.db.begin_nested():
+                self.db.add(StoredBlob(
+                    sha256=sha256,
+                    path=path,
+                    size=size,
+                    ref_count=1,
+                    created_at=get_current_time()
+                ))
+            return path
+        except IntegrityError:
+
+            # Another request stored the same content between our UPDATE and INSERT
+            self._increment(sha256)
+            return self._path_of(sha256)
+
+    def register(self, sha256: str, path: str, size: int) -> str:
+        existing = self._path_of(sha256)
+        if existing:
+            return existing
+
+        try:
+            with self.db.begin_nested():
+                self.db.add(StoredBlob(
+                    sha256=sha256,
+                    path=path,
+                    size=size,
+                    ref_count=0,
+                    created_at=get_current_time()
+                ))
+            return path
+        except IntegrityError:
+            return self._path_of(sha256)
+
+    def release_unreferenced(self, before: datetime) -> List[str]:
+        candidates = (
+            self.db.query(StoredBlob.sha256, StoredBlob.path)
+            .filter(StoredBlob.ref_count <= 0, StoredBlob.created_at < before)
+            .all()
+        )
+
+        released = []
+        for sha256, path in candidates:
+
+            # Skip blobs a delivery referenced since the query above
+            deleted = (
+                self.db.query(StoredBlob)
+                .filter(StoredBlob.sha256 == sha256, StoredBlob.ref_count <= 0)
+                .delete(synchronize_session=False)
+            )
+            if deleted:
+                released.append(path)
+        return released
+
+    def release_path(self, path: str) -> Optional[str]:
+        result = self.db.execute(
+            update(StoredBlob)
+            .where(StoredBlob.path == path, StoredBlob.ref_count > 0)
+            .values(ref_count=StoredBlob.ref_count - 1)
+        )
+        if not result.rowcount:
+            return None
+
+        deleted = (
+            self.db.query(StoredBlob)
+            .filter(StoredBlob.path == path, StoredBlob.ref_count <= 0)
+            .delete(synchronize_session=False)
+        )
+        return path if deleted else None
+
+    def _increment(self, sha256: str) -> bool:
+
+        result = self.db.execute(
+            update(StoredBlob)
+            .where(StoredBlob.sha256 == sha256)
+            .values(ref_count=StoredBlob.ref_count + 1)
+        )
+        return bool(result.rowcount)
+
+    def _path_of(self, sha256: str) -> str:
+
+        return self.db.query(StoredBlob.path).filter(StoredBlob.sha256 == sha256).scalar()
+
+    def path_in_use(self, path: str) -> bool:
+        with self.db.get_bind().connect() as conn:
+            return conn.execute(select(StoredBlob.sha256).where(StoredBlob.path == path)).first() is not None
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        self._listen()
+        self.db.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+    def after_rollback(self, callback: Callable[[], None]) -> None:
+        self._listen()
+        self.db.info.setdefault(_AFTER_ROLLBACK_KEY, []).append(callback)
+
+    def _listen(self) -> None:
+
+        if not event.contains(self.db, "after_commit", _run_after_commit):
+            event.listen(self.db, "after_commit", _run_after_commit)
+            event.listen(self.db, "after_transaction_end", _run_after_rollback)
+
+
+def _run_after_commit(session: Session) -> None:
+
+    # Savepoints (begin_nested) fire the same event; only the outer commit counts
+    if session.in_nested_transaction():
+        return
+    session.info.pop(_AFTER_ROLLBACK_KEY, None)
+    _run(session.info.pop(_AFTER_COMMIT_KEY, []))
+
+
+def _run_after_rollback(session: Session, transaction) -> None:
+
+    # Also fires when the session is closed without a commit, which rolls back
+    # without an after_rollback event. A commit has already emptied the lists.
+    if transaction.parent is not None:
+        return
+    session.info.pop(_AFTER_COMMIT_KEY, None)
+    _run(session.info.pop(_AFTER_ROLLBACK_KEY, []))
+
+
+def _run(callbacks: List[Callable[[], None]]) -> None:
+
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            print(f"[WARN] File cleanup after the transaction failed: {e}")
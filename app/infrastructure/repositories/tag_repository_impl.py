@@ -0,0 +1,18 @@
+from typing import List, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from app.domain.entities.Tag import Tag
+from app.domain.repositories.tag_repository import ITagRepository
+
+
+class TagRepository(ITagRepository):
+
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_name_counts(self) -> List[Tuple[str, int]]:
+        return self.db.query(Tag.name, func.count(Tag.id)).group_by(Tag.name).all()
+
+    def get_mood_counts(self) -> List[Tuple[str, int]]:
+        return self.db.query(Tag.mood, func.count(Tag.id)).group_by(Tag.mood).all()
@@ -0,0 +1,95 @@
+from typing import Optional, List, Tuple
+from datetime import date
+from sqlalchemy.orm import Session
+from sqlalchemy import update, func
+from sqlalchemy.exc import IntegrityError
+from app.domain.entities.Order import Order
+from app.domain.entities.Package import Package
+from app.domain.entities.Tag import Tag
+from app.domain.entities.OrderEvent import OrderEvent
+from app.domain.entities.TagTrendCounter import TagTrendCounter, NO_PACKAGE
+from app.domain.repositories.tag_trend_repository import ITagTrendRepository
+
+
+class TagTrendRepository(ITagTrendRepository):
+
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add(self, week: date, package_id: Optional[int], kind: str, value: str, count: int = 1) -> None:
+        package_id = package_id or NO_PACKAGE
+        cell = (
+            (TagTrendCounter.week == week),
+            (TagTrendCounter.package_id == package_id),
+            (TagTrendCounter.kind == kind),
+            (TagTrendCounter.value == value),
+        )
+        increment = update(TagTrendCounter).where(*cell).values(count=TagTrendCounter.count + count)
+
+        if self.db.execute(increment).rowcount:
+            return
+
+        try:
+            with self.db.begin_nested():
+                self.db.add(TagTrendCounter(week=week, package_id=package_id, kind=kind, value=value, count=count))
+        except IntegrityError:
+
+            self.db.execute(increment)
+
+    def get_weekly(
+        self,
+        start_week: date,
+        end_week: date,
+        kind: str,
+        package_id: Optional[int] = None
+    ) -> List[Tuple[date, str, int]]:
+        query = (
+            self.db.query(TagTrendCounter.week, TagTrendCounter.value, func.sum(TagTrendCounter.count))
+            .filter(
+                TagTrendCounter.kind == kind,
+                TagTrendCounter.week >= start_week,
+                TagTrendCounter.week <= end_week
+            )
+        )
+
+        if package_id is not None:
+            query = query.filter(TagTrendCounter.package_id == package_id)
+
+        rows = query.group_by(TagTrendCounter.week, TagTrendCounter.value).all()
+        return [(week, value, int(count)) for week, value, count in rows]
+
+    def get_tag_history(self) -> List[tuple]:
+        placements = (
+            self.db.query(
+                OrderEvent.order_id.label("order_id"),
+                func.min(OrderEvent.created_at).label("placed_at")
+            )
+            .filter(OrderEvent.event_type == "order_placed")
+            .group_by(OrderEvent.order_id)
+            .subquery()
+        )
+
+        return (
+            self.db.query(
+                Order.package_id,
+                Package.delivery_days,
+                Order.due_date,
+                placements.c.placed_at,
+                Tag.name,
+                Tag.mood
+            )
+            .join(Order, Tag.order_id == Order.id)
+            .outerjoin(placements, placements.c.order_id == Order.id)
+            .outerjoin(Package, Order.package_id == Package.id)
+            .all()
+        )
+
+    def replace_all(self, counters: dict) -> int:
+        self.db.query(TagTrendCounter).delete(synchronize_session=False)
+        self.db.add_all([
+            TagTrendCounter(week=week, package_id=package_id or NO_PACKAGE, kind=kind, value=value, count=count)
+            for (week, package_id, kind, value), count in counters.items()
+        ])
+        self.db.commit()
+        return len(counters)
@@ -0,0 +1,138 @@
+from typing import Optional, List, Tuple
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import update, func, insert, select, literal
+from sqlalchemy.exc import IntegrityError
+from app.domain.entities.Order import Order
+from app.domain.entities.Package import Package
+from app.domain.entities.Delivery import Delivery
+from app.domain.entities.OrderEvent import OrderEvent
+from app.domain.entities.Notification import Notification
+from app.domain.entities.TurnaroundHistogram import TurnaroundHistogram, NO_PACKAGE
+from app.domain.repositories.turnaround_repository import ITurnaroundRepository
+
+
+class TurnaroundRepository(ITurnaroundRepository):
+
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add(self, period: str, package_id: Optional[int], metric: str, bucket: int) -> None:
+        package_id = package_id or NO_PACKAGE
+        cell = (
+            (TurnaroundHistogram.period == period),
+            (TurnaroundHistogram.package_id == package_id),
+            (TurnaroundHistogram.metric == metric),
+            (TurnaroundHistogram.bucket == bucket),
+        )
+        increment = update(TurnaroundHistogram).where(*cell).values(count=TurnaroundHistogram.count + 1)
+
+        if self.db.execute(increment).rowcount:
+            return
+
+        try:
+            with self.db.begin_nested():
+                self.db.add(TurnaroundHistogram(
+                    period=period, package_id=package_id, metric=metric, bucket=bucket, count=1
+                ))
+        except IntegrityError:
+
+            self.db.execute(increment)
+
+    def get_histograms(self, start_period: str, end_period: str, package_id: Optional[int] = None) -> List[Tuple[str, str, int, int]]:
+        query = (
+            self.db.query(
+                TurnaroundHistogram.period,
+                TurnaroundHistogram.metric,
+                TurnaroundHistogram.bucket,
+                func.sum(TurnaroundHistogram.count)
+            )
+            .filter(TurnaroundHistogram.period >= start_period, TurnaroundHistogram.period <= end_period)
+        )
+
+        if package_id is not None:
+            query = query.filter(TurnaroundHistogram.package_id == package_id)
+
+        rows = query.group_by(
+            TurnaroundHistogram.period, TurnaroundHistogram.metric, TurnaroundHistogram.bucket
+        ).all()
+        return [(period, metric, bucket, int(count)) for period, metric, bucket, count in rows]
+
+    def get_placed_at(self, order_id: int) -> Optional[datetime]:
+        return (
+            self.db.query(func.min(OrderEvent.created_at))
+            .filter(OrderEvent.order_id == order_id, OrderEvent.event_type == "order_placed")
+            .scalar()
+        )
+
+    def get_last_delivered_at(self, order_id: int) -> Optional[datetime]:
+        return (
+            self.db.query(func.max(Delivery.delivered_at))
+            .filter(Delivery.order_id == order_id)
+            .scalar()
+        )
+
+    def get_delivery_timelines(self) -> List[tuple]:
+        deliveries = (
+            self.db.query(
+                Delivery.order_id.label("order_id"),
+                func.min(Delivery.delivered_at).label("first_delivered_at"),
+                func.max(Delivery.delivered_at).label("last_delivered_at")
+            )
+            .group_by(Delivery.order_id)
+            .subquery()
+        )
+        placements = (
+            self.db.query(
+                OrderEvent.order_id.label("order_id"),
+                func.min(OrderEvent.created_at).label("placed_at")
+            )
+            .filter(OrderEvent.event_type == "order_placed")
+            .group_by(OrderEvent.order_id)
+            .subquery()
+        )
+
+        return (
+            self.db.query(
+                Order.package_id,
+                Package.delivery_days,
+                Order.due_date,
+                Order.completed_date,
+                placements.c.placed_at,
+                deliveries.c.first_delivered_at,
+                deliveries.c.last_delivered_at
+            )
+            .join(deliveries, deliveries.c.order_id == Order.id)
+            .outerjoin(placements, placements.c.order_id == Order.id)
+            .outerjoin(Package, Order.package_id == Package.id)
+            .all()
+        )
+
+    def backfill_placed_events(self) -> int:
+        recorded = select(OrderEvent.order_id).where(OrderEvent.event_type == "order_placed")
+        placements = (
+            select(
+                Notification.order_id,
+                literal("order_placed"),
+                func.min(Order.user_id),
+                func.min(Notification.created_at)
+            )
+            .join(Order, Order.id == Notification.order_id)
+            .where(Notification.notification_type == "order_placed", Notification.order_id.not_in(recorded))
+            .group_by(Notification.order_id)
+        )
+        result = self.db.execute(
+            insert(OrderEvent)
+            .from_select(["order_id", "event_type", "user_id", "created_at"], placements)
+        )
+        return result.rowcount
+
+    def replace_all(self, cells: dict) -> int:
+        self.db.query(TurnaroundHistogram).delete(synchronize_session=False)
+        self.db.add_all([
+            TurnaroundHistogram(period=period, package_id=package_id or NO_PACKAGE, metric=metric, bucket=bucket, count=count)
+            for (period, package_id, metric, bucket), count in cells.items()
+        ])
+        self.db.commit()
+        return len(cells)
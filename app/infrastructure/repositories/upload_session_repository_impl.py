@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import update, or_
+from app.domain.entities.UploadSession import UploadSession
+from app.domain.repositories.upload_session_repository import IUploadSessionRepository
+from app.infrastructure.utils.time_utils import get_current_time
+
+
+class UploadSessionRepository(IUploadSessionRepository):
+
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, session: UploadSession) -> UploadSession:
+        self.db.add(session)
+        self.db.commit()
+        self.db.refresh(session)
+        return session
+
+    def get(self, session_id: str) -> Optional[UploadSession]:
+        return self.db.query(UploadSession).filter(UploadSession.id == session_id).first()
+
+    def claim(self, session_id: str, expected_offset: int, writer: str, stale_before: datetime) -> bool:
+        result = self.db.execute(
+            update(UploadSession)
+            .where(
+                UploadSession.id == session_id,
+                UploadSession.bytes_received == expected_offset,
+                or_(UploadSession.writer.is_(None), UploadSession.writing_since < stale_before)
+            )
+            .values(writer=writer, writing_since=get_current_time())
+            .execution_options(synchronize_session=False)
+        )
+        return bool(result.rowcount)
+
+    def advance(self, session_id: str, writer: str, new_offset: int) -> bool:
+        result = self.db.execute(
+            update(UploadSession)
+            .where(UploadSession.id == session_id, UploadSession.writer == writer)
+            .values(bytes_received=new_offset, writer=None, writing_since=None, updated_at=get_current_time())
+            .execution_options(synchronize_session=False)
+        )
+        return bool(result.rowcount)
+
+    def release(self, session_id: str, writer: str) -> None:
+        self.db.execute(
+            update(UploadSession)
+            .where(UploadSession.id == session_id, UploadSession.writer == writer)
+            .values(writer=None, writing_since=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    def delete(self, session: UploadSession) -> None:
+        self.db.delete(session)
+
+    def get_stale(self, before: datetime) -> List[UploadSession]:
+        return self.db.query(UploadSession).filter(UploadSession.updated_at < before).all()
@@ -25,6 +25,10 @@ class UserRepository(IUserRepository):
     def get_admins(self) -> List[User]:
         return self.db.query(User).filter(User.is_admin == True).all()
 
+    def get_orders_version(self, user_id: int) -> int:
+        version = self.db.query(User.orders_version).filter(User.id == user_id).scalar()
+        return version or 0
+
     def create(self, user: User) -> User:
         self.db.add(user)
         self.db.commit()
@@ -0,0 +1,249 @@
+"""Flips orders to Late (and back) when their due_date passes, from one background thread"""
+import heapq
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.infrastructure.database.database import SessionLocal
+from app.infrastructure.events import subscribe, ORDERS_CHANGED
+from app.infrastructure.repositories.order_repository_impl import OrderRepository
+from app.infrastructure.scheduling.lease import acquire_lease, release_lease
+from app.infrastructure.utils.time_utils import get_current_time
+
+
+LEASE_NAME = "deadline_scheduler"
+
+# Never sleep longer than this, so a stop request or clock change is noticed
+_MAX_WAIT_SECONDS = 30.0
+_ERROR_BACKOFF_SECONDS = 5.0
+
+
+class DeadlineScheduler:
+    """
+    Keeps the upcoming due_dates in a min-heap and wakes exactly when the
+    earliest one passes. Only the worker holding the database lease schedules;
+    the others retry the lease in the background.
+
+    Orders written by this worker are rescheduled immediately via ORDERS_CHANGED.
+    Every resync_seconds the heap is reloaded with deadlines due before the next
+    two resyncs and a catch-up update_late_orders runs, which covers writes made
+    by other workers and any time this worker was not the lease holder.
+    """
+
+    def __init__(self, resync_seconds: float = 60.0, lease_seconds: float = 30.0):
+        self.resync_seconds = resync_seconds
+        self.lease_seconds = lease_seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._heap: List[Tuple[datetime, int]] = []
+        self._scheduled: Dict[int, datetime] = {}
+        self._pending: Set[int] = set()
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.is_leader = False
+
+    def start(self) -> None:
+
+        if self._thread is not None:
+            return
+        subscribe(ORDERS_CHANGED, self.on_orders_changed)
+        self._thread = threading.Thread(target=self._run, name="deadline-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+        if self.is_leader:
+            db = SessionLocal()
+            try:
+                release_lease(db, LEASE_NAME, self.holder)
+            finally:
+                db.close()
+            self.is_leader = False
+
+    def on_orders_changed(self, order_ids: Optional[List[int]] = None, **_) -> None:
+        """Queue changed orders for rescheduling; bulk changes (order_ids=None) wait for the next resync"""
+
+        if not order_ids:
+            return
+        with self._condition:
+            self._pending.update(order_ids)
+            self._condition.notify()
+
+    def _run(self) -> None:
+
+        next_lease_check = 0.0
+        next_resync = 0.0
+
+        while True:
+            with self._condition:
+                if self._stopping:
+                    return
+
+            try:
+                now = time.monotonic()
+                if now >= next_lease_check:
+                    was_leader = self.is_leader
+                    self.is_leader = self._renew_lease()
+                    next_lease_check = now + self.lease_seconds / 3
+                    if self.is_leader and not was_leader:
+                        print(f"[OK] Deadline scheduler running in {self.holder}")
+                        next_resync = now
+                    if not self.is_leader:
+                        self._clear()
+
+                if self.is_leader:
+                    if now >= next_resync:
+                        self._resync()
+                        next_resync = now + self.resync_seconds
+                    self._process_pending()
+                    self._fire_due()
+
+                wait = next_lease_check - time.monotonic()
+                if self.is_leader:
+                    wait = min(wait, next_resync - time.monotonic(), self._seconds_until_next_deadline())
+            except Exception as e:
+                print(f"[WARN] Deadline scheduler error: {e}")
+                wait = _ERROR_BACKOFF_SECONDS
+
+            with self._condition:
+                if not self._stopping and not (self.is_leader and self._pending):
+                    self._condition.wait(timeout=max(0.0, min(wait, _MAX_WAIT_SECONDS)))
+
+    def _renew_lease(self) -> bool:
+
+        db = SessionLocal()
+        try:
+            return acquire_lease(db, LEASE_NAME, self.holder, self.lease_seconds)
+        finally:
+            db.close()
+
+    def _resync(self) -> None:
+
+        db = SessionLocal()
+        try:
+            repository = OrderRepository(db)
+            repository.update_late_orders()
+            until = get_current_time() + timedelta(seconds=2 * self.resync_seconds)
+            deadlines = repository.get_upcoming_deadlines(until)
+        finally:
+            db.close()
+
+        with self._condition:
+            self._heap = [(due, order_id) for due, order_id in deadlines if due]
+            heapq.heapify(self._heap)
+            self._scheduled = {order_id: due for due, order_id in self._heap}
+
+    def _process_pending(self) -> None:
+
+        with self._condition:
+            order_ids, self._pending = list(self._pending), set()
+        if not order_ids:
+            return
+
+        db = SessionLocal()
+        try:
+            repository = OrderRepository(db)
+            states = repository.get_deadline_states(order_ids)
+            now = get_current_time()
+
+            overdue_late = [oid for oid, status, due in states if status == "Late" and due and due >= now]
+            if overdue_late:
+                repository.revert_late(overdue_late)
+        finally:
+            db.close()
+
+        with self._condition:
+            for order_id, status, due in states:
+                if status in ("Active", "Revision") and due:
+                    self._schedule(order_id, due)
+                elif order_id in overdue_late and due:
+                    self._schedule(order_id, due)
+                else:
+                    self._scheduled.pop(order_id, None)
+
+    def _fire_due(self) -> None:
+
+        now = get_current_time()
+        due_ids = []
+        with self._condition:
+            while self._heap and self._heap[0][0] < now:
+                due, order_id = heapq.heappop(self._heap)
+                if self._scheduled.get(order_id) == due:
+                    del self._scheduled[order_id]
+                    due_ids.append(order_id)
+
+        if not due_ids:
+            return
+
+        db = SessionLocal()
+        try:
+            OrderRepository(db).mark_late(due_ids)
+        finally:
+            db.close()
+
+    def _schedule(self, order_id: int, due: datetime) -> None:
+        """Caller holds the condition; replaced entries stay in the heap and are skipped when popped"""
+
+        if self._scheduled.get(order_id) != due:
+            self._scheduled[order_id] = due
+            heapq.heappush(self._heap, (due, order_id))
+
+    def _seconds_until_next_deadline(self) -> float:
+
+        with self._condition:
+            if not self._heap:
+                return _MAX_WAIT_SECONDS
+            due = self._heap[0][0]
+        return (due - get_current_time()).total_seconds()
+
+    def _clear(self) -> None:
+
+        with self._condition:
+            self._heap = []
+            self._scheduled = {}
+            self._pending = set()
+
+
+_scheduler: Optional[DeadlineScheduler] = None
+
+
+def start_deadline_scheduler() -> Optional[DeadlineScheduler]:
+    """Start the process-wide scheduler unless DEADLINE_SCHEDULER=false"""
+
+    global _scheduler
+    if os.getenv("DEADLINE_SCHEDULER", "true").lower() != "true":
+        print("[INFO] Deadline scheduler disabled (DEADLINE_SCHEDULER=false)")
+        return None
+
+    if _scheduler is None:
+        _scheduler = DeadlineScheduler(
+            resync_seconds=float(os.getenv("DEADLINE_SCHEDULER_RESYNC", "60")),
+            lease_seconds=float(os.getenv("DEADLINE_SCHEDULER_LEASE", "30"))
+        )
+        _scheduler.start()
+    return _scheduler
+
+
+def get_deadline_scheduler() -> Optional[DeadlineScheduler]:
+
+    return _scheduler
+
+
+def stop_deadline_scheduler() -> None:
+
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.stop()
+        _scheduler = None
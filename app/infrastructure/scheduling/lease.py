@@ -0,0 +1,47 @@
+"""Database-backed lease so that only one worker process runs a background job"""
+from datetime import timedelta
+
+from sqlalchemy import update, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.domain.entities.SchedulerLease import SchedulerLease
+from app.infrastructure.utils.time_utils import get_current_time
+
+
+def acquire_lease(db: Session, name: str, holder: str, ttl_seconds: float) -> bool:
+    """
+    Take or renew the lease. Succeeds when it is free, expired or already held by
+    holder; a single conditional UPDATE decides races between workers.
+    """
+
+    now = get_current_time()
+    expires_at = now + timedelta(seconds=ttl_seconds)
+
+    result = db.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name)
+        .where(or_(SchedulerLease.holder == holder, SchedulerLease.expires_at < now))
+        .values(holder=holder, expires_at=expires_at)
+    )
+    if result.rowcount:
+        db.commit()
+        return True
+
+    try:
+        db.add(SchedulerLease(name=name, holder=holder, expires_at=expires_at))
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+
+
+def release_lease(db: Session, name: str, holder: str) -> None:
+
+    db.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+        .values(expires_at=get_current_time())
+    )
+    db.commit()
@@ -0,0 +1,140 @@
+"""In-memory priority queue of the orders an admin has to act on next"""
+import heapq
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+ACTIONABLE_STATUSES = ("Active", "Revision", "Late", "In dispute")
+
+# Orders without a due date sort after every dated one
+_NO_DEADLINE = datetime.max
+
+QueueRow = Tuple[int, str, Optional[datetime], Optional[str], Optional[str]]
+
+
+class WorkQueue:
+    """
+    Binary min-heap of (due_date, order_id) over the actionable orders, so the
+    earliest deadline (and therefore every Late order) comes first. A changed
+    order is pushed again and its old entry is left behind; entries that no
+    longer match _keys are skipped when read and dropped on compaction.
+
+    top(n) walks the heap from the root with a small frontier heap, touching
+    O(n) nodes, so reading the head never sorts or pops the whole queue.
+    """
+
+    def __init__(self, max_age_seconds: float = 300.0):
+        self.max_age_seconds = max_age_seconds
+        self._heap: List[Tuple[datetime, int]] = []
+        self._keys: Dict[int, Tuple[datetime, int]] = {}
+        self._items: Dict[int, dict] = {}
+        self._dirty: Set[int] = set()
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def needs_load(self) -> bool:
+        """True before the first load, after a bulk change and once the queue is older than max_age_seconds"""
+
+        with self._lock:
+            return self._loaded_at is None or time.monotonic() - self._loaded_at > self.max_age_seconds
+
+    def load(self, rows: Iterable[QueueRow]) -> None:
+        """Replace the queue with (order_id, status, due_date, username, package) rows"""
+
+        with self._lock:
+            self._heap, self._keys, self._items = [], {}, {}
+            for row in rows:
+                self._put(*row)
+            heapq.heapify(self._heap)
+            self._dirty = set()
+            self._loaded_at = time.monotonic()
+
+    def refresh(self, order_ids: Iterable[int], rows: Iterable[QueueRow]) -> None:
+        """Apply the current rows of order_ids; ids without a row are no longer queued"""
+
+        with self._lock:
+            missing = set(order_ids)
+            for row in rows:
+                missing.discard(row[0])
+                self._put(*row, push=True)
+            for order_id in missing:
+                self._remove(order_id)
+            self._compact()
+
+    def put(self, order_id: int, status: str, due_date: Optional[datetime],
+            username: Optional[str] = None, package: Optional[str] = None) -> None:
+
+        with self._lock:
+            self._put(order_id, status, due_date, username, package, push=True)
+            self._dirty.discard(order_id)
+            self._compact()
+
+    def invalidate(self, order_ids: Optional[List[int]] = None, **_) -> None:
+        """ORDERS_CHANGED handler: re-read the given orders before the next top(); None reloads everything"""
+
+        with self._lock:
+            if order_ids is None:
+                self._loaded_at = None
+            else:
+                self._dirty.update(order_ids)
+
+    def take_dirty(self) -> List[int]:
+
+        with self._lock:
+            order_ids, self._dirty = list(self._dirty), set()
+            return order_ids
+
+    def top(self, n: int) -> List[dict]:
+
+        result = []
+        with self._lock:
+            heap = self._heap
+            frontier = [(heap[0], 0)] if heap else []
+            while frontier and len(result) < n:
+                entry, index = heapq.heappop(frontier)
+                if self._keys.get(entry[1]) == entry:
+                    result.append(dict(self._items[entry[1]]))
+                for child in (2 * index + 1, 2 * index + 2):
+                    if child < len(heap):
+                        heapq.heappush(frontier, (heap[child], child))
+        return result
+
+    def _put(self, order_id: int, status: str, due_date: Optional[datetime],
+             username: Optional[str] = None, package: Optional[str] = None, push: bool = False) -> None:
+        """Caller holds the lock; with push=False the caller heapifies afterwards"""
+
+        if status not in ACTIONABLE_STATUSES:
+            self._remove(order_id)
+            return
+
+        key = (due_date or _NO_DEADLINE, order_id)
+        self._items[order_id] = {
+            "id": order_id,
+            "status": status,
+            "due_date": due_date,
+            "username": username,
+            "package": package,
+        }
+        if self._keys.get(order_id) != key:
+            self._keys[order_id] = key
+            if push:
+                heapq.heappush(self._heap, key)
+            else:
+                self._heap.append(key)
+
+    def _remove(self, order_id: int) -> None:
+
+        self._keys.pop(order_id, None)
+        self._items.pop(order_id, None)
+
+    def _compact(self) -> None:
+        """Drop superseded entries once they outnumber the live ones"""
+
+        if len(self._heap) > 2 * len(self._keys) + 64:
+            self._heap = list(self._keys.values())
+            heapq.heapify(self._heap)
@@ -0,0 +1,112 @@
+"""In-memory prefix index of historical tag names and moods, ranked by frequency"""
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+TAG = "tag"
+MOOD = "mood"
+
+# Results for prefixes this short are memoized: they match the most keys
+_MEMO_PREFIX_LENGTH = 2
+
+
+class _KindIndex:
+    """Sorted normalized keys for bisect, plus count and display text per key"""
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.counts: Dict[str, int] = {}
+        self.display: Dict[str, str] = {}
+        self.memo: Dict[str, Dict[int, List[dict]]] = {}
+
+    def add(self, text: str, count: int = 1) -> None:
+
+        key = normalize(text)
+        if not key:
+            return
+        if key not in self.counts:
+            insort(self.keys, key)
+            self.counts[key] = 0
+            self.display[key] = text.strip()
+        self.counts[key] += count
+
+        for length in range(1, _MEMO_PREFIX_LENGTH + 1):
+            self.memo.pop(key[:length], None)
+
+    def suggest(self, prefix: str, limit: int, min_count: int) -> List[dict]:
+
+        memoize = len(prefix) <= _MEMO_PREFIX_LENGTH
+        if memoize and limit in self.memo.get(prefix, {}):
+            return self.memo[prefix][limit]
+
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + "\uffff", lo=start)
+        candidates = (
+            key for key in self.keys[start:end]
+            if self.counts[key] >= min_count
+        )
+        top = heapq.nsmallest(limit, candidates, key=lambda key: (-self.counts[key], key))
+        result = [{"value": self.display[key], "count": self.counts[key]} for key in top]
+
+        if memoize:
+            self.memo.setdefault(prefix, {})[limit] = result
+        return result
+
+
+class TagPrefixIndex:
+    """
+    Loaded lazily from grouped tag counts and reloaded after max_age_seconds so
+    workers converge on tags submitted elsewhere; submissions handled by this
+    worker are added immediately.
+    """
+
+    def __init__(self, max_age_seconds: float = 600.0, min_count: int = 1):
+        self.max_age_seconds = max_age_seconds
+        self.min_count = min_count
+        self._lock = threading.Lock()
+        self._kinds: Optional[Dict[str, _KindIndex]] = None
+        self._loaded_at = 0.0
+
+    def needs_load(self) -> bool:
+
+        return self._kinds is None or time.monotonic() - self._loaded_at > self.max_age_seconds
+
+    def load(self, name_counts: Iterable[Tuple[str, int]], mood_counts: Iterable[Tuple[str, int]]) -> None:
+        """Replace the index with (text, count) pairs, built off-lock and swapped in"""
+
+        kinds = {TAG: _KindIndex(), MOOD: _KindIndex()}
+        for kind, counts in ((TAG, name_counts), (MOOD, mood_counts)):
+            for text, count in counts:
+                if text:
+                    kinds[kind].add(text, int(count))
+
+        with self._lock:
+            self._kinds = kinds
+            self._loaded_at = time.monotonic()
+
+    def add(self, names: Iterable[str], moods: Iterable[str]) -> None:
+        """Count newly stored tags; ignored until the first load, which will include them"""
+
+        with self._lock:
+            if self._kinds is None:
+                return
+            for name in names:
+                self._kinds[TAG].add(name)
+            for mood in moods:
+                self._kinds[MOOD].add(mood)
+
+    def suggest(self, query: str, kind: str = TAG, limit: int = 10) -> List[dict]:
+
+        prefix = normalize(query)
+        with self._lock:
+            if not prefix or self._kinds is None or kind not in self._kinds:
+                return []
+            return self._kinds[kind].suggest(prefix, limit, self.min_count)
+
+
+def normalize(text: str) -> str:
+
+    return " ".join((text or "").lower().split())
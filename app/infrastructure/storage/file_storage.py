@@ -1,28 +1,266 @@
 from pathlib import Path
-from datetime import datetime
-from app.infrastructure.utils.time_utils import get_current_time
 from fastapi import UploadFile
-from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+from app.domain.repositories.stored_blob_repository import IStoredBlobRepository
+import hashlib
+import os
+import uuid
+
+
+_MB = 1024 * 1024
+
+CHUNK_SIZE = 1 * _MB
+
+BLOB_DIR = "blobs"
+
+# Partial and resumable uploads live beside the upload directory, not in it:
+# everything under upload_dir is served as /uploads. Keep it on the same
+# filesystem, finished files are moved into place with a rename.
+TMP_DIR = os.getenv("UPLOAD_TMP_DIR")
+
+MAX_DELIVERY_FILE_BYTES = int(float(os.getenv("MAX_DELIVERY_FILE_MB", "1024")) * _MB)
+MAX_DELIVERY_REQUEST_BYTES = int(float(os.getenv("MAX_DELIVERY_REQUEST_MB", "4096")) * _MB)
+MAX_AVATAR_BYTES = int(float(os.getenv("MAX_AVATAR_MB", "5")) * _MB)
+
+
+class UploadTooLargeError(ValueError):
+
+    def __init__(self, message: str, limit: int):
+        super().__init__(message)
+        self.limit = limit
 
 
 class FileStorageService:
    
 
-    def __init__(self, upload_dir: Path):
+    def __init__(self, upload_dir: Path, blob_repository: IStoredBlobRepository):
         self.upload_dir = upload_dir
         self.upload_dir.mkdir(exist_ok=True)
+        self.blob_repository = blob_repository
+        self.tmp_dir = Path(TMP_DIR) if TMP_DIR else self.upload_dir.parent / "upload_tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
 
-    def save_uploaded_file(self, file: UploadFile, prefix: str = "", user_id: Optional[int] = None) -> str:
-        
-        timestamp = get_current_time().strftime("%Y%m%d%H%M%S")
-        safe_name = file.filename.replace(" ", "_")
+    async def store_upload(self, file: UploadFile, max_bytes: Optional[int] = None) -> dict:
+        """
+        Stream the upload to a temporary file in CHUNK_SIZE pieces, hashing as it
+        goes. Disk I/O and hashing run in the thread pool, so the event loop never
+        blocks and at most one chunk is held in memory. The body is then stored
+        once under its SHA-256 (blobs/<aa>/<sha256><ext>); if that content is
+        already stored, the temporary file is dropped and the existing blob gets
+        another reference. Exceeding max_bytes raises UploadTooLargeError.
+
+        The returned filename is the blob path relative to upload_dir; the
+        original name is only kept as metadata.
+        """
+
+        part_path = self.tmp_dir / f"{uuid.uuid4().hex}.part"
+        digest = hashlib.sha256()
+        size = 0
+
+        handle = await run_in_threadpool(open, part_path, "wb")
+        try:
+            while True:
+                chunk = await file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise UploadTooLargeError(
+                        f"{file.filename} exceeds the {max_bytes // _MB} MB upload limit", max_bytes
+                    )
+                await run_in_threadpool(_write_chunk, handle, digest, chunk)
+            await run_in_threadpool(_sync_close, handle)
+        except BaseException:
+            await run_in_threadpool(_discard, handle, part_path)
+            raise
+
+        return await self._store_blob(part_path, digest.hexdigest(), size, file.filename)
+
+    async def store_uploads(
+        self,
+        files: List[UploadFile],
+        max_file_bytes: Optional[int] = None,
+        max_request_bytes: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Store every file of one request. If a limit is exceeded the references
+        already taken are left to the caller's rollback, which undoes them.
+        """
+
+        stored = []
+        remaining = max_request_bytes
+        for file in files:
+            limit = max_file_bytes
+            if remaining is not None:
+                limit = remaining if limit is None else min(limit, remaining)
 
-        if user_id:
-            filename = f"{prefix}_user{user_id}_{timestamp}_{safe_name}"
+            try:
+                info = await self.store_upload(file, max_bytes=limit)
+            except UploadTooLargeError as e:
+                if max_file_bytes is None or e.limit < max_file_bytes:
+                    raise UploadTooLargeError(
+                        f"The upload exceeds the {max_request_bytes // _MB} MB limit per request", max_request_bytes
+                    )
+                raise
+
+            stored.append(info)
+            if remaining is not None:
+                remaining -= info["size"]
+
+        return stored
+
+    def part_offset(self, name: str) -> int:
+        """Bytes of a resumable upload that are on disk"""
+
+        try:
+            return (self.tmp_dir / f"{name}.upload").stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    async def append_part(self, name: str, offset: int, chunks: AsyncIterator[bytes], max_bytes: int) -> int:
+        """
+        Write chunks into a resumable upload starting at offset, dropping anything
+        after it from an earlier, interrupted attempt. Returns the new offset; a
+        client disconnect ends the append with whatever arrived, which is flushed
+        to disk so the client can resume from there.
+        """
+
+        handle = await run_in_threadpool(_open_part, self.tmp_dir / f"{name}.upload", offset)
+        buffer = bytearray()
+        try:
+            try:
+                async for chunk in chunks:
+                    if offset + len(buffer) + len(chunk) > max_bytes:
+                        raise UploadTooLargeError("The chunk runs past the declared upload length", max_bytes)
+                    buffer += chunk
+                    if len(buffer) >= CHUNK_SIZE:
+                        await run_in_threadpool(handle.write, bytes(buffer))
+                        offset += len(buffer)
+                        buffer.clear()
+            except ClientDisconnect:
+                pass
+            if buffer:
+                await run_in_threadpool(handle.write, bytes(buffer))
+                offset += len(buffer)
+        finally:
+            await run_in_threadpool(_sync_close, handle)
+        return offset
+
+    async def store_part(self, name: str, original_filename: str) -> dict:
+        """
+        Move a completed resumable upload into the blob store. The blob is only
+        registered, not referenced: the delivery that lists it in known_files
+        takes the first reference.
+        """
+
+        part_path = self.tmp_dir / f"{name}.upload"
+        sha256, size = await run_in_threadpool(_hash_file, part_path)
+        return await self._store_blob(part_path, sha256, size, original_filename, reference=False)
+
+    async def discard_part(self, name: str) -> None:
+
+        await run_in_threadpool(_unlink, self.tmp_dir / f"{name}.upload")
+
+    def purge_unreferenced(self, before: datetime) -> int:
+        """Delete finished resumable uploads that no delivery claimed before the cutoff; files go on commit"""
+
+        paths = self.blob_repository.release_unreferenced(before)
+        for path in paths:
+            self._unlink_after_commit(path)
+        return len(paths)
+
+    async def _store_blob(self, part_path: Path, sha256: str, size: int, original_filename: str, reference: bool = True) -> dict:
+        """
+        Place a finished temporary file under its hash, or drop it when that
+        content is already stored. The row is written first, so a release of the
+        same blob committing meanwhile sees it in use and keeps the file. A file
+        placed here is deleted again if the transaction doesn't commit its row.
+        """
+
+        existing = self.blob_repository.get(sha256)
+        path = existing.path if existing else blob_path(sha256, original_filename)
+
+        if reference:
+            filename = self.blob_repository.acquire(sha256, path, size)
         else:
-            filename = f"{prefix}_{timestamp}_{safe_name}"
+            filename = self.blob_repository.register(sha256, path, size)
+        placed = await run_in_threadpool(_place, part_path, self.upload_dir / filename)
+        if placed:
+            self._unlink_after_rollback(filename)
+
+        return {
+            "filename": filename,
+            "original_filename": original_filename,
+            "size": size,
+            "sha256": sha256,
+            "deduplicated": existing is not None,
+        }
+
+    def known_blobs(self, hashes: List[str]) -> Dict[str, int]:
+        """Size of every blob among hashes that is stored and still on disk, so the client can skip sending it"""
+
+        return {
+            blob.sha256: blob.size for blob in self.blob_repository.get_many(hashes)
+            if (self.upload_dir / blob.path).exists()
+        }
 
-        return filename
+    def link(self, sha256: str, size: int, original_filename: str) -> Optional[dict]:
+        """
+        Reference an already stored blob instead of uploading it again. Returns
+        the same dict as store_upload, or None if the blob is no longer there.
+        """
+
+        blob = self.blob_repository.get(sha256)
+        if not blob or blob.size != size or not (self.upload_dir / blob.path).exists():
+            return None
+
+        filename = self.blob_repository.acquire(sha256, blob.path, blob.size)
+        if not (self.upload_dir / filename).exists():
+
+            # Deleted by a release that committed after the check above
+            return None
+
+        return {
+            "filename": filename,
+            "original_filename": original_filename,
+            "size": blob.size,
+            "sha256": sha256,
+            "deduplicated": True,
+        }
+
+    def release(self, filename: str) -> None:
+        """
+        Drop one reference to a stored blob; other files are left alone. The
+        file of the last reference is deleted once the transaction commits, so
+        a rollback never leaves a row without its file.
+        """
+
+        removed = self.blob_repository.release_path(filename)
+        if removed:
+            self._unlink_after_commit(removed)
+
+    def _unlink_after_commit(self, path: str) -> None:
+
+        def unlink():
+            # Stored again by another request since the release
+            if self.blob_repository.path_in_use(path):
+                return
+            _unlink(self.upload_dir / path)
+
+        self.blob_repository.after_commit(unlink)
+
+    def _unlink_after_rollback(self, path: str) -> None:
+
+        def unlink():
+            # Committed by another request that stored the same content
+            if self.blob_repository.path_in_use(path):
+                return
+            _unlink(self.upload_dir / path)
+
+        self.blob_repository.after_rollback(unlink)
 
     def get_file_path(self, filename: str) -> Path:
         
@@ -32,3 +270,71 @@ class FileStorageService:
         
         return (self.upload_dir / filename).exists()
 
+
+def blob_path(sha256: str, original_filename: Optional[str] = None) -> str:
+    """Blob location relative to the upload directory; the extension keeps static serving's content types right"""
+
+    suffix = Path(original_filename or "").suffix.lower()
+    if not (1 < len(suffix) <= 10 and suffix[1:].isalnum()):
+        suffix = ""
+    return f"{BLOB_DIR}/{sha256[:2]}/{sha256}{suffix}"
+
+
+def _write_chunk(handle, digest, chunk: bytes) -> None:
+
+    handle.write(chunk)
+    digest.update(chunk)
+
+
+def _place(part_path: Path, path: Path) -> bool:
+    """Move a finished upload into place, or drop it when identical content is already there; True if moved"""
+
+    if path.exists():
+        part_path.unlink()
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(part_path, path)
+    return True
+
+
+def _open_part(path: Path, offset: int):
+
+    handle = open(path, "r+b" if path.exists() else "w+b")
+    handle.truncate(offset)
+    handle.seek(offset)
+    return handle
+
+
+def _sync_close(handle) -> None:
+
+    handle.flush()
+    os.fsync(handle.fileno())
+    handle.close()
+
+
+def _hash_file(path: Path):
+
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _discard(handle, part_path: Path) -> None:
+
+    handle.close()
+    try:
+        part_path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _unlink(path: Path) -> None:
+
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,45 @@
+from typing import List, Sequence
+
+
+
+def lttb_indices(values: Sequence[float], max_points: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets: pick max_points indices of an evenly spaced
+    series, keeping the first and last point and, from every bucket in between,
+    the point forming the largest triangle with the previously kept point and
+    the average of the next bucket. Peaks and troughs survive the reduction.
+    """
+
+    n = len(values)
+    if max_points >= n or max_points < 3:
+        return list(range(n))
+
+    every = (n - 2) / (max_points - 2)
+    selected = [0]
+    a = 0
+
+    for i in range(max_points - 2):
+
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = (next_start + next_end - 1) / 2.0
+        avg_y = sum(values[next_start:next_end]) / (next_end - next_start)
+
+
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        ax, ay = a, values[a]
+
+        best_area = -1.0
+        best = range_start
+        for j in range(range_start, range_end):
+            area = abs((ax - avg_x) * (values[j] - ay) - (ax - j) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+
+        selected.append(best)
+        a = best
+
+    selected.append(n - 1)
+    return selected
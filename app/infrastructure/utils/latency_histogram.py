@@ -0,0 +1,56 @@
+import math
+from typing import Dict, Iterable, List
+
+
+
+# Each bucket is ~10% wide, so a percentile read from it is within ~5% of the exact value
+GROWTH = 1.1
+MAX_BUCKET = 250
+
+
+
+def bucket_for(minutes: float) -> int:
+    """Bucket 0 holds everything under a minute, bucket i covers [GROWTH**(i-1), GROWTH**i) minutes"""
+
+    if minutes < 1:
+        return 0
+    return min(int(math.log(minutes, GROWTH)) + 1, MAX_BUCKET)
+
+
+def bucket_value(bucket: int) -> float:
+    """Representative latency in minutes (geometric midpoint of the bucket)"""
+
+    if bucket <= 0:
+        return 0.5
+    return GROWTH ** (bucket - 0.5)
+
+
+def merge(histograms: Iterable[Dict[int, int]]) -> Dict[int, int]:
+    """Histograms of the same metric add bucket-wise, whatever package or period they came from"""
+
+    merged: Dict[int, int] = {}
+    for histogram in histograms:
+        for bucket, count in histogram.items():
+            merged[bucket] = merged.get(bucket, 0) + count
+    return merged
+
+
+def percentiles(histogram: Dict[int, int], points: List[float]) -> Dict[float, float]:
+    """Percentiles in minutes with one pass over the sorted buckets"""
+
+    total = sum(histogram.values())
+    if total == 0:
+        return {p: None for p in points}
+
+    ranks = sorted((max(1, math.ceil(p / 100.0 * total)), p) for p in points)
+    result = {}
+    seen = 0
+    i = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        while i < len(ranks) and ranks[i][0] <= seen:
+            result[ranks[i][1]] = bucket_value(bucket)
+            i += 1
+        if i == len(ranks):
+            break
+    return result
@@ -0,0 +1,25 @@
+import re
+from typing import List
+
+
+
+_WORD = re.compile(r"[^\W_]+(?:'[^\W_]+)?", re.UNICODE)
+MIN_KEYWORD_LENGTH = 3
+MAX_VALUE_LENGTH = 100
+
+
+
+def tag_keywords(name: str) -> List[str]:
+    """Distinct lower-case words of a tag name, in order of first appearance"""
+
+    seen = []
+    for word in _WORD.findall((name or "").lower()):
+        word = word[:MAX_VALUE_LENGTH]
+        if len(word) >= MIN_KEYWORD_LENGTH and word not in seen:
+            seen.append(word)
+    return seen
+
+
+def normalize_mood(mood: str) -> str:
+
+    return (mood or "").strip().lower()[:MAX_VALUE_LENGTH]
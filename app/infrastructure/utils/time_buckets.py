@@ -0,0 +1,75 @@
+from datetime import datetime, date, timedelta
+from typing import List
+
+
+
+GRANULARITIES = ("hour", "day", "week", "month")
+
+
+
+def bucket_start(value: datetime, granularity: str) -> datetime:
+    """Truncate to the start of its bucket; weeks start on Monday"""
+
+    if granularity == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unsupported granularity: {granularity}")
+
+
+def next_bucket(start: datetime, granularity: str) -> datetime:
+
+    if granularity == "hour":
+        return start + timedelta(hours=1)
+    if granularity == "day":
+        return start + timedelta(days=1)
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return datetime(start.year + 1, 1, 1) if start.month == 12 else datetime(start.year, start.month + 1, 1)
+    raise ValueError(f"Unsupported granularity: {granularity}")
+
+
+def bucket_key(value, granularity: str) -> str:
+    """
+    Sortable key shared by the SQL, rollup and columnar backends:
+    hour "YYYY-MM-DD HH:00", day/week "YYYY-MM-DD", month "YYYY-MM"
+    """
+
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    start = bucket_start(value, granularity)
+    if granularity == "hour":
+        return start.strftime('%Y-%m-%d %H:00')
+    if granularity == "month":
+        return start.strftime('%Y-%m')
+    return start.strftime('%Y-%m-%d')
+
+
+def bucket_starts(range_start: datetime, range_end: datetime, granularity: str) -> List[datetime]:
+    """Every bucket start from the bucket containing range_start up to range_end (exclusive)"""
+
+    starts = []
+    current = bucket_start(range_start, granularity)
+    while current < range_end:
+        starts.append(current)
+        current = next_bucket(current, granularity)
+    return starts
+
+
+def bucket_count(range_start: datetime, range_end: datetime, granularity: str) -> int:
+    """Upper bound on len(bucket_starts(...)) without building the list"""
+
+    span = range_end - range_start
+    if granularity == "hour":
+        return int(span.total_seconds() // 3600) + 2
+    if granularity == "day":
+        return span.days + 2
+    if granularity == "week":
+        return span.days // 7 + 2
+    return (range_end.year - range_start.year) * 12 + range_end.month - range_start.month + 2
@@ -16,3 +16,10 @@ def get_current_time() -> datetime:
 
     return cest_now.replace(tzinfo=None)
 
+
+def to_app_time(value: datetime) -> datetime:
+    """Naive datetime on the get_current_time clock; timezone-aware values are converted, naive ones kept"""
+
+    if value.tzinfo is None:
+        return value
+    return (value.astimezone(timezone.utc) + CEST_OFFSET).replace(tzinfo=None)
@@ -5,6 +5,10 @@ from starlette.middleware.sessions import SessionMiddleware
 from pathlib import Path
 
 from app.infrastructure.database.startup import initialize_database
+from app.infrastructure.scheduling.deadline_scheduler import start_deadline_scheduler, stop_deadline_scheduler
+from app.application.services.delivery_worker import start_delivery_worker, stop_delivery_worker
+from app.infrastructure.storage.file_storage import MAX_DELIVERY_REQUEST_BYTES, MAX_AVATAR_BYTES
+from app.presentation.api.middleware import BodySizeLimitMiddleware
 
 from app.presentation.api.routes import (
     auth_routes,
@@ -14,7 +18,9 @@ from app.presentation.api.routes import (
     notification_routes,
     review_routes,
     resolution_routes,
-    analytics_routes
+    analytics_routes,
+    tag_routes,
+    upload_routes
 )
 
 app = FastAPI(
@@ -29,6 +35,13 @@ BASE_DIR = Path(__file__).resolve().parent
 import os
 app.add_middleware(SessionMiddleware, secret_key=os.getenv("SECRET_KEY", "change-me-in-production"))
 
+# Room for the other form fields and multipart headers on top of the file limits
+FORM_OVERHEAD_BYTES = 1024 * 1024
+app.add_middleware(BodySizeLimitMiddleware, limits=[
+    (r"^/order/\d+/deliver$", MAX_DELIVERY_REQUEST_BYTES + FORM_OVERHEAD_BYTES),
+    (r"^/profile$", MAX_AVATAR_BYTES + FORM_OVERHEAD_BYTES),
+])
+
 UPLOAD_DIR = BASE_DIR / "uploads"
 UPLOAD_DIR.mkdir(exist_ok=True)
 
@@ -44,6 +57,8 @@ app.include_router(notification_routes.router)
 app.include_router(review_routes.router)
 app.include_router(resolution_routes.router)
 app.include_router(analytics_routes.router)
+app.include_router(tag_routes.router)
+app.include_router(upload_routes.router)
 
 
 @app.on_event("startup")
@@ -55,3 +70,14 @@ def startup_event():
         print(f"[CRITICAL] Failed to initialize database: {e}")
         print("[WARN] Application started but database operations will fail")
         print("[INFO] Please check your database connection and restart the application")
+        return
+
+    start_deadline_scheduler()
+    start_delivery_worker(UPLOAD_DIR)
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+
+    stop_deadline_scheduler()
+    stop_delivery_worker()
@@ -0,0 +1,58 @@
+"""ASGI middleware"""
+import re
+from typing import List, Tuple
+
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reject request bodies above a per-path limit before the route parses them.
+    Multipart forms are spooled completely before the route runs, so the
+    per-file limits in file storage only apply once the whole body has been
+    received. A larger Content-Length is answered with 413 straight away; a
+    body without one is counted while it is read and cut off at the limit.
+    """
+
+    def __init__(self, app: ASGIApp, limits: List[Tuple[str, int]]):
+        self.app = app
+        self.limits = [(re.compile(pattern), max_bytes) for pattern, max_bytes in limits]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+
+        max_bytes = self._limit_for(scope)
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds the {max_bytes // (1024 * 1024)} MB limit"
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+            await JSONResponse(status_code=413, content={"detail": detail})(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+
+                    # FastAPI passes HTTPExceptions raised while reading the body through
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    def _limit_for(self, scope: Scope):
+
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            return None
+        for pattern, max_bytes in self.limits:
+            if pattern.match(scope["path"]):
+                return max_bytes
+        return None
@@ -2,13 +2,17 @@
 from fastapi import APIRouter, Request, Depends, HTTPException, Query
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from pathlib import Path
+from datetime import datetime
+from typing import List, Optional
 import os
 
-from app.infrastructure.database import get_db
 from app.presentation.api.dependencies.auth import get_service_container, require_admin
 from app.domain.entities.User import User
 from app.infrastructure.database.startup import initialize_database
+from app.infrastructure.metrics import live_counters
+from app.infrastructure.utils.time_utils import to_app_time
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
 templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
@@ -25,8 +29,10 @@ async def analytics(
 ):
    
 
-    stats = container.analytics_use_case.get_order_statistics()
-    revenue_stats = container.analytics_use_case.get_revenue_statistics()
+    # Blocks on the database (and on the concurrent queries when enabled)
+    dashboard = await run_in_threadpool(container.analytics_use_case.get_dashboard, range_q)
+    stats = dashboard["stats"]
+    revenue_stats = dashboard["revenue"]
 
 
     kpis = {
@@ -36,9 +42,9 @@ async def analytics(
     }
 
 
-    labels, revenue_series, completed_series, cancelled_series, cancelled_revenue_series = (
-        container.analytics_use_case.calculate_chart_data(range_q)
-    )
+    labels, revenue_series, completed_series, cancelled_series, cancelled_revenue_series = dashboard["chart"]
+
+    tag_trends = container.tag_trend_use_case.get_trends(weeks=8, limit=5)
 
     return templates.TemplateResponse(
         "analytics.html",
@@ -58,11 +64,156 @@ async def analytics(
             "cancelled_series": cancelled_series,
             "chart_cancelled": cancelled_series,
             "cancelled_revenue_series": cancelled_revenue_series,
-            "range": range_q
+            "range": range_q,
+            "tag_trends": tag_trends
         }
     )
 
 
+def _parse_datetime(value: str) -> datetime:
+    """ISO 8601 query value; an offset (or Z) is converted to the app's local time, which orders are stored in"""
+
+    return to_app_time(datetime.fromisoformat(value))
+
+
+@router.get("/api/analytics/series")
+async def analytics_series(
+    request: Request,
+    from_: str = Query(..., alias="from"),
+    to: str = Query(...),
+    granularity: str = "day",
+    metric: List[str] = Query(["revenue"]),
+    max_points: Optional[int] = Query(None),
+    current_user: User = Depends(require_admin),
+    container = Depends(get_service_container)
+):
+    """Time series for any range: metric may be repeated or comma separated, max_points downsamples with LTTB"""
+    metrics = [m.strip() for value in metric for m in value.split(",") if m.strip()]
+
+    try:
+        start = _parse_datetime(from_)
+        end = _parse_datetime(to)
+        result = container.analytics_use_case.get_series(start, end, granularity, metrics, max_points)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return JSONResponse(content=result)
+
+
+@router.get("/api/analytics/slice")
+async def analytics_slice(
+    request: Request,
+    from_: Optional[str] = Query(None, alias="from"),
+    to: Optional[str] = Query(None),
+    status: List[str] = Query([]),
+    package_id: List[int] = Query([]),
+    date_field: str = "completed",
+    current_user: User = Depends(require_admin),
+    container = Depends(get_service_container)
+):
+    """Ad-hoc slice (count, revenue, rating) served by the columnar engine"""
+    try:
+        start = _parse_datetime(from_) if from_ else None
+        end = _parse_datetime(to) if to else None
+        result = container.analytics_use_case.get_slice(start, end, status, package_id, date_field)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return JSONResponse(content=result)
+
+
+@router.get("/api/analytics/turnaround")
+async def analytics_turnaround(
+    request: Request,
+    from_: str = Query(..., alias="from"),
+    to: str = Query(...),
+    package_id: Optional[int] = Query(None),
+    current_user: User = Depends(require_admin),
+    container = Depends(get_service_container)
+):
+    """p50/p90/p99 turnaround and on-time share per month; from/to are YYYY-MM (inclusive)"""
+    try:
+        start_period = datetime.strptime(from_, "%Y-%m").strftime("%Y-%m")
+        end_period = datetime.strptime(to, "%Y-%m").strftime("%Y-%m")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="from and to must be YYYY-MM")
+
+    return JSONResponse(content=container.turnaround_use_case.get_report(start_period, end_period, package_id))
+
+
+@router.get("/api/analytics/revenue")
+async def analytics_revenue(
+    request: Request,
+    from_: str = Query(..., alias="from"),
+    to: str = Query(...),
+    level: str = "month",
+    group_by: List[str] = Query([]),
+    status: List[str] = Query(["Completed"]),
+    package_id: Optional[int] = Query(None),
+    user_id: Optional[int] = Query(None),
+    top: Optional[int] = Query(None, ge=1),
+    current_user: User = Depends(require_admin),
+    container = Depends(get_service_container)
+):
+    """
+    Revenue cube roll-up/drill-down, e.g. top customers of a quarter:
+    ?from=2025-01&to=2025-03&level=quarter&group_by=customer&top=10
+    """
+    dimensions = [d.strip() for value in group_by for d in value.split(",") if d.strip()]
+    try:
+        start_period = datetime.strptime(from_, "%Y-%m").strftime("%Y-%m")
+        end_period = datetime.strptime(to, "%Y-%m").strftime("%Y-%m")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="from and to must be YYYY-MM")
+
+    try:
+        result = container.analytics_use_case.get_revenue_breakdown(
+            start_period, end_period, level, dimensions, status, package_id, user_id, top
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return JSONResponse(content=result)
+
+
+@router.get("/api/analytics/tags")
+async def analytics_tag_trends(
+    request: Request,
+    weeks: int = 8,
+    package_id: Optional[int] = Query(None),
+    limit: int = 10,
+    current_user: User = Depends(require_admin),
+    container = Depends(get_service_container)
+):
+    """Most requested moods and tag keywords per week, optionally for one package"""
+    try:
+        result = container.tag_trend_use_case.get_trends(weeks, package_id, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return JSONResponse(content=result)
+
+
+@router.get("/admin/live")
+async def live_operations(
+    request: Request,
+    current_user: User = Depends(require_admin),
+    container = Depends(get_service_container)
+):
+    """Rolling counters of what happened in this worker over the last hour/day"""
+    return JSONResponse(content=live_counters.snapshot())
+
+
+@router.get("/admin/analytics/cache")
+async def analytics_cache_stats(
+    request: Request,
+    current_user: User = Depends(require_admin),
+    container = Depends(get_service_container)
+):
+    
+    return JSONResponse(content=container.analytics_use_case.get_cache_stats())
+
+
 @router.post("/admin/reinitialize-db")
 async def reinitialize_database(
     request: Request,
@@ -7,8 +7,15 @@ from pydantic import EmailStr, ValidationError, TypeAdapter
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import OperationalError, DatabaseError
 from pathlib import Path
+from typing import Optional
+from starlette.responses import Response
+import hashlib
+import os
 
 from app.infrastructure.database import get_db
+from app.infrastructure.cache.result_cache import ResultCache
+from app.infrastructure.storage.file_storage import UploadTooLargeError, MAX_AVATAR_BYTES
+from app.infrastructure.events import subscribe, ORDER_COMPLETED, REVIEW_SUBMITTED
 from app.presentation.api.dependencies.auth import get_service_container, get_current_user, require_login
 from app.application.dto.user import UserCreate, UserLogin
 from app.domain.entities.User import User
@@ -18,6 +25,11 @@ templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
 router = APIRouter()
 
+# Rendered homepage for logged-out visitors, who all see the same page
+homepage_cache = ResultCache(ttl_seconds=float(os.getenv("HOMEPAGE_CACHE_TTL", "60")), max_entries=8)
+subscribe(ORDER_COMPLETED, homepage_cache.clear)
+subscribe(REVIEW_SUBMITTED, homepage_cache.clear)
+
 
 def login_user(request: Request, user: User):
     
@@ -38,7 +50,45 @@ def login_user(request: Request, user: User):
 
 @router.get("/")
 async def root(request: Request, db: Session = Depends(get_db)):
-   
+    """Anonymous visitors get a cached rendering with an ETag; logged-in users are rendered per request"""
+
+    if request.session.get("user_id"):
+        return _render_homepage(request, db)[0]
+
+    cache_key = ("anonymous", str(request.base_url))
+    generation = homepage_cache.generation
+    cached = homepage_cache.get(cache_key)
+    if cached is None:
+        response, complete = _render_homepage(request, db)
+        if not complete:
+
+            # Rendered with placeholder stats; don't cache or validate it
+            return response
+        body = response.body
+        cached = (body, f'"{hashlib.sha1(body).hexdigest()}"')
+        homepage_cache.set(cache_key, cached, generation)
+
+    body, etag = cached
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Cookie"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="text/html", headers=headers)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match is "*" or a comma-separated list of (possibly weak) entity tags"""
+
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def _render_homepage(request: Request, db: Session):
+    """The homepage response, and whether its data loaded (False when the stats are placeholders)"""
+
     from sqlalchemy.orm import joinedload
     from app.domain.entities.Order import Order
 
@@ -48,6 +98,7 @@ async def root(request: Request, db: Session = Depends(get_db)):
     avg_rating_formatted = "0.0"
     turnaround = "24h"
     audio_file = None
+    complete = False
 
     try:
         container = get_service_container(db)
@@ -63,21 +114,19 @@ async def root(request: Request, db: Session = Depends(get_db)):
         )
 
         
-        all_orders = container.order_repository.get_all()
+        site_reviews = container.review_aggregate_repository.get()
 
        
-        completed_orders = [o for o in all_orders if o.status == "Completed"]
-        tags_delivered = len(completed_orders)
+        tags_delivered = site_reviews.completed_count if site_reviews else 0
 
         
-        reviews = [o.review for o in all_orders if o.review is not None]
-        if reviews:
-            avg_rating = sum(reviews) / len(reviews)
-            avg_rating_formatted = f"{avg_rating:.1f}"
+        if site_reviews and site_reviews.review_count:
+            avg_rating_formatted = f"{site_reviews.average_rating:.1f}"
         else:
             avg_rating_formatted = "0.0"
 
         turnaround = "24h"
+        complete = True
 
     except (OperationalError, DatabaseError) as e:
         
@@ -89,10 +138,6 @@ async def root(request: Request, db: Session = Depends(get_db)):
     
     
     try:
-        import os
-        from pathlib import Path
-
-        BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
         static_audio_dir = BASE_DIR / "static" / "audio"
         if static_audio_dir.exists():
             audio_files = list(static_audio_dir.glob("*.wav")) + list(static_audio_dir.glob("*.mp3"))
@@ -114,7 +159,7 @@ async def root(request: Request, db: Session = Depends(get_db)):
             "turnaround": turnaround,
             "audio_file": audio_file,
         }
-    )
+    ), complete
 
 
 @router.get("/login")
@@ -251,16 +296,28 @@ async def update_profile(
         current_user.set_password(new_password.strip())
 
 
+    previous_avatar = current_user.avatar
+    avatar_stored = False
     if avatar and getattr(avatar, "filename", ""):
-        filename = container.file_storage.save_uploaded_file(avatar, "avatar", current_user.id)
-        file_path = container.file_storage.get_file_path(filename)
-        content = await avatar.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
-        current_user.avatar = filename
+        try:
+            stored = await container.file_storage.store_upload(avatar, max_bytes=MAX_AVATAR_BYTES)
+        except UploadTooLargeError as e:
+            return templates.TemplateResponse(
+                "profile.html",
+                {"request": request, "user": current_user, "error": str(e)},
+                status_code=413
+            )
+        current_user.avatar = stored["filename"]
+        avatar_stored = True
 
     container.user_repository.update(current_user)
 
+    # The new upload took a reference of its own, also when it is the same
+    # image (and so the same blob) as before
+    if previous_avatar and avatar_stored:
+        container.file_storage.release(previous_avatar)
+        container.db.commit()
+
 
     request.session["username"] = current_user.username
 
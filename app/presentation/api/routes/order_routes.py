@@ -1,37 +1,55 @@
 
 from fastapi import APIRouter, Request, Form, Depends, UploadFile, File, HTTPException
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, HTMLResponse
 from starlette.responses import RedirectResponse
 from starlette.status import HTTP_302_FOUND
 from typing import List
 from datetime import datetime, timedelta
 from app.infrastructure.utils.time_utils import get_current_time
-from sqlalchemy.orm import Session, joinedload
+from app.infrastructure.cache.result_cache import ResultCache
+from app.infrastructure.storage.file_storage import (
+    UploadTooLargeError, MAX_DELIVERY_FILE_BYTES, MAX_DELIVERY_REQUEST_BYTES
+)
 from pathlib import Path
+import json
+import os
+import uuid
 
-from app.infrastructure.database import get_db
 from app.presentation.api.dependencies.auth import (
     get_service_container, require_login, require_admin
 )
-from app.application.dto.order import OrderCreate, PaymentInfo, OrderReview, ResolutionRequest
+from app.application.dto.order import (
+    OrderCreate, OrderDeliver, PaymentInfo, OrderReview, DeliveryFileRef, DeliveryPreflight
+)
+from app.application.services.delivery_worker import get_delivery_worker
+from app.infrastructure.scheduling.deadline_scheduler import get_deadline_scheduler
 from app.domain.entities.User import User
 from app.domain.entities.Order import Order
 from app.domain.entities.Tag import Tag
 from app.domain.entities.Delivery import Delivery
 from app.domain.entities.DeliveryFile import DeliveryFile
 from app.domain.entities.OrderEvent import OrderEvent
-from app.domain.entities.Message import Message
+from app.domain.entities.DeliveryJob import DeliveryJob
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
 templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
 router = APIRouter()
 
+# Rendered timeline and chat HTML keyed by orders.content_version, which every
+# delivery, delivery file, event and message insert increments
+fragment_cache = ResultCache(
+    ttl_seconds=float(os.getenv("ORDER_FRAGMENT_CACHE_TTL", "600")),
+    max_entries=int(os.getenv("ORDER_FRAGMENT_CACHE_SIZE", "2048"))
+)
+
 
 def update_late_orders(container):
-    
-    container.order_repository.update_late_orders()
+    """Fallback for processes without a deadline scheduler (disabled, or startup failed)"""
+
+    if get_deadline_scheduler() is None:
+        container.order_repository.update_late_orders()
 
 
 @router.get("/order/new")
@@ -183,10 +201,14 @@ async def submit_order(
         order = container.order_use_case.create_order(current_user.id, order_data)
 
 
-        for tag_value, mood_value in zip(tags, moods):
-            tag = Tag(order_id=order.id, name=tag_value, mood=mood_value)
-            container.db.add(tag)
+        order_tags = [
+            Tag(order_id=order.id, name=tag_value, mood=mood_value)
+            for tag_value, mood_value in zip(tags, moods)
+        ]
+        container.db.add_all(order_tags)
+        container.tag_trend_use_case.record_tags(order, order_tags)
         container.db.commit()
+        container.tag_suggestion_use_case.record_tags(order_tags)
 
         return RedirectResponse(url="/myorders", status_code=HTTP_302_FOUND)
     except ValueError as e:
@@ -206,25 +228,18 @@ async def my_orders(
     current_user: User = Depends(require_login),
     container = Depends(get_service_container)
 ):
-    
 
     update_late_orders(container)
 
-
-    orders = container.order_use_case.get_orders_for_user(current_user.id)
-
-
-    now = get_current_time()
-    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    spent_eur = container.order_repository.get_revenue(current_user.id, "Completed", month_start)
+    view = container.order_use_case.get_order_list_view(current_user.id)
 
     return templates.TemplateResponse(
         "myorders.html",
         {
             "request": request,
-            "orders": orders,
-            "spent_month": round(spent_eur, 2),
-            "month_name": now.strftime('%B')
+            "orders": view["orders"],
+            "spent_month": view["spent_month"],
+            "month_name": get_current_time().strftime('%B')
         }
     )
 
@@ -235,7 +250,7 @@ async def my_orders_admin(
     current_user: User = Depends(require_admin),
     container = Depends(get_service_container)
 ):
-    
+
     update_late_orders(container)
 
     orders = container.order_use_case.get_all_orders()
@@ -243,7 +258,7 @@ async def my_orders_admin(
 
     now = get_current_time()
     month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    earned_eur = container.order_repository.get_revenue(None, "Completed", month_start)
+    earned_eur = container.order_stats_repository.get_revenue_since(month_start.date())["revenue"]
 
 
     try:
@@ -263,6 +278,23 @@ async def my_orders_admin(
     )
 
 
+@router.get("/api/admin/queue")
+async def admin_work_queue(
+    request: Request,
+    limit: int = 20,
+    current_user: User = Depends(require_admin),
+    container = Depends(get_service_container)
+):
+    """Actionable orders (Active, Revision, Late, In dispute) by deadline, most urgent first"""
+    if limit < 1 or limit > 200:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 200")
+
+    queue = container.order_use_case.get_work_queue(limit)
+    for item in queue["orders"]:
+        item["due_date"] = item["due_date"].isoformat() if item["due_date"] else None
+    return JSONResponse(content=queue)
+
+
 @router.get("/order/{order_id}")
 async def view_order(
     request: Request,
@@ -270,54 +302,130 @@ async def view_order(
     current_user: User = Depends(require_login),
     container = Depends(get_service_container)
 ):
-   
+    """Header, requirements and status only; the heavier sections load from the fragment endpoints"""
+
     update_late_orders(container)
 
+    order = _get_viewable_order(container, order_id, current_user)
 
-    order = (
-        container.db.query(Order)
-        .options(
-            joinedload(Order.tags),
-            joinedload(Order.user),
-            joinedload(Order.package),
-            joinedload(Order.deliveries).joinedload(Delivery.user),
-            joinedload(Order.deliveries).joinedload(Delivery.files),
-            joinedload(Order.events).joinedload(OrderEvent.user),
-            joinedload(Order.messages).joinedload(Message.sender)
-        )
-        .filter(Order.id == order_id)
-        .first()
+    admin_user = None
+    if not current_user.is_admin:
+        admins = container.user_repository.get_admins()
+        admin_user = admins[0] if admins else None
+
+    file_url = None
+    if order.delivery_file:
+        file_url = request.url_for("uploads", path=order.delivery_file)
+
+    return templates.TemplateResponse(
+        "order_detail.html",
+        {
+            "request": request,
+            "order": order,
+            "file_url": file_url,
+            "is_admin": current_user.is_admin,
+            "admin_user": admin_user,
+        }
     )
 
+
+@router.get("/order/{order_id}/fragments/timeline")
+async def order_timeline_fragment(
+    request: Request,
+    order_id: int,
+    current_user: User = Depends(require_login),
+    container = Depends(get_service_container)
+):
+
+    order = _get_viewable_order(container, order_id, current_user)
+
+    html = fragment_cache.get_or_set(
+        ("timeline", order.id, order.content_version, order.status, order.delivery_file,
+         order.due_date, current_user.is_admin, _participants(container, order), str(request.base_url)),
+        lambda: _render_timeline(request, container, order, current_user.is_admin)
+    )
+    return HTMLResponse(html)
+
+
+@router.get("/order/{order_id}/fragments/messages")
+async def order_messages_fragment(
+    request: Request,
+    order_id: int,
+    current_user: User = Depends(require_login),
+    container = Depends(get_service_container)
+):
+
+    order = _get_viewable_order(container, order_id, current_user)
+
+    html, message_count = fragment_cache.get_or_set(
+        ("messages", order.id, order.content_version, current_user.id,
+         _participants(container, order), str(request.base_url)),
+        lambda: _render_messages(request, container, order, current_user.id)
+    )
+    container.message_repository.mark_order_read(order.id, current_user.id)
+
+    return HTMLResponse(html, headers={"X-Message-Count": str(message_count)})
+
+
+@router.get("/order/{order_id}/fragments/resolution")
+async def order_resolution_fragment(
+    request: Request,
+    order_id: int,
+    current_user: User = Depends(require_login),
+    container = Depends(get_service_container)
+):
+
+    order = _get_viewable_order(container, order_id, current_user)
+
+    return HTMLResponse(templates.get_template("partials/order_resolution.html").render({
+        "request": request,
+        "order": order,
+        "is_admin": current_user.is_admin,
+    }))
+
+
+def _get_viewable_order(container, order_id: int, current_user: User) -> Order:
+
+    order = container.order_repository.get_by_id(order_id)
+
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
-
     if not current_user.is_admin and order.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Forbidden")
 
+    return order
+
+
+def _participants(container, order: Order) -> tuple:
+    """Fragments show the names and avatars of the customer and the admins, so those are part of the cache key"""
 
+    users = ([order.user] if order.user else []) + container.user_repository.get_admins()
+    return tuple((user.id, user.username, user.avatar) for user in users)
+
+
+def _render_timeline(request: Request, container, order: Order, is_admin: bool) -> str:
+
+    deliveries, events = container.order_repository.get_timeline(order.id)
     timeline_items = []
 
-    if order.deliveries:
-        for delivery in order.deliveries:
-            if delivery.delivered_at:
-                timeline_items.append({
-                    'type': 'delivery',
-                    'delivery': delivery,
-                    'date': delivery.delivered_at
-                })
-
-    if order.events:
-        for event in order.events:
-            if event.event_type != 'delivered' and event.created_at:
-                timeline_items.append({
-                    'type': 'event',
-                    'event': event,
-                    'date': event.created_at
-                })
-
-    if order.status == 'Delivered' and order.delivery_file and not order.deliveries:
+    for delivery in deliveries:
+        if delivery.delivered_at:
+            timeline_items.append({
+                'type': 'delivery',
+                'delivery': delivery,
+                'date': delivery.delivered_at
+            })
+
+    for event in events:
+        if event.event_type not in ('delivered', 'order_placed') and event.created_at:
+            timeline_items.append({
+                'type': 'event',
+                'event': event,
+                'date': event.created_at
+            })
+
+    if order.status == 'Delivered' and order.delivery_file and not deliveries:
         legacy_date = order.due_date or get_current_time()
         timeline_items.append({
             'type': 'legacy_delivery',
@@ -345,34 +453,24 @@ async def view_order(
 
     timeline_items.sort(key=get_sort_key, reverse=False)
 
+    return templates.get_template("partials/order_timeline.html").render({
+        "request": request,
+        "order": order,
+        "is_admin": is_admin,
+        "timeline_items": timeline_items,
+    })
 
-    if order.messages:
-        for msg in order.messages:
-            if msg.sender_id != current_user.id and not msg.is_read:
-                msg.is_read = True
-        container.db.commit()
 
+def _render_messages(request: Request, container, order: Order, viewer_id: int):
 
-    admin_user = None
-    if not current_user.is_admin:
-        admin_user = container.user_repository.get_admins()[0] if container.user_repository.get_admins() else None
-
-    file_url = None
-    if order.delivery_file:
-        file_url = request.url_for("uploads", path=order.delivery_file)
-
-    return templates.TemplateResponse(
-        "order_detail.html",
-        {
-            "request": request,
-            "order": order,
-            "file_url": file_url,
-            "is_admin": current_user.is_admin,
-            "timeline_items": timeline_items,
-            "messages": order.messages if order.messages else [],
-            "admin_user": admin_user,
-        }
-    )
+    messages = container.message_repository.get_by_order_id(order.id)
+    html = templates.get_template("partials/order_messages.html").render({
+        "request": request,
+        "order": order,
+        "viewer_id": viewer_id,
+        "messages": messages,
+    })
+    return html, len(messages)
 
 
 @router.post("/order/{order_id}/complete")
@@ -390,96 +488,146 @@ async def mark_order_complete(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/order/{order_id}/deliver")
-async def admin_deliver_order(
+@router.post("/api/order/{order_id}/deliver/preflight")
+async def admin_deliver_preflight(
     request: Request,
     order_id: int,
-    response_text: str = Form(...),
-    files: List[UploadFile] = File(...),
+    preflight: DeliveryPreflight,
     current_user: User = Depends(require_admin),
     container = Depends(get_service_container)
 ):
-    
-    if not files:
-        raise HTTPException(status_code=400, detail="At least one file is required")
-
+    """
+    Which of the files about to be delivered (by SHA-256 and size) the server
+    already holds. Those can be passed to /deliver as known_files instead of
+    being uploaded again.
+    """
     order = container.order_repository.get_by_id(order_id)
     if not order or order.status not in ["Active", "Revision", "Late"]:
         raise HTTPException(status_code=400, detail="Cannot deliver in this state")
 
-
-    delivery_count = container.db.query(Delivery).filter(Delivery.order_id == order_id).count()
-    delivery_number = delivery_count + 1
+    sizes = container.file_storage.known_blobs([f.sha256 for f in preflight.files])
+    known = [f.sha256 for f in preflight.files if sizes.get(f.sha256) == f.size]
+    return JSONResponse(content={
+        "known": known,
+        "missing": [f.sha256 for f in preflight.files if sizes.get(f.sha256) != f.size]
+    })
 
 
-    saved_files = []
-    primary_filename = None
+@router.post("/order/{order_id}/deliver")
+async def admin_deliver_order(
+    request: Request,
+    order_id: int,
+    response_text: str = Form(...),
+    files: List[UploadFile] = File(None),
+    known_files: str = Form(None),
+    current_user: User = Depends(require_admin),
+    container = Depends(get_service_container)
+):
+    """
+    Deliver uploaded files plus, optionally, known_files: a JSON list of
+    {"sha256", "size", "name"} the preflight reported as already stored.
+    Answers 409 with the missing hashes if any of those is gone by now.
+
+    With "Prefer: respond-async" the request answers 202 as soon as the files
+    are stored, and the delivery worker records the delivery; poll the
+    returned /api/delivery-jobs/{id} location for the outcome.
+    """
+    files = [file for file in files or [] if file.filename]
+    try:
+        known_refs = [DeliveryFileRef(**ref) for ref in json.loads(known_files)] if known_files else []
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid known_files: {e}")
 
-    for file in files:
-        filename = container.file_storage.save_uploaded_file(file, "delivery")
-        file_path = container.file_storage.get_file_path(filename)
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
+    if not files and not known_refs:
+        raise HTTPException(status_code=400, detail="At least one file is required")
 
-        saved_files.append({
-            'filename': filename,
-            'original_filename': file.filename,
-            'size': len(content)
-        })
+    order = container.order_repository.get_by_id(order_id)
+    if not order or order.status not in ["Active", "Revision", "Late"]:
+        raise HTTPException(status_code=400, detail="Cannot deliver in this state")
 
-        if primary_filename is None:
-            primary_filename = filename
 
+    linked_files = []
+    missing = []
+    for ref in known_refs:
+        file_info = container.file_storage.link(ref.sha256, ref.size, ref.name or ref.sha256)
+        if file_info:
+            linked_files.append(file_info)
+        else:
+            missing.append(ref.sha256)
 
-    delivery = Delivery(
-        order_id=order_id,
-        delivery_number=delivery_number,
-        response_text=response_text,
-        delivery_file=primary_filename,
-        delivered_at=get_current_time(),
-        user_id=current_user.id
-    )
-    container.db.add(delivery)
-    container.db.flush()
+    if missing:
 
+        # The references just taken are undone by the request's rollback
+        raise HTTPException(status_code=409, detail={"message": "Files must be uploaded again", "missing": missing})
 
-    for file_info in saved_files:
-        delivery_file = DeliveryFile(
-            delivery_id=delivery.id,
-            filename=file_info['filename'],
-            original_filename=file_info['original_filename'],
-            file_size=file_info['size'],
-            uploaded_at=get_current_time()
+    try:
+        uploaded_files = await container.file_storage.store_uploads(
+            files,
+            max_file_bytes=MAX_DELIVERY_FILE_BYTES,
+            max_request_bytes=MAX_DELIVERY_REQUEST_BYTES
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    saved_files = linked_files + uploaded_files
+    delivery_data = OrderDeliver(response_text=response_text, files=saved_files)
+
+    worker = get_delivery_worker()
+    if worker and "respond-async" in request.headers.get("prefer", ""):
+
+        # The files are stored; record the delivery and notify in the background
+        job = container.delivery_job_repository.create(DeliveryJob(
+            id=uuid.uuid4().hex,
+            order_id=order_id,
+            user_id=current_user.id,
+            response_text=response_text,
+            files=json.dumps(saved_files),
+            status="pending",
+            created_at=get_current_time()
+        ))
+        worker.submit(job.id)
+
+        location = f"/api/delivery-jobs/{job.id}"
+        return JSONResponse(
+            status_code=202,
+            content={"id": job.id, "status": job.status, "location": location},
+            headers={"Location": location, "Preference-Applied": "respond-async"}
         )
-        container.db.add(delivery_file)
-
 
-    order.status = "Delivered"
-    order.response = response_text
-    order.delivery_file = primary_filename
-    container.order_repository.update(order)
+    try:
+        container.order_use_case.deliver_order(order_id, current_user.id, delivery_data)
+    except ValueError as e:
 
+        # Undoes the references this request took; nothing else to release
+        container.db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
 
-    event = OrderEvent(
-        order_id=order.id,
-        event_type="delivered",
-        user_id=current_user.id,
-        event_message=response_text,
-        created_at=get_current_time()
-    )
-    container.db.add(event)
-    container.db.commit()
+    return RedirectResponse(url="/myorders-admin", status_code=HTTP_302_FOUND)
 
 
-    container.notification_use_case.create_notification(
-        order.user_id, order.id, "delivered",
-        "Order Delivered",
-        f"Your order #{order.id} has been delivered!"
+@router.get("/api/delivery-jobs/{job_id}")
+async def delivery_job_status(
+    request: Request,
+    job_id: str,
+    current_user: User = Depends(require_admin),
+    container = Depends(get_service_container)
+):
+    """Progress of a delivery accepted with 202; poll until status is done or failed"""
+    job = container.delivery_job_repository.get(job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Delivery job not found")
+
+    return JSONResponse(
+        content={
+            "id": job.id,
+            "order_id": job.order_id,
+            "status": job.status,
+            "delivery_id": job.delivery_id,
+            "error": job.error
+        },
+        headers={"Cache-Control": "no-store"}
     )
 
-    return RedirectResponse(url="/myorders-admin", status_code=HTTP_302_FOUND)
-
 
 @router.post("/order/{order_id}/request-revision")
 async def user_request_revision(
@@ -646,7 +794,7 @@ async def download_delivered_file(
 
     return FileResponse(
         path=str(file_path),
-        filename=delivery.delivery_file,
+        filename=_download_name(container, order_id, delivery.delivery_file),
         media_type="application/octet-stream"
     )
 
@@ -675,11 +823,25 @@ async def download_legacy_delivered_file(
 
     return FileResponse(
         path=str(file_path),
-        filename=order.delivery_file,
+        filename=_download_name(container, order_id, order.delivery_file),
         media_type="application/octet-stream"
     )
 
 
+def _download_name(container, order_id: int, filename: str) -> str:
+    """Stored files are named by content hash; offer the name the file was uploaded with"""
+
+    original = (
+        container.db.query(DeliveryFile.original_filename)
+        .join(Delivery, Delivery.id == DeliveryFile.delivery_id)
+        .filter(Delivery.order_id == order_id, DeliveryFile.filename == filename)
+        .first()
+    )
+    if original and original[0]:
+        return original[0]
+    return Path(filename).name
+
+
 @router.post("/order/{order_id}/approve-request")
 async def approve_request(
     request: Request,
@@ -0,0 +1,29 @@
+"""Tag autocomplete routes"""
+from fastapi import APIRouter, Request, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+
+from app.presentation.api.dependencies.auth import get_service_container, get_current_user
+from app.domain.entities.User import User
+
+router = APIRouter()
+
+
+@router.get("/api/tags/suggest")
+async def suggest_tags(
+    request: Request,
+    q: str = Query(""),
+    kind: str = "tag",
+    limit: int = 10,
+    current_user: User | None = Depends(get_current_user),
+    container = Depends(get_service_container)
+):
+    """Prefix completions for the order form, most frequently ordered first"""
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Login required")
+
+    try:
+        suggestions = container.tag_suggestion_use_case.suggest(q, kind, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return JSONResponse(content={"query": q, "kind": kind, "suggestions": suggestions})
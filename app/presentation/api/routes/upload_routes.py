@@ -0,0 +1,217 @@
+"""Resumable delivery upload routes"""
+from fastapi import APIRouter, Request, Depends, HTTPException
+from fastapi.responses import JSONResponse, Response
+from datetime import timedelta
+import os
+import uuid
+
+from app.presentation.api.dependencies.auth import get_service_container, require_admin
+from app.application.dto.order import DeliveryUploadCreate
+from app.domain.entities.User import User
+from app.domain.entities.UploadSession import UploadSession
+from app.infrastructure.storage.file_storage import UploadTooLargeError, MAX_DELIVERY_FILE_BYTES
+from app.infrastructure.utils.time_utils import get_current_time
+
+router = APIRouter()
+
+# Sessions without a chunk for this long are dropped, together with finished
+# uploads that no delivery claimed
+UPLOAD_SESSION_TTL = timedelta(hours=float(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24")))
+
+# A PATCH that has held the write claim this long is taken to have died with
+# its worker process, and another PATCH may claim the offset
+UPLOAD_WRITE_TIMEOUT = timedelta(seconds=float(os.getenv("UPLOAD_WRITE_TIMEOUT", "600")))
+
+CHUNK_CONTENT_TYPE = "application/offset+octet-stream"
+
+
+@router.post("/api/order/{order_id}/uploads")
+async def create_upload(
+    request: Request,
+    order_id: int,
+    upload: DeliveryUploadCreate,
+    current_user: User = Depends(require_admin),
+    container = Depends(get_service_container)
+):
+    """
+    Start a resumable upload of one delivery file. Send the bytes with PATCH
+    to the returned location, ask HEAD for the offset to resume from after an
+    interruption, and POST .../finish once the whole file is there.
+    """
+    order = container.order_repository.get_by_id(order_id)
+    if not order or order.status not in ["Active", "Revision", "Late"]:
+        raise HTTPException(status_code=400, detail="Cannot deliver in this state")
+
+    if upload.size > MAX_DELIVERY_FILE_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{upload.filename} exceeds the {MAX_DELIVERY_FILE_BYTES // (1024 * 1024)} MB upload limit"
+        )
+
+    await _purge_stale(container)
+
+    now = get_current_time()
+    session = container.upload_session_repository.create(UploadSession(
+        id=uuid.uuid4().hex,
+        order_id=order_id,
+        user_id=current_user.id,
+        filename=upload.filename,
+        size=upload.size,
+        bytes_received=0,
+        created_at=now,
+        updated_at=now
+    ))
+
+    location = f"/api/uploads/{session.id}"
+    return JSONResponse(
+        status_code=201,
+        content={"id": session.id, "location": location, "offset": 0, "size": session.size},
+        headers=_offset_headers(session, 0) | {"Location": location}
+    )
+
+
+@router.head("/api/uploads/{upload_id}")
+async def upload_offset(
+    request: Request,
+    upload_id: str,
+    current_user: User = Depends(require_admin),
+    container = Depends(get_service_container)
+):
+    """Offset the next PATCH must start at"""
+    session = _get_session(container, upload_id, current_user)
+    return Response(status_code=200, headers=_offset_headers(session, _resume_offset(container, session)))
+
+
+@router.patch("/api/uploads/{upload_id}")
+async def upload_chunk(
+    request: Request,
+    upload_id: str,
+    current_user: User = Depends(require_admin),
+    container = Depends(get_service_container)
+):
+    """
+    Append the request body at the Upload-Offset header, which must match the
+    current offset (409 otherwise). Bytes received before a dropped connection
+    are kept.
+    """
+    session = _get_session(container, upload_id, current_user)
+
+    if request.headers.get("content-type", "").split(";")[0].strip() != CHUNK_CONTENT_TYPE:
+        raise HTTPException(status_code=415, detail=f"Content-Type must be {CHUNK_CONTENT_TYPE}")
+    try:
+        offset = int(request.headers["upload-offset"])
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=400, detail="Upload-Offset header is required")
+
+    current = _resume_offset(container, session)
+    if offset != current:
+        return JSONResponse(
+            status_code=409,
+            content={"detail": "Upload-Offset does not match the upload", "offset": current},
+            headers=_offset_headers(session, current)
+        )
+
+    # Claim the offset before touching the part file: a second PATCH at the
+    # same offset would otherwise truncate and write it at the same time
+    writer = uuid.uuid4().hex
+    stale_before = get_current_time() - UPLOAD_WRITE_TIMEOUT
+    if not container.upload_session_repository.claim(session.id, session.bytes_received, writer, stale_before):
+        container.db.rollback()
+        raise HTTPException(status_code=409, detail="The upload is being written by another request")
+    container.db.commit()
+
+    try:
+        new_offset = await container.file_storage.append_part(session.id, offset, request.stream(), session.size)
+    except UploadTooLargeError as e:
+        container.upload_session_repository.release(session.id, writer)
+        container.db.commit()
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception:
+        container.upload_session_repository.release(session.id, writer)
+        container.db.commit()
+        raise
+
+    if not container.upload_session_repository.advance(session.id, writer, new_offset):
+        container.db.rollback()
+        raise HTTPException(status_code=409, detail="The upload was modified concurrently")
+    container.db.commit()
+
+    return Response(status_code=204, headers=_offset_headers(session, new_offset))
+
+
+@router.post("/api/uploads/{upload_id}/finish")
+async def finish_upload(
+    request: Request,
+    upload_id: str,
+    current_user: User = Depends(require_admin),
+    container = Depends(get_service_container)
+):
+    """
+    Move a complete upload into file storage. The returned sha256/size/name
+    goes into the known_files of /order/{id}/deliver, which attaches it to the
+    delivery as a DeliveryFile.
+    """
+    session = _get_session(container, upload_id, current_user)
+
+    offset = _resume_offset(container, session)
+    if offset != session.size:
+        raise HTTPException(status_code=409, detail=f"Upload incomplete: {offset} of {session.size} bytes received")
+
+    stored = await container.file_storage.store_part(session.id, session.filename)
+    container.upload_session_repository.delete(session)
+    container.db.commit()
+
+    return JSONResponse(content={
+        "sha256": stored["sha256"],
+        "size": stored["size"],
+        "name": stored["original_filename"],
+        "order_id": session.order_id
+    })
+
+
+@router.delete("/api/uploads/{upload_id}")
+async def cancel_upload(
+    request: Request,
+    upload_id: str,
+    current_user: User = Depends(require_admin),
+    container = Depends(get_service_container)
+):
+
+    session = _get_session(container, upload_id, current_user)
+    await container.file_storage.discard_part(session.id)
+    container.upload_session_repository.delete(session)
+    container.db.commit()
+    return Response(status_code=204)
+
+
+def _get_session(container, upload_id: str, current_user: User) -> UploadSession:
+
+    session = container.upload_session_repository.get(upload_id)
+    if not session or session.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+
+def _resume_offset(container, session: UploadSession) -> int:
+    """The recorded offset, unless fewer bytes made it to disk (a crash before the write was synced)"""
+
+    return min(session.bytes_received, container.file_storage.part_offset(session.id))
+
+
+def _offset_headers(session: UploadSession, offset: int) -> dict:
+
+    return {
+        "Upload-Offset": str(offset),
+        "Upload-Length": str(session.size),
+        "Cache-Control": "no-store"
+    }
+
+
+async def _purge_stale(container) -> None:
+
+    cutoff = get_current_time() - UPLOAD_SESSION_TTL
+    for session in container.upload_session_repository.get_stale(cutoff):
+        await container.file_storage.discard_part(session.id)
+        container.upload_session_repository.delete(session)
+    container.file_storage.purge_unreferenced(cutoff)
+    container.db.commit()
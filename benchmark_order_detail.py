@@ -0,0 +1,188 @@
+"""
+Order detail loading benchmark
+
+Seeds one long-running order (many revisions, delivery files, events and
+chat messages) into a throwaway in-memory SQLite database and compares the
+old single joinedload query of the order page with what the page loads now:
+the order itself, plus OrderRepository.get_timeline and
+MessageRepository.get_by_order_id for the timeline and chat fragments.
+Reports statements, rows fetched from the database and load time for both.
+It exits with status 1 if the current loading fetches more rows than tags +
+deliveries + files + events + messages + a few per statement, so it can be
+used as a regression check.
+
+Usage:
+    python benchmark_order_detail.py [--deliveries 8] [--files 2] [--events 30] [--messages 150] [--tags 3] [--runs 3]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+# Add app directory to path
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BASE_DIR))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, joinedload
+from sqlalchemy.pool import StaticPool
+
+from app.domain.base import Base
+import app.domain.entities  # noqa: F401  (register every table on Base.metadata)
+from app.domain.entities import User, Package, Order, Tag, Delivery, DeliveryFile, OrderEvent, Message
+from app.infrastructure.repositories.order_repository_impl import OrderRepository
+from app.infrastructure.repositories.message_repository_impl import MessageRepository
+from app.infrastructure.utils.time_utils import get_current_time
+
+
+def seed(db, args) -> int:
+
+    now = get_current_time()
+    admin = User(username="admin", email="admin@example.com", hashed_password="x", is_admin=True)
+    customer = User(username="customer", email="customer@example.com", hashed_password="x", is_admin=False)
+    package = Package(name="Premium", price=40.0, delivery_days=3, tag_count=args.tags)
+    db.add_all([admin, customer, package])
+    db.flush()
+
+    order = Order(user_id=customer.id, package_id=package.id, details="benchmark",
+                  due_date=now + timedelta(days=3), status="Revision")
+    db.add(order)
+    db.flush()
+
+    db.add_all(Tag(order_id=order.id, name=f"tag {i}", mood="Happy") for i in range(args.tags))
+    for number in range(1, args.deliveries + 1):
+        delivery = Delivery(order_id=order.id, delivery_number=number, response_text="delivery",
+                            delivered_at=now - timedelta(hours=number), user_id=admin.id)
+        db.add(delivery)
+        db.flush()
+        db.add_all(
+            DeliveryFile(delivery_id=delivery.id, filename=f"{number}_{i}.wav",
+                         original_filename=f"{i}.wav", file_size=1024, uploaded_at=delivery.delivered_at)
+            for i in range(args.files)
+        )
+    db.add_all(
+        OrderEvent(order_id=order.id, event_type="revision_requested", user_id=customer.id,
+                   event_message="again", created_at=now - timedelta(minutes=i))
+        for i in range(args.events)
+    )
+    db.add_all(
+        Message(order_id=order.id, sender_id=(admin.id if i % 2 else customer.id), message_text=f"message {i}",
+                created_at=now - timedelta(minutes=i), is_read=True)
+        for i in range(args.messages)
+    )
+    db.commit()
+    return order.id
+
+
+def legacy_load(db, order_id):
+    """The single query view_order used before the page was split into fragments"""
+
+    order = (
+        db.query(Order)
+        .options(
+            joinedload(Order.tags),
+            joinedload(Order.user),
+            joinedload(Order.package),
+            joinedload(Order.deliveries).joinedload(Delivery.user),
+            joinedload(Order.deliveries).joinedload(Delivery.files),
+            joinedload(Order.events).joinedload(OrderEvent.user),
+            joinedload(Order.messages).joinedload(Message.sender)
+        )
+        .filter(Order.id == order_id)
+        .first()
+    )
+    return len(order.tags), len(order.deliveries), len(order.events), len(order.messages)
+
+
+def current_load(db, order_id):
+    """view_order plus the timeline and messages fragments"""
+
+    order = OrderRepository(db).get_by_id(order_id)
+    deliveries, events = OrderRepository(db).get_timeline(order_id)
+    messages = MessageRepository(db).get_by_order_id(order_id)
+    return len(order.tags), len(deliveries), len(events), len(messages)
+
+
+def measure(engine, Session, load, order_id, runs):
+    """Median load time, plus statements and rows fetched by one load"""
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        db = Session()
+        counts = load(db, order_id)
+        db.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    # Replay the captured statements to count the rows the database returned
+    rows = 0
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            rows += len(conn.exec_driver_sql(statement, parameters).fetchall())
+
+    timings = []
+    for _ in range(runs):
+        db = Session()
+        start = time.perf_counter()
+        load(db, order_id)
+        timings.append(time.perf_counter() - start)
+        db.close()
+
+    return {"statements": len(statements), "rows": rows, "ms": statistics.median(timings) * 1000, "counts": counts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark order detail loading")
+    parser.add_argument("--deliveries", type=int, default=8)
+    parser.add_argument("--files", type=int, default=2)
+    parser.add_argument("--events", type=int, default=30)
+    parser.add_argument("--messages", type=int, default=150)
+    parser.add_argument("--tags", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    db = Session()
+    order_id = seed(db, args)
+    db.close()
+
+    print("=" * 60)
+    print("ORDER DETAIL LOADING BENCHMARK")
+    print("=" * 60)
+    print(f"tags={args.tags} deliveries={args.deliveries} files/delivery={args.files} "
+          f"events={args.events} messages={args.messages}")
+
+    legacy = measure(engine, Session, legacy_load, order_id, args.runs)
+    current = measure(engine, Session, current_load, order_id, args.runs)
+
+    for name, result in (("joinedload (old)", legacy), ("page + fragments", current)):
+        print(f"{name:18} statements={result['statements']:3} rows={result['rows']:9} time={result['ms']:9.1f} ms")
+
+    if legacy["counts"] != current["counts"]:
+        print(f"[FAIL] Loaded collections differ: {legacy['counts']} vs {current['counts']}")
+        sys.exit(1)
+
+    expected = (
+        1 + args.tags + args.deliveries * (1 + args.files) + args.events + args.messages
+        + current["statements"]
+    )
+    if current["rows"] > expected:
+        print(f"[FAIL] Order detail loading fetched {current['rows']} rows, expected at most {expected}")
+        sys.exit(1)
+
+    print(f"[OK] Order detail loading row count is bounded ({current['rows']} <= {expected})")
+
+
+if __name__ == "__main__":
+    main()
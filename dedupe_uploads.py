@@ -0,0 +1,179 @@
+"""
+Upload deduplication script
+
+Moves files uploaded before content-addressed storage into the blob store:
+every legacy file in the uploads directory that is still referenced by a
+delivery file, delivery, order or avatar is hashed, stored once under
+blobs/<aa>/<sha256><ext>, and every reference is repointed at the blob.
+Reference counts are taken from the delivery files and avatars (plus
+deliveries that predate delivery_files). Legacy files are deleted only
+after the database changes are committed. References to files that are
+missing on disk are reported and left untouched.
+
+Usage:
+    python dedupe_uploads.py [--dry-run]
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+from pathlib import Path
+
+# Add app directory to path
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BASE_DIR))
+
+from app.infrastructure.database import engine, SessionLocal, Base
+import app.domain.entities  # noqa: F401  (register every table on Base.metadata)
+from app.domain.entities import User, Order, Delivery, DeliveryFile
+from app.infrastructure.repositories.stored_blob_repository_impl import StoredBlobRepository
+from app.infrastructure.storage.file_storage import BLOB_DIR, CHUNK_SIZE, blob_path
+
+
+UPLOAD_DIR = BASE_DIR / "app" / "uploads"
+
+
+def hash_file(path: Path):
+
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def is_legacy(filename) -> bool:
+
+    return bool(filename) and not filename.startswith(f"{BLOB_DIR}/")
+
+
+def dedupe(dry_run: bool = False):
+    """Store every referenced legacy upload as a blob and repoint its references"""
+    print("=" * 60)
+    print("UPLOAD DEDUPLICATION")
+    print("=" * 60)
+
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    blobs = StoredBlobRepository(db)
+    # legacy filename -> (sha256, blob path, size); None when missing on disk
+    placed = {}
+    copied = []
+
+    def store(filename):
+        if filename in placed:
+            return placed[filename]
+
+        source = UPLOAD_DIR / filename
+        if not source.is_file():
+            print(f"[WARN] Missing on disk, left as is: {filename}")
+            placed[filename] = None
+            return None
+
+        sha256, size = hash_file(source)
+        existing = blobs.get(sha256)
+        path = existing.path if existing else blob_path(sha256, filename)
+        target = UPLOAD_DIR / path
+        if not dry_run and not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, target)
+            copied.append(target)
+
+        placed[filename] = (sha256, path, size)
+        return placed[filename]
+
+    try:
+        print("[*] Moving delivery files...")
+        files = db.query(DeliveryFile).filter(DeliveryFile.blob_sha256.is_(None)).all()
+        for delivery_file in files:
+            blob = store(delivery_file.filename)
+            if not blob:
+                continue
+            sha256, path, size = blob
+            delivery_file.filename = blobs.acquire(sha256, path, size)
+            delivery_file.blob_sha256 = sha256
+            delivery_file.file_size = delivery_file.file_size or size
+
+        print("[*] Moving deliveries and orders...")
+        deliveries = db.query(Delivery).filter(Delivery.delivery_file.isnot(None)).all()
+        for delivery in deliveries:
+            if not is_legacy(delivery.delivery_file):
+                continue
+            blob = store(delivery.delivery_file)
+            if not blob:
+                continue
+            sha256, path, size = blob
+            if not delivery.files:
+                # Deliveries from before delivery_files own their file directly
+                path = blobs.acquire(sha256, path, size)
+            delivery.delivery_file = path
+
+        orders = db.query(Order).filter(Order.delivery_file.isnot(None)).all()
+        for order in orders:
+            if not is_legacy(order.delivery_file):
+                continue
+            blob = store(order.delivery_file)
+            if blob:
+                order.delivery_file = blob[1]
+
+        print("[*] Moving avatars...")
+        users = db.query(User).filter(User.avatar.isnot(None)).all()
+        for user in users:
+            if not is_legacy(user.avatar):
+                continue
+            blob = store(user.avatar)
+            if not blob:
+                continue
+            sha256, path, size = blob
+            user.avatar = blobs.acquire(sha256, path, size)
+
+        moved = {name: blob for name, blob in placed.items() if blob}
+        distinct = len({blob[0] for blob in moved.values()})
+        saved = sum(blob[2] for blob in moved.values()) - sum({blob[0]: blob[2] for blob in moved.values()}.values())
+        print(f"[OK] {len(moved)} legacy files -> {distinct} blobs ({saved / (1024 * 1024):.1f} MB saved)")
+
+        if dry_run:
+            db.rollback()
+            print("[INFO] Dry run, nothing changed")
+            return True
+
+        db.commit()
+    except Exception as e:
+        print(f"[ERROR] Deduplication failed: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+        for target in copied:
+            target.unlink(missing_ok=True)
+        return False
+    finally:
+        db.close()
+
+    for filename in moved:
+        try:
+            os.remove(UPLOAD_DIR / filename)
+        except OSError as e:
+            print(f"[WARN] Could not remove {filename}: {e}")
+    print(f"[OK] Removed {len(moved)} legacy files")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move legacy uploads into content-addressed storage")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without touching anything")
+    args = parser.parse_args()
+
+    # Check if DATABASE_URL is set
+    if not os.getenv("DATABASE_URL"):
+        print("[ERROR] DATABASE_URL environment variable is not set")
+        print("[INFO] Please set it before running this script:")
+        print("       export DATABASE_URL='your_database_url'")
+        sys.exit(1)
+
+    success = dedupe(args.dry_run)
+    sys.exit(0 if success else 1)
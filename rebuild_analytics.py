@@ -0,0 +1,82 @@
+"""
+Analytics rollup rebuild script
+
+Recomputes the precomputed analytics tables (order_daily_stats,
+turnaround_histograms, revenue_cube, tag_trend_counters and
+review_aggregates) from the orders, packages, deliveries, order events and
+tags tables. Run it after restoring a backup, importing orders by hand, or
+whenever the rollups look out of sync.
+
+Usage:
+    python rebuild_analytics.py
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add app directory to path
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BASE_DIR))
+
+from app.infrastructure.database import engine, SessionLocal, Base
+import app.domain.entities  # noqa: F401  (register every table on Base.metadata)
+from app.infrastructure.repositories.order_daily_stats_repository_impl import OrderDailyStatsRepository
+from app.infrastructure.repositories.turnaround_repository_impl import TurnaroundRepository
+from app.application.use_cases.turnaround_use_case import TurnaroundUseCase
+from app.infrastructure.repositories.revenue_cube_repository_impl import RevenueCubeRepository
+from app.infrastructure.repositories.tag_trend_repository_impl import TagTrendRepository
+from app.application.use_cases.tag_trend_use_case import TagTrendUseCase
+from app.infrastructure.repositories.review_aggregate_repository_impl import ReviewAggregateRepository
+
+
+def rebuild():
+    """Rebuild every analytics rollup"""
+    print("=" * 60)
+    print("ANALYTICS ROLLUP REBUILD")
+    print("=" * 60)
+
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        print("[*] Rebuilding order_daily_stats...")
+        rows = OrderDailyStatsRepository(db).rebuild()
+        print(f"[OK] order_daily_stats rebuilt ({rows} rows)")
+
+        print("[*] Rebuilding turnaround_histograms...")
+        cells = TurnaroundUseCase(TurnaroundRepository(db)).rebuild()
+        print(f"[OK] turnaround_histograms rebuilt ({cells} cells)")
+
+        print("[*] Rebuilding revenue_cube...")
+        cells = RevenueCubeRepository(db).rebuild()
+        print(f"[OK] revenue_cube rebuilt ({cells} cells)")
+
+        print("[*] Rebuilding tag_trend_counters...")
+        counters = TagTrendUseCase(TagTrendRepository(db)).rebuild()
+        print(f"[OK] tag_trend_counters rebuilt ({counters} counters)")
+
+        print("[*] Rebuilding review_aggregates...")
+        rows = ReviewAggregateRepository(db).rebuild()
+        print(f"[OK] review_aggregates rebuilt ({rows} rows)")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Rebuild failed: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    # Check if DATABASE_URL is set
+    if not os.getenv("DATABASE_URL"):
+        print("[ERROR] DATABASE_URL environment variable is not set")
+        print("[INFO] Please set it before running this script:")
+        print("       export DATABASE_URL='your_database_url'")
+        sys.exit(1)
+
+    success = rebuild()
+    sys.exit(0 if success else 1)
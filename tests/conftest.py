@@ -0,0 +1,100 @@
+import os
+import sys
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+# The engine is built on import; point it at SQLite before the app is loaded
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'producer_tags_test.db')}")
+os.environ.setdefault("DEADLINE_SCHEDULER", "false")
+os.environ.setdefault("DELIVERY_WORKER", "false")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    """
+    A TestClient on a fresh SQLite database with an admin, a client, one
+    package and two active orders of the client. Requests run as the admin
+    and store files under tmp_path. Yields (client, Session, upload_dir, ids).
+    """
+
+    from fastapi import Depends
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.main import app
+    from app.presentation.api.routes import auth_routes
+    from app.domain.base import Base
+    from app.domain.entities import User, Package, Order
+    from app.application.services.service_container import ServiceContainer
+    from app.presentation.api.dependencies.auth import get_service_container, get_current_user
+    from app.infrastructure.database import get_db, order_versions
+    from app.infrastructure.utils.time_utils import get_current_time
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    order_versions.register(Session)
+
+    db = Session()
+    admin = User(username="admin", email="admin@example.com", hashed_password="x", is_admin=True)
+    client_user = User(username="client", email="client@example.com", hashed_password="x", is_admin=False)
+    package = Package(name="Basic", price=10.0, delivery_days=1, tag_count=2)
+    db.add_all([admin, client_user, package])
+    db.commit()
+    orders = [
+        Order(user_id=client_user.id, package_id=package.id, details="d",
+              due_date=get_current_time() + timedelta(days=2), status="Active")
+        for _ in range(2)
+    ]
+    db.add_all(orders)
+    db.commit()
+    ids = {
+        "admin": admin.id,
+        "client": client_user.id,
+        "package": package.id,
+        "orders": [order.id for order in orders]
+    }
+    db.close()
+
+    upload_dir = tmp_path / "uploads"
+    upload_dir.mkdir()
+
+    def db_override():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def container_override(db=Depends(get_db)):
+        return ServiceContainer(db, upload_dir)
+
+    _clear_caches()
+    app.dependency_overrides[get_db] = db_override
+    app.dependency_overrides[get_service_container] = container_override
+    app.dependency_overrides[get_current_user] = lambda db=Depends(get_db): db.get(User, ids["admin"])
+
+    # Some routes build their container from the request's session themselves
+    monkeypatch.setattr(auth_routes, "get_service_container", container_override)
+    yield TestClient(app), Session, upload_dir, ids
+    app.dependency_overrides.clear()
+    _clear_caches()
+    engine.dispose()
+
+
+def _clear_caches():
+
+    # Process-wide caches are keyed on ids, which every test database reuses
+    from app.application.use_cases.analytics_use_case import analytics_cache
+    from app.application.use_cases.order_use_case import order_list_cache
+    from app.presentation.api.routes.auth_routes import homepage_cache
+    from app.presentation.api.routes.order_routes import fragment_cache
+
+    for cache in (analytics_cache, order_list_cache, homepage_cache, fragment_cache):
+        cache.clear()
@@ -0,0 +1,169 @@
+"""Result caches: expiry, eviction, invalidation and the views cached on top of them"""
+from app.domain.entities import User, Order, Message
+from app.application.services.service_container import ServiceContainer
+from app.application.use_cases.analytics_use_case import analytics_cache
+from app.infrastructure.cache import result_cache
+from app.infrastructure.cache.result_cache import ResultCache
+from app.infrastructure.events import publish, ORDERS_CHANGED
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+
+    now = [100.0]
+    monkeypatch.setattr(result_cache.time, "monotonic", lambda: now[0])
+    cache = ResultCache(ttl_seconds=10, max_entries=4)
+
+    cache.set("key", "value")
+    now[0] += 9
+    assert cache.get("key") == "value"
+    now[0] += 2
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+
+    cache = ResultCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_value_computed_across_a_clear_is_not_stored():
+
+    cache = ResultCache()
+
+    def factory():
+        cache.clear()
+        return "stale"
+
+    assert cache.get_or_set("key", factory) == "stale"
+    assert cache.get("key") is None
+    assert cache.get_or_set("key", lambda: "fresh") == "fresh"
+    assert cache.get("key") == "fresh"
+
+
+def test_set_with_an_old_generation_is_dropped():
+
+    cache = ResultCache()
+    generation = cache.generation
+    cache.clear()
+    cache.set("key", "stale", generation)
+    assert cache.get("key") is None
+
+
+def test_order_write_invalidates_analytics(env):
+
+    _, Session, upload_dir, ids = env
+    db = Session()
+    try:
+        container = ServiceContainer(db, upload_dir)
+        assert container.analytics_use_case.get_order_statistics()["active"] == 2
+
+        order = container.order_repository.get_by_id(ids["orders"][0])
+        order.status = "Delivered"
+        container.order_repository.update(order)
+
+        stats = container.analytics_use_case.get_order_statistics()
+        assert (stats["active"], stats["delivered"]) == (1, 1)
+    finally:
+        db.close()
+
+
+def test_orders_changed_clears_analytics_cache():
+
+    analytics_cache.set(("order_statistics",), {"total": -1})
+    publish(ORDERS_CHANGED, order_ids=None)
+    assert analytics_cache.get(("order_statistics",)) is None
+
+
+def test_homepage_etag_changes_when_an_order_completes(env):
+
+    client, Session, upload_dir, ids = env
+
+    response = client.get("/")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+    db = Session()
+    try:
+        container = ServiceContainer(db, upload_dir)
+        order = db.get(Order, ids["orders"][0])
+        order.status = "Delivered"
+        db.commit()
+        container.order_use_case.complete_order(order.id, ids["client"])
+    finally:
+        db.close()
+
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_order_list_view_is_rebuilt_after_an_order_changes(env):
+
+    _, Session, upload_dir, ids = env
+    first = ids["orders"][0]
+
+    db = Session()
+    try:
+        container = ServiceContainer(db, upload_dir)
+        view = container.order_use_case.get_order_list_view(ids["client"])
+        assert {order["id"]: order["status"] for order in view["orders"]}[first] == "Active"
+    finally:
+        db.close()
+
+    db = Session()
+    try:
+        db.get(Order, first).status = "Revision"
+        db.commit()
+    finally:
+        db.close()
+
+    db = Session()
+    try:
+        container = ServiceContainer(db, upload_dir)
+        view = container.order_use_case.get_order_list_view(ids["client"])
+        assert {order["id"]: order["status"] for order in view["orders"]}[first] == "Revision"
+    finally:
+        db.close()
+
+
+def test_messages_fragment_follows_new_messages_and_renamed_participants(env):
+
+    client, Session, _, ids = env
+    order_id = ids["orders"][0]
+
+    db = Session()
+    try:
+        db.add(Message(order_id=order_id, sender_id=ids["client"], message_text="first note"))
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.get(f"/order/{order_id}/fragments/messages")
+    assert response.status_code == 200
+    assert "first note" in response.text
+    assert "client" in response.text
+    assert response.headers["x-message-count"] == "1"
+
+    db = Session()
+    try:
+        db.get(User, ids["client"]).username = "renamed_client"
+        db.add(Message(order_id=order_id, sender_id=ids["client"], message_text="second note"))
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.get(f"/order/{order_id}/fragments/messages")
+    assert "second note" in response.text
+    assert "renamed_client" in response.text
+    assert response.headers["x-message-count"] == "2"
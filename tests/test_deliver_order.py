@@ -0,0 +1,49 @@
+"""Delivery route: a failed delivery must leave previously stored files alone"""
+import json
+
+from app.domain.entities import StoredBlob
+from app.application.use_cases.order_use_case import OrderUseCase
+
+
+def _blobs(Session):
+
+    db = Session()
+    try:
+        return {blob.sha256: (blob.path, blob.ref_count) for blob in db.query(StoredBlob).all()}
+    finally:
+        db.close()
+
+
+def test_failed_delivery_keeps_files_of_earlier_deliveries(env, monkeypatch):
+
+    client, Session, upload_dir, ids = env
+    first, second = ids["orders"]
+
+    response = client.post(
+        f"/order/{first}/deliver",
+        data={"response_text": "first"},
+        files={"files": ("stem.wav", b"shared stem", "audio/wav")},
+        follow_redirects=False
+    )
+    assert response.status_code == 302
+    [(sha256, (path, ref_count))] = _blobs(Session).items()
+    assert ref_count == 1
+
+    # The order changes state between the route's check and deliver_order
+    def deliver_order(self, *args, **kwargs):
+        raise ValueError("Cannot deliver order in this state")
+    monkeypatch.setattr(OrderUseCase, "deliver_order", deliver_order)
+
+    response = client.post(
+        f"/order/{second}/deliver",
+        data={
+            "response_text": "second",
+            "known_files": json.dumps([{"sha256": sha256, "size": len(b"shared stem"), "name": "stem.wav"}])
+        },
+        files={"files": ("new.wav", b"new stem", "audio/wav")},
+        follow_redirects=False
+    )
+    assert response.status_code == 400
+
+    assert _blobs(Session) == {sha256: (path, 1)}
+    assert (upload_dir / path).is_file()
@@ -0,0 +1,154 @@
+"""Rollup tables: incremental writes agree with a rebuild, and their one-off migrations"""
+from datetime import timedelta
+
+from app.domain.entities import (
+    OrderEvent, Notification, Tag, DataMigration,
+    OrderDailyStat, RevenueCubeCell, TurnaroundHistogram, TagTrendCounter
+)
+from app.application.dto.order import OrderCreate, PaymentInfo, ResolutionRequest
+from app.application.services.service_container import ServiceContainer
+from app.application.use_cases.tag_trend_use_case import KEYWORD, MOOD
+from app.application.use_cases.turnaround_use_case import ON_TIME
+from app.infrastructure.database.startup import _run_once
+from app.infrastructure.utils.tag_keywords import tag_keywords, MAX_VALUE_LENGTH
+from app.infrastructure.utils.time_buckets import bucket_start
+from app.infrastructure.utils.time_utils import get_current_time
+
+
+PAYMENT = PaymentInfo(card_number="4111111111111111", card_holder="Test", card_expiry="12/30", card_cvv="123")
+
+
+def _rows(db, entity, *columns):
+
+    return sorted(tuple(getattr(row, column) for column in columns) for row in db.query(entity).all())
+
+
+def _rollups(db):
+
+    return {
+        "daily": _rows(db, OrderDailyStat, "day", "package_id", "completed_count", "cancelled_count",
+                       "delivered_count", "revenue", "cancelled_revenue"),
+        "cube": _rows(db, RevenueCubeCell, "period", "package_id", "user_id", "status", "order_count", "revenue"),
+        "turnaround": _rows(db, TurnaroundHistogram, "period", "package_id", "metric", "bucket", "count"),
+    }
+
+
+def test_rows_without_a_package_share_one_sentinel_row(env):
+
+    _, Session, upload_dir, _ = env
+    today = get_current_time()
+
+    db = Session()
+    try:
+        container = ServiceContainer(db, upload_dir)
+        for _ in range(2):
+            container.order_stats_repository.record_completed(today.date(), None, 5.0)
+            container.revenue_cube_repository.record(today.strftime('%Y-%m'), None, None, "Completed", 5.0)
+            container.turnaround_repository.add(today.strftime('%Y-%m'), None, ON_TIME, 1)
+            container.tag_trend_repository.add(today.date(), None, KEYWORD, "drill")
+            db.commit()
+
+        assert _rows(db, OrderDailyStat, "package_id", "completed_count", "revenue") == [(0, 2, 10.0)]
+        assert _rows(db, RevenueCubeCell, "package_id", "user_id", "order_count") == [(0, 0, 2)]
+        assert _rows(db, TurnaroundHistogram, "package_id", "count") == [(0, 2)]
+        assert _rows(db, TagTrendCounter, "package_id", "count") == [(0, 2)]
+
+        [cell] = container.revenue_cube_repository.get_cells("0000-01", "9999-12", ["package", "customer"])
+        assert (cell["package_id"], cell["user_id"], cell["orders"]) == (None, None, 2)
+    finally:
+        db.close()
+
+
+def test_incremental_rollups_match_a_rebuild(env):
+
+    client, Session, upload_dir, ids = env
+    cancelled = ids["orders"][1]
+
+    db = Session()
+    try:
+        container = ServiceContainer(db, upload_dir)
+        order = container.order_use_case.create_order(
+            ids["client"], OrderCreate(package_id=ids["package"], payment=PAYMENT)
+        )
+        completed = order.id
+    finally:
+        db.close()
+
+    response = client.post(
+        f"/order/{completed}/deliver",
+        data={"response_text": "done"},
+        files={"files": ("mix.wav", b"mix", "audio/wav")},
+        follow_redirects=False
+    )
+    assert response.status_code == 302
+
+    db = Session()
+    try:
+        container = ServiceContainer(db, upload_dir)
+        container.order_use_case.complete_order(completed, ids["client"])
+        container.order_use_case.request_cancellation(
+            cancelled, ids["client"],
+            ResolutionRequest(request_type="cancellation", cancellation_reason="other")
+        )
+        container.order_use_case.approve_resolution_request(cancelled, ids["admin"])
+
+        incremental = _rollups(db)
+        assert incremental["daily"] and incremental["cube"] and incremental["turnaround"]
+
+        container.order_stats_repository.rebuild()
+        container.revenue_cube_repository.rebuild()
+        container.turnaround_use_case.rebuild()
+        assert _rollups(db) == incremental
+    finally:
+        db.close()
+
+
+def test_tag_trend_rebuild_dates_tags_from_the_order_placed_event(env):
+
+    _, Session, upload_dir, ids = env
+    order_id = ids["orders"][0]
+    placed_at = get_current_time() - timedelta(weeks=3)
+
+    db = Session()
+    try:
+        db.add_all([
+            OrderEvent(order_id=order_id, event_type="order_placed", user_id=ids["client"], created_at=placed_at),
+            # Notifications are per recipient and may be sent late; they must not date the order
+            Notification(user_id=ids["admin"], order_id=order_id, notification_type="order_placed",
+                         title="New Order Placed", message="m", created_at=get_current_time()),
+            Tag(order_id=order_id, name="Dark drill", mood="Dark"),
+        ])
+        db.commit()
+
+        ServiceContainer(db, upload_dir).tag_trend_use_case.rebuild()
+
+        week = bucket_start(placed_at, "week").date()
+        assert _rows(db, TagTrendCounter, "week", "package_id", "kind", "value", "count") == sorted([
+            (week, ids["package"], KEYWORD, "dark", 1),
+            (week, ids["package"], KEYWORD, "drill", 1),
+            (week, ids["package"], MOOD, "dark", 1),
+        ])
+    finally:
+        db.close()
+
+
+def test_tag_keywords_deduplicate_after_truncating():
+
+    long_word = "a" * MAX_VALUE_LENGTH
+    assert tag_keywords(f"{long_word}x {long_word}y Drill drill") == [long_word, "drill"]
+
+
+def test_data_migration_runs_once(env):
+
+    _, Session, _, _ = env
+    calls = []
+
+    db = Session()
+    try:
+        for _ in range(2):
+            _run_once(db, "example_backfill", lambda: calls.append(1) or "1 row")
+
+        assert calls == [1]
+        assert db.get(DataMigration, "example_backfill") is not None
+    finally:
+        db.close()
@@ -0,0 +1,201 @@
+"""Resumable uploads and the reference-counted blob store behind every stored file"""
+import asyncio
+import hashlib
+import io
+from datetime import timedelta
+
+from starlette.datastructures import UploadFile
+
+from app.domain.entities import User, StoredBlob, UploadSession
+from app.application.services.service_container import ServiceContainer
+from app.presentation.api.routes.upload_routes import CHUNK_CONTENT_TYPE, UPLOAD_WRITE_TIMEOUT
+from app.infrastructure.utils.time_utils import get_current_time
+
+
+BODY = b"0123456789" * 10
+
+
+def _start(client, order_id, size=len(BODY)):
+
+    response = client.post(f"/api/order/{order_id}/uploads", json={"filename": "stem.wav", "size": size})
+    assert response.status_code == 201
+    return response.json()["location"]
+
+
+def _patch(client, location, offset, chunk):
+
+    return client.patch(
+        location,
+        content=chunk,
+        headers={"Content-Type": CHUNK_CONTENT_TYPE, "Upload-Offset": str(offset)}
+    )
+
+
+def _store(container, data, filename="stem.wav"):
+
+    return asyncio.run(container.file_storage.store_upload(UploadFile(file=io.BytesIO(data), filename=filename)))
+
+
+def _blobs(Session):
+
+    db = Session()
+    try:
+        return {blob.sha256: (blob.path, blob.ref_count) for blob in db.query(StoredBlob).all()}
+    finally:
+        db.close()
+
+
+def test_upload_resumes_from_the_reported_offset(env):
+
+    client, _, _, ids = env
+    location = _start(client, ids["orders"][0])
+
+    assert _patch(client, location, 0, BODY[:40]).status_code == 204
+    assert client.head(location).headers["upload-offset"] == "40"
+
+    response = _patch(client, location, 0, BODY[:40])
+    assert response.status_code == 409
+    assert response.json()["offset"] == 40
+
+    response = client.post(f"{location}/finish")
+    assert response.status_code == 409
+
+    response = _patch(client, location, 40, BODY[40:])
+    assert response.status_code == 204
+    assert response.headers["upload-offset"] == str(len(BODY))
+
+    response = client.post(f"{location}/finish")
+    assert response.status_code == 200
+    assert response.json()["sha256"] == hashlib.sha256(BODY).hexdigest()
+    assert response.json()["size"] == len(BODY)
+
+
+def test_patch_waits_for_the_writer_holding_the_offset(env):
+
+    client, Session, upload_dir, ids = env
+    location = _start(client, ids["orders"][0])
+    upload_id = location.rsplit("/", 1)[1]
+    assert _patch(client, location, 0, BODY[:40]).status_code == 204
+    part_path = upload_dir.parent / "upload_tmp" / f"{upload_id}.upload"
+
+    db = Session()
+    try:
+        repository = ServiceContainer(db, upload_dir).upload_session_repository
+        assert repository.claim(upload_id, 40, "other", get_current_time() - UPLOAD_WRITE_TIMEOUT)
+        db.commit()
+    finally:
+        db.close()
+
+    response = _patch(client, location, 40, b"x" * 60)
+    assert response.status_code == 409
+    assert part_path.read_bytes() == BODY[:40]
+
+    # A claim older than UPLOAD_WRITE_TIMEOUT belonged to a request that died
+    db = Session()
+    try:
+        db.get(UploadSession, upload_id).writing_since = get_current_time() - UPLOAD_WRITE_TIMEOUT - timedelta(minutes=1)
+        db.commit()
+    finally:
+        db.close()
+
+    assert _patch(client, location, 40, BODY[40:]).status_code == 204
+    assert part_path.read_bytes() == BODY
+
+    db = Session()
+    try:
+        session = db.get(UploadSession, upload_id)
+        assert (session.bytes_received, session.writer) == (len(BODY), None)
+    finally:
+        db.close()
+
+
+def test_identical_files_share_one_blob_until_the_last_release_commits(env):
+
+    _, Session, upload_dir, _ = env
+
+    db = Session()
+    try:
+        container = ServiceContainer(db, upload_dir)
+        first = _store(container, BODY)
+        second = _store(container, BODY, "copy.wav")
+        db.commit()
+        assert first["filename"] == second["filename"]
+        assert second["deduplicated"]
+        assert list(_blobs(Session).values()) == [(first["filename"], 2)]
+
+        container.file_storage.release(first["filename"])
+        db.commit()
+        assert (upload_dir / first["filename"]).is_file()
+
+        container.file_storage.release(first["filename"])
+        db.rollback()
+        assert (upload_dir / first["filename"]).is_file()
+        assert list(_blobs(Session).values()) == [(first["filename"], 1)]
+
+        container.file_storage.release(first["filename"])
+        assert (upload_dir / first["filename"]).is_file()
+        db.commit()
+        assert not (upload_dir / first["filename"]).exists()
+        assert _blobs(Session) == {}
+    finally:
+        db.close()
+
+
+def test_file_placed_by_an_uncommitted_store_is_removed(env):
+
+    _, Session, upload_dir, _ = env
+
+    db = Session()
+    try:
+        stored = _store(ServiceContainer(db, upload_dir), BODY)
+        assert (upload_dir / stored["filename"]).is_file()
+        db.rollback()
+        assert not (upload_dir / stored["filename"]).exists()
+
+        # Closing the session without a commit discards it just the same
+        stored = _store(ServiceContainer(db, upload_dir), BODY)
+    finally:
+        db.close()
+    assert not (upload_dir / stored["filename"]).exists()
+    assert _blobs(Session) == {}
+
+
+def test_rolled_back_reference_keeps_the_committed_file(env):
+
+    _, Session, upload_dir, _ = env
+
+    db = Session()
+    try:
+        container = ServiceContainer(db, upload_dir)
+        stored = _store(container, BODY)
+        db.commit()
+
+        _store(container, BODY, "copy.wav")
+        db.rollback()
+
+        assert (upload_dir / stored["filename"]).is_file()
+        assert list(_blobs(Session).values()) == [(stored["filename"], 1)]
+    finally:
+        db.close()
+
+
+def test_uploading_the_same_avatar_again_keeps_one_reference(env):
+
+    client, Session, upload_dir, ids = env
+
+    for _ in range(2):
+        response = client.post(
+            "/profile",
+            data={"username": "admin", "email": "admin@example.com"},
+            files={"avatar": ("me.png", b"avatar image", "image/png")},
+            follow_redirects=False
+        )
+        assert response.status_code < 400
+
+    db = Session()
+    try:
+        avatar = db.get(User, ids["admin"]).avatar
+    finally:
+        db.close()
+    assert _blobs(Session) == {hashlib.sha256(b"avatar image").hexdigest(): (avatar, 1)}
+    assert (upload_dir / avatar).is_file()